@@ -1,4 +1,5 @@
 # cli_runner.py
+import argparse
 import sys
 
 # Optional colors (no hard dependency)
@@ -9,7 +10,10 @@ try:
 except Exception:
     GREEN = RED = YELLOW = MAGENTA = RESET = ""
 
-from engine.game import start_run, get_today_scenario, apply_choice, is_over, final_score
+from engine.game import get_today_scenario, is_over, final_score
+from engine.journal import journal_lines
+from engine.replay import start_recorded_run, append_replay, default_replay_path
+from engine.instrument import PhaseTimer, EventCounter, attach
 
 
 def ask_difficulty() -> str:
@@ -38,12 +42,12 @@ def render_stats(stats_after: dict) -> None:
     print(f"\nStats → ❤️ HP: {hp}   🍗 Food: {food}   😇 Morale: {morale}\n")
 
 
-def main() -> int:
+def play_session() -> int:
     print("\n=== Swipe Decision Game (CLI smoke test) ===")
     try:
         while True:
             difficulty = ask_difficulty()
-            state = start_run(difficulty)
+            state, recorder = start_recorded_run(difficulty)
 
             while not is_over(state):
                 # Show header and today's scenario
@@ -60,7 +64,7 @@ def main() -> int:
                 choice = ask_choice()
 
                 # Resolve one day
-                outcome = apply_choice(state, choice)
+                outcome = recorder.apply(state, choice)
                 log_text = outcome["log_text"]
 
                 # Color feedback on result
@@ -91,10 +95,14 @@ def main() -> int:
 
             score = final_score(state)
             print(f"Final score: {score}")
+            try:
+                append_replay(default_replay_path("cli"), recorder.to_replay(state))
+            except (OSError, ValueError) as e:
+                print(f"(replay not saved: {e})")
 
             # Quick log preview (last few lines)
             print("\nJournal (last 5):")
-            for line in state.event_log[-5:]:
+            for line in journal_lines(state.journal, last_days=5)[-5:]:
                 print("  " + line)
 
             again = input("\nPlay again? (Y/N): ").strip().upper()
@@ -109,5 +117,20 @@ def main() -> int:
         return 0
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Swipe Decision Game — CLI smoke test")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-phase engine timings and event counts on exit")
+    args = parser.parse_args()
+    if not args.profile:
+        return play_session()
+
+    timer, events = PhaseTimer(), EventCounter()
+    with attach(timer, events):
+        code = play_session()
+    print("\n".join(["", "Engine profile:", *timer.format(), "", *events.format()]))
+    return code
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import argparse
+import sys
+
+from engine.scenarios import scenarios as SCENARIOS
+from engine.rules import Stats, make_rules, option_branches, day_outcomes, score
+
+# A compact policy sees (day, stats, unused-scenario mask, scenario index) and returns "L" | "R".
+# This is the signature of engine.solver.OptimalPolicy.choose, so solved tables plug in directly.
+CompactPolicy = Union[str, Callable[[int, Stats, int, int], str]]
+
+
+@dataclass
+class OutcomeDistribution:
+    difficulty: str
+    num_days: int
+    p_win: float = 0.0
+    deaths: Dict[Tuple[str, int], float] = field(default_factory=dict)   # (cause, day) -> probability
+    scores: Dict[int, float] = field(default_factory=dict)               # final_score -> probability
+    states_per_day: List[int] = field(default_factory=list)              # distinct states entering each day
+
+    def p_death(self, cause: Optional[str] = None, day: Optional[int] = None) -> float:
+        return sum(
+            p for (c, d), p in self.deaths.items()
+            if (cause is None or c == cause) and (day is None or d == day)
+        )
+
+    @property
+    def expected_score(self) -> float:
+        return sum(s * p for s, p in self.scores.items())
+
+    @property
+    def total_probability(self) -> float:
+        return self.p_win + self.p_death()
+
+
+def analyze(difficulty: str, policy: CompactPolicy = "L", num_days: Optional[int] = None) -> OutcomeDistribution:
+    """
+    Push the exact distribution over (stats, unused scenarios) through every day under a fixed policy.
+    Identical states are merged after each day, so cost tracks distinct states, not runs.
+    """
+    rules = make_rules(difficulty, num_days)
+    n_scen = len(SCENARIOS)
+    if rules.num_days > n_scen:
+        raise ValueError("NUM_DAYS exceeds available scenarios.")
+
+    choose = (lambda day, stats, mask, s: policy) if isinstance(policy, str) else policy
+    branches = [
+        {"L": option_branches(sc["left_choice"], rules), "R": option_branches(sc["right_choice"], rules)}
+        for sc in SCENARIOS
+    ]
+    outcome_cache: Dict[Tuple[Stats, int, str], Dict] = {}
+
+    result = OutcomeDistribution(difficulty=rules.difficulty, num_days=rules.num_days)
+    deaths: Dict[Tuple[str, int], float] = defaultdict(float)
+    scores: Dict[int, float] = defaultdict(float)
+
+    dist: Dict[Tuple[Stats, int], float] = {(rules.start, (1 << n_scen) - 1): 1.0}
+    for day in range(1, rules.num_days + 1):
+        result.states_per_day.append(len(dist))
+        last_day = day >= rules.num_days
+        nxt: Dict[Tuple[Stats, int], float] = defaultdict(float)
+
+        for (stats, mask), p_state in dist.items():
+            unused = [s for s in range(n_scen) if (mask >> s) & 1]
+            p_scen = p_state / len(unused)
+            for s in unused:
+                side = choose(day, stats, mask, s).upper()
+                if side != "R":
+                    side = "L"  # same fallback as apply_choice
+                k = (stats, s, side)
+                outs = outcome_cache.get(k)
+                if outs is None:
+                    outs = outcome_cache[k] = day_outcomes(stats, branches[s][side], rules)
+
+                next_mask = mask & ~(1 << s)
+                for (after, death), q in outs.items():
+                    p = p_scen * q
+                    if death:
+                        deaths[(death, day)] += p
+                        scores[score(after, day, rules)] += p
+                    elif last_day:
+                        result.p_win += p
+                        scores[score(after, day, rules)] += p
+                    else:
+                        nxt[(after, next_mask)] += p
+        dist = nxt
+
+    result.deaths = dict(deaths)
+    result.scores = dict(sorted(scores.items()))
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Exact outcome probabilities for a fixed policy.")
+    parser.add_argument("difficulty", nargs="?", default="normal")
+    parser.add_argument("-p", "--policy", choices=("L", "R", "optimal"), default="L")
+    parser.add_argument("--days", type=int, default=None)
+    args = parser.parse_args()
+
+    policy: CompactPolicy = args.policy
+    if args.policy == "optimal":
+        from engine.solver import load_or_solve
+        policy = load_or_solve(args.difficulty, args.days).choose
+
+    res = analyze(args.difficulty, policy, args.days)
+    print(f"Difficulty: {res.difficulty}   Days: {res.num_days}   Policy: {args.policy}")
+    print(f"P(win): {res.p_win:.6f}   E[score]: {res.expected_score:.4f}")
+    for cause in ("Injury", "Starvation", "Hopelessness"):
+        by_day = "  ".join(f"d{d}={res.p_death(cause, d):.4f}" for d in range(1, res.num_days + 1))
+        print(f"P({cause}) = {res.p_death(cause):.6f}   {by_day}")
+    print("Score distribution:")
+    for s, p in res.scores.items():
+        print(f"  {s:>4}: {p:.6f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from engine.scenarios import scenarios as SCENARIOS, surprise_events as SURPRISES, SurpriseEvent, surprise_probabilities
+from engine.config import NUM_DAYS, DIFF_CFG, STARTS, DIFF_SCORE_MULT, CAUSES
+from engine.game import LAZY_ORDER_MIN_SCENARIOS
+
+# Cause-of-death codes used by BatchResult.cause (index into CAUSES)
+CAUSE_NONE, CAUSE_INJURY, CAUSE_STARVATION, CAUSE_HOPELESSNESS = range(4)
+
+STAT_KEYS = ("hp", "food", "morale")
+
+# ---------- Array-backed tables ----------
+
+def _effect_vec(effect: Dict[str, int]) -> list:
+    return [effect.get(k, 0) for k in STAT_KEYS]
+
+
+def build_scenario_arrays(scenarios: Sequence[Dict[str, Any]] = SCENARIOS) -> Dict[str, np.ndarray]:
+    """
+    Flatten scenario dicts into arrays indexed by [scenario, side] (side 0 = L, 1 = R).
+    Flat choices are encoded as chance=1.0 with identical success/failure effects.
+    """
+    n = len(scenarios)
+    has_chance = np.zeros((n, 2), dtype=bool)
+    chance = np.ones((n, 2), dtype=np.float64)
+    success = np.zeros((n, 2, 3), dtype=np.int16)
+    failure = np.zeros((n, 2, 3), dtype=np.int16)
+    for i, sc in enumerate(scenarios):
+        for side, key in enumerate(("left_choice", "right_choice")):
+            chosen = sc[key]
+            if "chance" in chosen:
+                has_chance[i, side] = True
+                chance[i, side] = chosen["chance"]
+                success[i, side] = _effect_vec(chosen["success_effects"])
+                failure[i, side] = _effect_vec(chosen["failure_effects"])
+            else:
+                success[i, side] = failure[i, side] = _effect_vec(chosen["effects"])
+    return {"has_chance": has_chance, "chance": chance, "success": success, "failure": failure}
+
+
+def build_surprise_array(events: Sequence[SurpriseEvent] = SURPRISES) -> np.ndarray:
+    return np.array([(ev.hp, ev.food, ev.morale) for ev in events], dtype=np.int16)
+
+
+def sample_orders(rng: np.random.Generator, n_runs: int, n_scenarios: int, n_days: int) -> np.ndarray:
+    """
+    (n_runs, n_days) scenario indices, distinct within each row, in uniformly random order.
+    Small libraries take the first n_days of a random permutation (the historical stream);
+    larger ones use Floyd's algorithm per column plus a row shuffle, so memory and time are
+    O(n_runs * n_days) and O(n_runs * n_days**2) whatever the library size.
+    """
+    dtype = np.uint16 if n_scenarios <= 1 << 16 else np.uint32
+    if n_scenarios < LAZY_ORDER_MIN_SCENARIOS:
+        return np.argsort(rng.random((n_runs, n_scenarios)), axis=1)[:, :n_days].astype(dtype)
+    chosen = np.empty((n_runs, n_days), dtype=dtype)
+    for k, top in enumerate(range(n_scenarios - n_days, n_scenarios)):
+        pick = rng.integers(0, top + 1, size=n_runs, dtype=np.int64)
+        taken = (chosen[:, :k] == pick[:, None]).any(axis=1)
+        chosen[:, k] = np.where(taken, top, pick)
+    return rng.permuted(chosen, axis=1)
+
+
+# ---------- Batch state / results ----------
+
+@dataclass
+class BatchState:
+    """Per-run arrays for one batch; policies receive this (read-only by convention)."""
+    hp: np.ndarray
+    food: np.ndarray
+    morale: np.ndarray
+    low_food: np.ndarray
+    low_morale: np.ndarray
+    over: np.ndarray
+    won: np.ndarray
+    cause: np.ndarray
+    days: np.ndarray  # days completed (matches final_score's notion)
+
+
+@dataclass
+class BatchResult:
+    difficulty: str
+    num_days: int
+    scores: np.ndarray
+    won: np.ndarray
+    cause: np.ndarray
+    days: np.ndarray
+
+    @property
+    def n_runs(self) -> int:
+        return int(self.scores.shape[0])
+
+    def win_rate(self) -> float:
+        return float(self.won.mean()) if self.n_runs else 0.0
+
+    def cause_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.cause, minlength=len(CAUSES))
+        return {name: int(c) for name, c in zip(CAUSES, counts)}
+
+
+# Policy: "L"/"R" for every run, a per-run vector (n_runs,), a per-run/per-day matrix
+# (n_runs, num_days), or a callable(day, scenario_idx, batch_state) -> vector.
+# In vectors, "R" / True selects the right choice.
+Policy = Union[str, Sequence, np.ndarray, Callable[[int, np.ndarray, BatchState], Any]]
+
+
+def _as_right_mask(choice: Any, n: int) -> np.ndarray:
+    arr = np.asarray(choice)
+    if arr.dtype.kind in ("U", "S"):
+        arr = np.char.upper(arr.astype("U1")) == "R"
+    else:
+        arr = arr.astype(bool)
+    return np.broadcast_to(arr, (n,))
+
+
+# ---------- Public API ----------
+
+def simulate_batch(
+    difficulty: str,
+    n_runs: int,
+    policy: Policy = "L",
+    *,
+    num_days: Optional[int] = None,
+    seed: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+    starts: Optional[Dict[str, int]] = None,
+    score_mult: Optional[float] = None,
+) -> BatchResult:
+    """
+    Simulate n_runs independent runs with the same rules as engine.game.apply_choice,
+    one array operation per rule per day. Scores match engine.game.final_score.
+    cfg / starts / score_mult override individual keys of the difficulty's DIFF_CFG,
+    STARTS and DIFF_SCORE_MULT entries (balancing sweeps).
+    """
+    difficulty = difficulty.lower()
+    if difficulty not in STARTS:
+        difficulty = "normal"
+    starts = {**STARTS[difficulty], **(starts or {})}
+    cfg = {**DIFF_CFG[difficulty], **(cfg or {})}
+    mult = score_mult if score_mult is not None else DIFF_SCORE_MULT.get(difficulty, 1.0)
+
+    n_days = num_days if num_days is not None else NUM_DAYS
+    if n_days > len(SCENARIOS):
+        raise ValueError("NUM_DAYS exceeds available scenarios.")
+
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    tables = build_scenario_arrays()
+    surprises = build_surprise_array()
+    surprise_p = np.asarray(surprise_probabilities(difficulty))
+
+    hp_max, food_max, mor_max = starts["hp_max"], starts["food_max"], starts["morale_max"]
+    bonus = cfg.get("risk_success_bonus", 0.0)
+    surprise_chance = cfg.get("surprise_chance", 0.2)
+    starve_every = cfg["starve_morale_every_n_days"]
+    low_food_days = cfg.get("low_food_death_days", 3)
+    low_morale_days = cfg.get("low_morale_death_days", 3)
+
+    # Success probability already clamped per (scenario, side), as in apply_choice
+    p_success = np.where(tables["has_chance"], np.clip(tables["chance"] + bonus, 0.05, 0.95), 1.0)
+
+    st = BatchState(
+        hp=np.full(n_runs, starts["hp"], dtype=np.int16),
+        food=np.full(n_runs, starts["food"], dtype=np.int16),
+        morale=np.full(n_runs, starts["morale"], dtype=np.int16),
+        low_food=np.zeros(n_runs, dtype=np.int16),
+        low_morale=np.zeros(n_runs, dtype=np.int16),
+        over=np.zeros(n_runs, dtype=bool),
+        won=np.zeros(n_runs, dtype=bool),
+        cause=np.zeros(n_runs, dtype=np.int8),
+        days=np.zeros(n_runs, dtype=np.int16),
+    )
+
+    # No-repeat scenario order per run
+    order = sample_orders(rng, n_runs, len(SCENARIOS), n_days)
+
+    fixed = None
+    if not callable(policy):
+        fixed = np.asarray(policy)
+        if fixed.ndim == 2 and fixed.shape != (n_runs, n_days):
+            raise ValueError("Policy matrix must have shape (n_runs, num_days).")
+
+    for d in range(n_days):
+        idx = np.flatnonzero(~st.over)
+        if idx.size == 0:
+            break
+        day = d + 1
+        scen = order[idx, d]
+
+        # ---- Choice per run ----
+        if fixed is None:
+            right_all = _as_right_mask(policy(day, order[:, d], st), n_runs)
+            right = right_all[idx]
+        elif fixed.ndim == 2:
+            right = _as_right_mask(fixed[idx, d], idx.size)
+        elif fixed.ndim == 1:
+            right = _as_right_mask(fixed[idx], idx.size)
+        else:
+            right = _as_right_mask(fixed, idx.size)
+        side = right.astype(np.int8)
+
+        # ---- Resolve main effect ----
+        success = rng.random(idx.size) <= p_success[scen, side]
+        effect = np.where(success[:, None], tables["success"][scen, side], tables["failure"][scen, side])
+
+        hp = np.clip(st.hp[idx] + effect[:, 0], 0, hp_max)
+        food = np.clip(st.food[idx] + effect[:, 1], 0, food_max)
+        morale = np.clip(st.morale[idx] + effect[:, 2], 0, mor_max)
+
+        # ---- Surprise event ----
+        hit = rng.random(idx.size) < surprise_chance
+        pick = rng.choice(len(surprises), size=idx.size, p=surprise_p)
+        sdelta = np.where(hit[:, None], surprises[pick], 0)
+        hp = np.clip(hp + sdelta[:, 0], 0, hp_max)
+        food = np.clip(food + sdelta[:, 1], 0, food_max)
+        morale = np.clip(morale + sdelta[:, 2], 0, mor_max)
+
+        # ---- Daily decay (Player.daily_decay) ----
+        food = np.clip(food - 1, 0, food_max)
+        starving = food <= 0
+        low_food = np.where(starving, st.low_food[idx] + 1, 0)
+        hp = np.where(starving, np.clip(hp - 1, 0, hp_max), hp)
+        morale_hit = starving & (low_food % starve_every == 0)
+        morale = np.where(morale_hit, np.clip(morale - 1, 0, mor_max), morale)
+        low_morale = np.where(morale <= 0, st.low_morale[idx] + 1, 0)
+
+        st.hp[idx], st.food[idx], st.morale[idx] = hp, food, morale
+        st.low_food[idx], st.low_morale[idx] = low_food, low_morale
+
+        # ---- Death & win checks ----
+        injury = hp <= 0
+        starved = ~injury & (low_food >= low_food_days)
+        hopeless = ~injury & ~starved & (low_morale >= low_morale_days)
+        cause = np.select([injury, starved, hopeless],
+                          [CAUSE_INJURY, CAUSE_STARVATION, CAUSE_HOPELESSNESS], CAUSE_NONE)
+        dead = cause != CAUSE_NONE
+
+        st.cause[idx] = cause
+        st.days[idx] = day
+        st.over[idx[dead]] = True
+        if day >= n_days:
+            st.won[idx[~dead]] = True
+            st.over[idx] = True
+
+    # Widen before scaling: days is int16, so days * 10 overflows past 3276 days
+    base = (st.days.astype(np.int64) * 10 + st.hp.astype(np.int64) * 5
+            + st.food.astype(np.int64) * 2 + st.morale.astype(np.int64) * 5)
+    scores = np.rint(base * mult).astype(np.int64)
+    return BatchResult(
+        difficulty=difficulty,
+        num_days=n_days,
+        scores=scores,
+        won=st.won,
+        cause=st.cause,
+        days=st.days,
+    )
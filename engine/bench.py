@@ -0,0 +1,337 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from engine.game import GameState, start_run, get_today_scenario, apply_choice, resolve_day, final_score
+from engine.player import Player
+from engine.scenarios import scenarios as SCENARIOS
+from engine.config import DIFF_CFG, STARTS, CAUSES, DIFFICULTIES
+from engine.tables import TABLES, SIDE_L, SIDE_R
+from engine.rules import make_rules, step_stats, score
+from engine.instrument import Observer, attach
+
+# The baseline is specific to the machine (and Python build) it was recorded on: regenerate it
+# with --save-baseline on the machine that runs the gate before trusting any comparison.
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_TOLERANCE = 0.30  # allowed slowdown vs baseline (fraction); the floor for saved tolerances
+REPEATS = 9               # timed repeats per metric; the median is reported
+SPREAD_FACTOR = 3.0       # saved tolerance = max(floor, SPREAD_FACTOR x spread across passes)
+MAX_TOLERANCE = 0.90      # a wider gate could never fire on runs_per_sec
+
+# ---------- Timing helpers ----------
+
+def measure(fn: Callable[[], Any], n: int, repeat: int = REPEATS) -> float:
+    """Median-of-`repeat` nanoseconds per call of fn over n calls."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter_ns()
+        for _ in range(n):
+            fn()
+        samples.append((time.perf_counter_ns() - t0) / n)
+    return statistics.median(samples)
+
+
+def _first(pred) -> int:
+    return next(i for i, sc in enumerate(SCENARIOS) if pred(sc))
+
+
+# Scenario with a chance option on the left and a flat option on the right
+_CHANCE_LEFT = _first(lambda sc: "chance" in sc["left_choice"] and "chance" not in sc["right_choice"])
+
+
+def _day_state(surprise_chance: float) -> Tuple[GameState, Callable[[], None]]:
+    """
+    A long-lived state pinned to one scenario, plus a reset() that restores it.
+    Stats are reset every call so the run never ends; the reset cost is measured
+    separately and subtracted.
+    """
+    state = start_run("normal", journal=False)
+    state.cfg = dict(state.cfg, surprise_chance=surprise_chance)
+    state.scenario_order = [SCENARIOS[_CHANCE_LEFT]] * state.num_days
+    p = state.player
+    hp, food, morale = p.hp, p.food, p.morale
+
+    def reset():
+        state.day = 1
+        state.over = False
+        p.hp, p.food, p.morale, p.low_food, p.low_morale = hp, food, morale, 0, 0
+
+    return state, reset
+
+
+# ---------- Benchmarks ----------
+
+def bench_micro(scale: float = 1.0) -> Dict[str, float]:
+    """ns/op for individual engine hot paths."""
+    n = max(1, int(20_000 * scale))
+    out: Dict[str, float] = {}
+    random.seed(12345)
+
+    for diff in DIFFICULTIES:
+        out[f"start_run[{diff}]"] = measure(lambda: start_run(diff), n)
+
+    state = start_run("normal")
+    out["get_today_scenario"] = measure(lambda: get_today_scenario(state), n)
+
+    for label, sc in (("no_surprise", 0.0), ("surprise", 1.0)):
+        st, reset = _day_state(sc)
+        reset_ns = measure(reset, n)
+        for kind, side in (("chance", "L"), ("flat", "R")):
+            out[f"apply_choice[{kind},{label}]"] = measure(lambda: (reset(), apply_choice(st, side)), n) - reset_ns
+            s_int = SIDE_L if side == "L" else SIDE_R
+            out[f"resolve_day[{kind},{label}]"] = measure(lambda: (reset(), resolve_day(st, s_int)), n) - reset_ns
+
+    cfg = DIFF_CFG["normal"]
+    player = Player(**{k: v for k, v in STARTS["normal"].items()})
+
+    def decay():
+        player.food = 3
+        player.daily_decay(cfg)
+
+    out["Player.daily_decay"] = measure(decay, n)
+
+    done = start_run("normal")
+    while not done.over:
+        apply_choice(done, "L")
+    out["final_score"] = measure(lambda: final_score(done), n)
+    return out
+
+
+def bench_runs(scale: float = 1.0, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Full-run throughput per difficulty (always-left policy) for both engine paths; medians of `repeat` batches."""
+    n_runs = max(1, int(1_000 * scale))
+    out: Dict[str, Dict[str, float]] = {}
+    for diff in DIFFICULTIES:
+        for path in ("apply_choice", "resolve_day"):
+            random.seed(777)
+            per_sec, per_day = [], []
+            for _ in range(repeat):
+                days = 0
+                t0 = time.perf_counter_ns()
+                for _ in range(n_runs):
+                    state = start_run(diff, journal=(path == "apply_choice"))
+                    if path == "apply_choice":
+                        while not state.over:
+                            apply_choice(state, "L")
+                            days += 1
+                    else:
+                        while not state.over:
+                            resolve_day(state, SIDE_L)
+                            days += 1
+                elapsed = time.perf_counter_ns() - t0
+                per_sec.append(n_runs / (elapsed / 1e9))
+                per_day.append(elapsed / days)
+            out[f"full_run[{diff},{path}]"] = {
+                "runs_per_sec": statistics.median(per_sec),
+                "ns_per_day": statistics.median(per_day),
+            }
+    return out
+
+
+# ---------- Equivalence ----------
+
+def _check_against_rules(state: GameState, choices: str, step: Callable, rules, label: str) -> List[str]:
+    """Play choices with step(state, side) -> DayResult; compare every day and the score with engine.rules."""
+    problems: List[str] = []
+    for c in choices:
+        if state.over:
+            break
+        p = state.player
+        before = (p.hp, p.food, p.morale, p.low_food, p.low_morale)
+        res = step(state, c)
+        surprise = TABLES.surprises[res.surprise] if res.surprise != -1 else (0, 0, 0)
+        expected, death = step_stats(before, res.effect, surprise, rules)
+        got = (p.hp, p.food, p.morale, p.low_food, p.low_morale)
+        if got != expected or (death or "None") != CAUSES[res.death]:
+            problems.append(f"day {res.day}: rules {expected}/{death} != {label} {got}/{CAUSES[res.death]}")
+    p = state.player
+    days_completed = min(state.day if state.over else state.day - 1, rules.num_days)
+    expected_score = score((p.hp, p.food, p.morale), days_completed, rules)
+    if final_score(state) != expected_score:
+        problems.append(f"score: rules {expected_score} != {label} {final_score(state)}")
+    if state.won != (state.over and state.cause_of_death == "None"):
+        problems.append(f"won={state.won} with over={state.over}, cause {state.cause_of_death} ({label})")
+    return problems
+
+
+def _apply_observed(state: GameState, c: str):
+    apply_choice(state, c)
+    return state.journal[-1]
+
+
+def check_equivalence(seeds: int = 2_000) -> List[str]:
+    """
+    For fixed seeds, the side-effect-free rules in engine.rules are the reference: every day of
+    the fast path (resolve_day) and of the instrumented path (apply_choice with an observer
+    attached) must match rules.step_stats, and the final score rules.score. The two paths must
+    also produce identical runs (same RNG draws, journal and score) from the same seed.
+    Returns a list of mismatch descriptions (empty when equivalent).
+    """
+    problems: List[str] = []
+    for seed in range(seeds):
+        diff = DIFFICULTIES[seed % len(DIFFICULTIES)]
+        choices = "".join(random.Random(seed).choices("LR", k=len(SCENARIOS)))
+        rules = make_rules(diff)
+
+        fast = start_run(diff, seed=seed)
+        problems += [f"seed {seed} {msg}" for msg in _check_against_rules(
+            fast, choices, lambda st, c: resolve_day(st, SIDE_R if c == "R" else SIDE_L), rules, "resolve_day")]
+
+        with attach(Observer()):
+            observed = start_run(diff, seed=seed)
+            problems += [f"seed {seed} {msg}" for msg in _check_against_rules(
+                observed, choices, _apply_observed, rules, "observed")]
+
+        fast_key = (fast.day, fast.over, fast.won, fast.cause_of_death, final_score(fast), fast.journal)
+        obs_key = (observed.day, observed.over, observed.won, observed.cause_of_death,
+                   final_score(observed), observed.journal)
+        if fast_key != obs_key:
+            problems.append(f"seed {seed}: resolve_day {fast_key[:5]} != observed {obs_key[:5]}")
+    return problems
+
+
+# ---------- Baseline comparison ----------
+
+def flatten(results: Dict[str, Any]) -> Dict[str, Tuple[float, bool]]:
+    """metric -> (value, higher_is_better)."""
+    flat: Dict[str, Tuple[float, bool]] = {}
+    for name, ns in results["micro"].items():
+        flat[f"{name}.ns_per_op"] = (ns, False)
+    for name, vals in results["runs"].items():
+        flat[f"{name}.runs_per_sec"] = (vals["runs_per_sec"], True)
+        flat[f"{name}.ns_per_day"] = (vals["ns_per_day"], False)
+    return flat
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond tolerance; metrics missing from the baseline are skipped."""
+    regressions: List[str] = []
+    base = flatten(baseline)
+    tol = baseline.get("tolerance", {})
+    for metric, (value, higher_better) in flatten(results).items():
+        if metric not in base:
+            continue
+        ref = base[metric][0]
+        allowed = tol.get(metric, tolerance)
+        if ref <= 0:
+            continue
+        change = (ref - value) / ref if higher_better else (value - ref) / ref
+        if change > allowed:
+            regressions.append(f"{metric}: {value:,.1f} vs baseline {ref:,.1f} ({change:+.0%} worse, allowed {allowed:.0%})")
+    return regressions
+
+
+def _meta(scale: float) -> Dict[str, Any]:
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "node": platform.node(), "scale": scale}
+
+
+def run_all(scale: float = 1.0) -> Dict[str, Any]:
+    return {"meta": _meta(scale), "micro": bench_micro(scale), "runs": bench_runs(scale)}
+
+
+def combine_passes(passes: List[Dict[str, Any]], floor: float = DEFAULT_TOLERANCE) -> Dict[str, Any]:
+    """
+    Baseline from several full passes: the median of each metric across passes, its relative
+    spread (scaled median absolute deviation / median, robust to one stalled pass) and a
+    tolerance of max(floor, SPREAD_FACTOR x spread), capped at MAX_TOLERANCE. Noisy metrics
+    get wider gates instead of failing.
+    """
+    first = passes[0]
+    out: Dict[str, Any] = {
+        "meta": dict(first["meta"], passes=len(passes)),
+        "micro": {},
+        "runs": {name: {} for name in first["runs"]},
+        "spread": {},
+        "tolerance": {},
+    }
+    for name in first["micro"]:
+        values = [p["micro"][name] for p in passes]
+        out["micro"][name] = statistics.median(values)
+        _record_spread(out, f"{name}.ns_per_op", values, floor)
+    for name in first["runs"]:
+        for key in ("runs_per_sec", "ns_per_day"):
+            values = [p["runs"][name][key] for p in passes]
+            out["runs"][name][key] = statistics.median(values)
+            _record_spread(out, f"{name}.{key}", values, floor)
+    return out
+
+
+def _record_spread(out: Dict[str, Any], metric: str, values: List[float], floor: float) -> None:
+    mid = statistics.median(values)
+    mad = statistics.median(abs(v - mid) for v in values)
+    spread = 1.4826 * mad / mid if mid > 0 else 0.0
+    out["spread"][metric] = round(spread, 4)
+    out["tolerance"][metric] = round(min(MAX_TOLERANCE, max(floor, SPREAD_FACTOR * spread)), 3)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Engine microbenchmarks with baseline regression check.")
+    parser.add_argument("--scale", type=float, default=1.0, help="iteration multiplier")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as this machine's baseline (medians and spread-sized tolerances)")
+    parser.add_argument("--passes", type=int, default=None,
+                        help="full benchmark passes (default: 1, or 5 with --save-baseline)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown for metrics without a saved tolerance; floor when saving")
+    parser.add_argument("--skip-equivalence", action="store_true")
+    args = parser.parse_args()
+
+    status = 0
+    if not args.skip_equivalence:
+        problems = check_equivalence()
+        if problems:
+            print(f"EQUIVALENCE FAILED ({len(problems)} mismatches):")
+            for line in problems[:20]:
+                print("  " + line)
+            status = 1
+        else:
+            print("Equivalence: resolve_day == apply_choice == engine.rules (fixed seeds)")
+
+    passes = args.passes or (5 if args.save_baseline else 1)
+    if passes < 1:
+        parser.error("--passes must be >= 1")
+    results = combine_passes([run_all(args.scale) for _ in range(passes)], args.tolerance)
+    for name, ns in results["micro"].items():
+        print(f"{name:<40} {ns:>12,.0f} ns/op")
+    for name, vals in results["runs"].items():
+        print(f"{name:<40} {vals['runs_per_sec']:>12,.0f} runs/s {vals['ns_per_day']:>10,.0f} ns/day")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Baseline written to {args.baseline} ({passes} passes)")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        recorded = baseline.get("meta", {})
+        here = _meta(args.scale)
+        if any(recorded.get(k) != here[k] for k in ("python", "machine", "node", "scale")):
+            print("WARNING: baseline was recorded on another machine, Python or scale; "
+                  "regenerate it here with --save-baseline before relying on the gate.")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"REGRESSIONS vs {args.baseline}:")
+            for line in regressions:
+                print("  " + line)
+            status = 1
+        else:
+            print(f"No regressions vs baseline (per-metric tolerances, default {args.tolerance:.0%}).")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+from __future__ import annotations
+from array import array
+from typing import List, Optional, Union
+
+from engine.game import GameState, ScenarioOrder
+from engine.journal import DayResult
+from engine.player import Player
+from engine.scenarios import scenarios as SCENARIOS
+from engine.config import DIFF_CFG, STARTS, CAUSES
+from engine.tables import TABLES
+
+_CAUSE_CODE = {name: i for i, name in enumerate(CAUSES)}
+
+# Packed stats: one byte each, low -> high: hp | food | morale | low_food | low_morale
+_BITS = 8
+_MASK = (1 << _BITS) - 1
+
+# Flags byte: bit0 over, bit1 won, bits2.. cause code
+_OVER = 1
+_WON = 2
+
+
+def pack_stats(hp: int, food: int, morale: int, low_food: int, low_morale: int) -> int:
+    return hp | (food << 8) | (morale << 16) | (low_food << 24) | (low_morale << 32)
+
+
+def unpack_stats(packed: int):
+    return tuple((packed >> shift) & _MASK for shift in (0, 8, 16, 24, 32))
+
+
+class CompactState:
+    """
+    Memory-light, hashable snapshot of a GameState.
+    Stats live in one packed int, the scenario order is a bytes blob of uint16
+    indices into engine.scenarios.scenarios (or, for a lazy ScenarioOrder, its int
+    permutation key, so large libraries stay O(1)), and the journal is not kept
+    (pass it back to to_state() if it should survive the round-trip).
+    Max stats and cfg are implied by the difficulty (STARTS / DIFF_CFG). The run's
+    RNG is not part of the key; to_state() gives it a fresh one (engine.save keeps it).
+    """
+    __slots__ = ("difficulty", "num_days", "day", "stats", "flags", "order", "_hash")
+
+    def __init__(self, difficulty: str, num_days: int, day: int, stats: int, flags: int,
+                 order: Union[bytes, int]):
+        self.difficulty = difficulty
+        self.num_days = num_days
+        self.day = day
+        self.stats = stats
+        self.flags = flags
+        self.order = order
+        self._hash: Optional[int] = None
+
+    # ---- Decoded views ----
+
+    @property
+    def hp(self) -> int:
+        return self.stats & _MASK
+
+    @property
+    def food(self) -> int:
+        return (self.stats >> 8) & _MASK
+
+    @property
+    def morale(self) -> int:
+        return (self.stats >> 16) & _MASK
+
+    @property
+    def low_food(self) -> int:
+        return (self.stats >> 24) & _MASK
+
+    @property
+    def low_morale(self) -> int:
+        return (self.stats >> 32) & _MASK
+
+    @property
+    def over(self) -> bool:
+        return bool(self.flags & _OVER)
+
+    @property
+    def won(self) -> bool:
+        return bool(self.flags & _WON)
+
+    @property
+    def cause_of_death(self) -> str:
+        return CAUSES[self.flags >> 2]
+
+    def scenario_indices(self) -> List[int]:
+        if isinstance(self.order, int):
+            perm = ScenarioOrder(self.order, self.num_days).perm
+            return [perm(i) for i in range(self.num_days)]
+        return array("H", self.order).tolist()
+
+    # ---- Hashing / equality (cache keys) ----
+
+    def _key(self):
+        return (self.difficulty, self.num_days, self.day, self.stats, self.flags, self.order)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactState):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(self._key())
+        return self._hash
+
+    def __repr__(self) -> str:
+        return (f"CompactState({self.difficulty!r}, day={self.day}/{self.num_days}, "
+                f"hp={self.hp}, food={self.food}, morale={self.morale}, "
+                f"low_food={self.low_food}, low_morale={self.low_morale}, flags={self.flags})")
+
+    # ---- Round-trip ----
+
+    @classmethod
+    def from_state(cls, state: GameState) -> "CompactState":
+        if state.endless:
+            raise ValueError("Endless runs have no finite scenario order to pack.")
+        p = state.player
+        flags = (_OVER if state.over else 0) | (_WON if state.won else 0)
+        flags |= _CAUSE_CODE.get(state.cause_of_death, 0) << 2
+        if isinstance(state.scenario_order, ScenarioOrder):
+            order = state.scenario_order.key
+        elif len(SCENARIOS) > 0xFFFF:
+            raise ValueError(f"A listed scenario order holds uint16 indices; the library has {len(SCENARIOS)}.")
+        else:
+            order = array("H", map(TABLES.index_of, state.scenario_order)).tobytes()
+        return cls(
+            difficulty=state.difficulty,
+            num_days=state.num_days,
+            day=state.day,
+            stats=pack_stats(p.hp, p.food, p.morale, p.low_food, p.low_morale),
+            flags=flags,
+            order=order,
+        )
+
+    def to_state(self, journal: Optional[List[DayResult]] = None) -> GameState:
+        starts = STARTS[self.difficulty]
+        player = Player(
+            hp=self.hp,
+            food=self.food,
+            morale=self.morale,
+            hp_max=starts["hp_max"],
+            food_max=starts["food_max"],
+            morale_max=starts["morale_max"],
+            difficulty=self.difficulty,
+        )
+        player.low_food = self.low_food
+        player.low_morale = self.low_morale
+        player.cause_of_death = self.cause_of_death
+        return GameState(
+            difficulty=self.difficulty,
+            cfg=DIFF_CFG[self.difficulty],
+            num_days=self.num_days,
+            day=self.day,
+            player=player,
+            scenario_order=(ScenarioOrder(self.order, self.num_days) if isinstance(self.order, int)
+                            else [SCENARIOS[i] for i in self.scenario_indices()]),
+            journal=list(journal) if journal is not None else [],
+            over=self.over,
+            cause_of_death=self.cause_of_death,
+            won=self.won,
+        )
+
+
+def compact(state: GameState) -> CompactState:
+    return CompactState.from_state(state)
+
+
+def expand(cs: CompactState, journal: Optional[List[DayResult]] = None) -> GameState:
+    return cs.to_state(journal)
@@ -37,4 +37,18 @@ DIFF_SCORE_MULT = {
     "easy": 1.0, 
     "normal": 2.0, 
     "hard": 3.0
-}
\ No newline at end of file
+}
+
+### SURPRISE WEIGHT OVERRIDES ###
+# event key -> weight; events not listed keep their base weight from engine.scenarios
+SURPRISE_WEIGHTS = {
+    "easy": {},
+    "normal": {},
+    "hard": {},
+}
+
+### CAUSES OF DEATH (index = compact code) ###
+CAUSES = ("None", "Injury", "Starvation", "Hopelessness")
+
+### DIFFICULTIES (index = compact code) ###
+DIFFICULTIES = ("easy", "normal", "hard")
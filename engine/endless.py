@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Callable, Dict, Optional
+import argparse
+import json
+import resource
+import sys
+import time
+import tracemalloc
+
+from engine.game import GameState, start_endless_run, resolve_day, get_today_scenario, final_score
+from engine.config import STARTS, DIFFICULTIES
+from engine.tables import SIDE_L, SIDE_R
+from engine.tournament import BUILTIN_POLICIES, load_policy
+
+# ---------- Endless bot runs ----------
+# Soak test for endless mode: plays one endless run for a fixed number of days and reports
+# throughput and memory as it goes. The stats formulas make long survival rare, so --revive
+# puts the player back at the starting stats on death instead of ending the run; the stream,
+# journal, day counter and score keep running.
+
+
+def revive(state: GameState) -> None:
+    starts = STARTS[state.difficulty]
+    p = state.player
+    p.hp, p.food, p.morale = starts["hp"], starts["food"], starts["morale"]
+    p.low_food = p.low_morale = 0
+    p.cause_of_death = state.cause_of_death = "None"
+    state.over = False
+    state.day += 1
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux (bytes on macOS); peak, so flat memory shows as a flat line
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def play_endless(
+    state: GameState,
+    policy,
+    days: int,
+    *,
+    revive_dead: bool = False,
+    report_every: int = 0,
+    on_report: Optional[Callable[[Dict[str, float]], None]] = None,
+) -> Dict[str, float]:
+    """Play until the player dies (or for `days` days with revive_dead); returns final stats."""
+    played = deaths = 0
+    t0 = time.perf_counter()
+
+    def report() -> Dict[str, float]:
+        elapsed = time.perf_counter() - t0
+        stats = {
+            "days": played,
+            "deaths": deaths,
+            "score": final_score(state),
+            "days_per_s": played / elapsed if elapsed else 0.0,
+            "peak_rss_mb": _rss_mb(),
+            "journal": len(state.journal) if state.journal is not None else 0,
+        }
+        if tracemalloc.is_tracing():
+            stats["traced_mb"] = tracemalloc.get_traced_memory()[0] / 1e6
+        return stats
+
+    while played < days:
+        choice = policy(state, get_today_scenario(state))
+        resolve_day(state, SIDE_R if choice == "R" else SIDE_L)
+        played += 1
+        if state.over:
+            deaths += 1
+            if not revive_dead:
+                break
+            revive(state)
+        if report_every and on_report is not None and played % report_every == 0 and played < days:
+            on_report(report())
+    return report()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Play one endless run with a bot and watch memory stay flat.")
+    parser.add_argument("difficulty", choices=DIFFICULTIES)
+    parser.add_argument("-p", "--policy", default="greedy",
+                        help=f"built-in ({', '.join(p for p in BUILTIN_POLICIES if p != 'optimal')}) or module:attr")
+    parser.add_argument("--days", type=int, default=1_000_000)
+    parser.add_argument("--revive", action="store_true", help="restart stats on death instead of ending the run")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--journal", type=int, default=1000, help="days kept in memory (0 = no journal)")
+    parser.add_argument("--spill", metavar="PATH", help="append evicted journal days to this file")
+    parser.add_argument("--report-every", type=int, default=100_000)
+    parser.add_argument("--trace", action="store_true", help="also report tracemalloc's live Python memory (slower)")
+    parser.add_argument("--json", action="store_true", help="print the final stats as JSON")
+    args = parser.parse_args()
+
+    if args.policy == "optimal":
+        parser.error("the solver policy needs a last day; endless runs have none")
+    policy = load_policy(args.policy)
+    if hasattr(policy, "for_shard"):
+        policy = policy.for_shard(args.seed, 0)
+    if args.trace:
+        tracemalloc.start()
+
+    state = start_endless_run(args.difficulty, journal_days=args.journal or None,
+                              spill_path=args.spill, seed=args.seed)
+
+    def show(stats: Dict[str, float]) -> None:
+        traced = f"  traced {stats['traced_mb']:6.2f} MB" if "traced_mb" in stats else ""
+        print(f"day {stats['days']:>10,}  deaths {stats['deaths']:>8,}  {stats['days_per_s']:>9,.0f} days/s  "
+              f"peak RSS {stats['peak_rss_mb']:6.1f} MB{traced}", flush=True)
+
+    try:
+        stats = play_endless(state, policy, args.days, revive_dead=args.revive,
+                             report_every=0 if args.json else args.report_every, on_report=show)
+    finally:
+        if state.journal is not None:
+            state.journal.close()
+    if args.json:
+        print(json.dumps(stats))
+    else:
+        show(stats)
+        print(f"final score {stats['score']}" + ("" if args.revive else f" ({state.cause_of_death})"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,34 +1,168 @@
 from __future__ import annotations
+from collections import deque
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
+from time import perf_counter_ns
 import random
 
 from engine.player import Player
-from engine.scenarios import scenarios as SCENARIOS, get_random_event
-from engine.config import NUM_DAYS, DIFF_CFG, STARTS, DIFF_SCORE_MULT
-from engine.utils import clamp
+from engine.scenarios import scenarios as SCENARIOS, surprise_sampler
+from engine.config import NUM_DAYS, DIFF_CFG, STARTS, DIFF_SCORE_MULT, CAUSES
+from engine.tables import (
+    TABLES, CfgEntry, compile_cfg,
+    RESULTS, RESULT_NEUTRAL, RESULT_SUCCESS, RESULT_FAILURE, SIDE_L, SIDE_R,
+)
+from engine.journal import DayResult, JournalRing, journal_lines, log_text, surprise_text
+from engine.utils import clamp, FeistelPermutation, WyRand
+
+# Libraries at least this large get a lazy ScenarioOrder; smaller ones keep rng.sample
+# (a handful of list slots, and the draws existing seeds, replays and saves were made with).
+LAZY_ORDER_MIN_SCENARIOS = 256
+
+# Endless runs: a scenario never comes back within this many days (capped by library size)
+REPEAT_WINDOW = 4
+ENDLESS_JOURNAL_DAYS = 1000
+
+# Instrumentation: an object with phase(name, ns, delta) and day(state, result) methods
+# (see engine.instrument). resolve_day tests it once per day (apply_choice once more, for
+# its outcome phase); while it is None they run the plain phase helpers and nothing else.
+_OBSERVER = None
+PHASES = ("choice", "surprise", "decay", "death", "journal", "outcome")
+NO_DELTA = (0, 0, 0)
+
+
+def set_observer(observer) -> Any:
+    """Install the engine observer for this process (None to remove); returns the previous one."""
+    global _OBSERVER
+    previous, _OBSERVER = _OBSERVER, observer
+    return previous
 
 # ---------- Engine-facing data structures ----------
 
-@dataclass
+class ScenarioOrder(Sequence):
+    """
+    A run's no-repeat scenario order without the list: day i's scenario is
+    SCENARIOS[perm(i)] for a keyed permutation of the whole library, computed on
+    access. O(1) time and memory per run regardless of library size.
+    """
+    __slots__ = ("key", "perm", "length")
+
+    def __init__(self, key: int, length: int):
+        self.key = key
+        self.perm = FeistelPermutation(len(SCENARIOS), key)
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.length))]
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError("scenario order index out of range")
+        return SCENARIOS[self.perm(i)]
+
+    def __repr__(self) -> str:
+        return f"ScenarioOrder({self.length} of {self.perm.n})"
+
+
+class ScenarioStream:
+    """
+    Unbounded scenario source for endless runs: back-to-back reshuffled cycles of the whole
+    library (one keyed permutation per cycle), holding back any scenario seen in the last
+    `window` days until it may come again. Forward-only; memory is O(window).
+    """
+    __slots__ = ("key", "window", "cycle", "perm", "pos", "recent", "pending", "index", "current")
+
+    def __init__(self, key: int, window: int = REPEAT_WINDOW):
+        self.key = key
+        # window <= (n - 1) // 2 guarantees a cycle can always supply a scenario outside it
+        self.window = max(0, min(window, (len(SCENARIOS) - 1) // 2))
+        self.cycle = 0
+        self.perm = FeistelPermutation(len(SCENARIOS), key)
+        self.pos = 0
+        self.recent: deque = deque(maxlen=self.window)
+        self.pending: List[int] = []  # pulled while still in the window; always <= window long
+        self.index = 0
+        self.current = self._next()
+
+    def _next(self) -> int:
+        recent = self.recent
+        for j, s in enumerate(self.pending):
+            if s not in recent:
+                del self.pending[j]
+                break
+        else:
+            while True:
+                if self.pos == self.perm.n:
+                    self.cycle += 1
+                    # Round keys are hashed from this inside FeistelPermutation
+                    self.perm = FeistelPermutation(self.perm.n, self.key + self.cycle)
+                    self.pos = 0
+                s = self.perm(self.pos)
+                self.pos += 1
+                if s not in recent:
+                    break
+                self.pending.append(s)
+        if self.window:
+            recent.append(s)
+        return s
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        """Day i's scenario (0-based); i may only move forward from the last day asked for."""
+        if i < self.index:
+            raise IndexError("ScenarioStream only moves forward")
+        while self.index < i:
+            self.current = self._next()
+            self.index += 1
+        return SCENARIOS[self.current]
+
+    def __iter__(self):
+        raise TypeError("ScenarioStream is unbounded; index it by day instead")
+
+    def __repr__(self) -> str:
+        return f"ScenarioStream(day {self.index + 1}, cycle {self.cycle}, window {self.window})"
+
+
+@dataclass(slots=True)
 class GameState:
     difficulty: str
     cfg: Dict[str, Any]
     num_days: int
     day: int
     player: Player
-    scenario_order: List[Dict[str, Any]]  # length == num_days
-    event_log: List[str] = field(default_factory=list)
+    scenario_order: Sequence  # length == num_days; a list, or a ScenarioOrder for large libraries
+    journal: Optional[List[DayResult]] = field(default_factory=list)  # None = journaling off
     over: bool = False
     cause_of_death: str = "None"
     won: bool = False
+    rng: WyRand = field(default_factory=lambda: WyRand(random.getrandbits(64)))  # every draw of this run comes from here
+    endless: bool = False  # no last day: scenario_order is a ScenarioStream, num_days is 0
+
+    @property
+    def event_log(self) -> List[str]:
+        """Human-readable journal lines, formatted on demand from the structured records."""
+        return journal_lines(self.journal)
 
 
 # ---------- Public API ----------
 
-def start_run(difficulty: str, num_days: Optional[int] = None) -> GameState:
+def start_run(
+    difficulty: str,
+    num_days: Optional[int] = None,
+    journal: bool = True,
+    seed: Optional[int] = None,
+) -> GameState:
     """
-    Initialize a new run: pick difficulty, create player, and sample a no-repeat scenario order.
+    Initialize a new run: pick difficulty, create player, and sample a no-repeat scenario order
+    (resolved day by day from a permutation key for large libraries, see ScenarioOrder).
+    journal=False skips day records entirely (bulk sims, bots).
+    The run owns its RNG (a small-state WyRand, 8 bytes of state): seeded with `seed` when
+    given (the run is then reproducible on its own), otherwise from one draw of the module-global random, so random.seed() still
+    makes a script deterministic.
     """
     difficulty = difficulty.lower()
     if difficulty not in STARTS:
@@ -51,7 +185,11 @@ def start_run(difficulty: str, num_days: Optional[int] = None) -> GameState:
         difficulty=difficulty,
     )
 
-    order = random.sample(SCENARIOS, k=n)
+    rng = WyRand(seed if seed is not None else random.getrandbits(64))
+    if len(SCENARIOS) >= LAZY_ORDER_MIN_SCENARIOS:
+        order = ScenarioOrder(rng.getrandbits(64), n)
+    else:
+        order = rng.sample(SCENARIOS, k=n)
 
     return GameState(
         difficulty=difficulty,
@@ -60,17 +198,174 @@ def start_run(difficulty: str, num_days: Optional[int] = None) -> GameState:
         day=1,
         player=player,
         scenario_order=order,
+        journal=[] if journal else None,
+        rng=rng,
     )
 
 
+def start_endless_run(
+    difficulty: str,
+    journal_days: Optional[int] = ENDLESS_JOURNAL_DAYS,
+    spill_path: Optional[str] = None,
+    seed: Optional[int] = None,
+    window: int = REPEAT_WINDOW,
+) -> GameState:
+    """
+    A run with no last day, played until the player dies. Memory stays flat however long
+    it lasts: scenarios stream from a ScenarioStream and the journal is a JournalRing of
+    the last `journal_days` days (None = journaling off), spilled to `spill_path` if given.
+    """
+    state = start_run(difficulty, num_days=0, journal=False, seed=seed)
+    state.endless = True
+    state.scenario_order = ScenarioStream(state.rng.getrandbits(64), window)
+    if journal_days:
+        state.journal = JournalRing(journal_days, spill_path)
+    return state
+
+
 def get_today_scenario(state: GameState) -> Dict[str, Any]:
     """
     Returns the scenario for the current day. Caller should check is_over() first.
     """
+    if state.endless:
+        return state.scenario_order[state.day - 1]
     index = max(0, min(state.day - 1, state.num_days - 1))
     return state.scenario_order[index]
 
 
+def resolve_day(state: GameState, side: int) -> DayResult:
+    """
+    Fast path for one day on the precompiled tables; same rules and RNG draws as apply_choice.
+    side is SIDE_L (0) or SIDE_R (1). Caller must check is_over() first.
+    The day runs as the phase helpers below; with an observer attached the same helpers
+    run under _resolve_day_observed, which times each of them.
+    """
+    if _OBSERVER is not None:
+        return _resolve_day_observed(state, side, _OBSERVER)
+    day = state.day
+    cfg = compile_cfg(state.cfg)
+    s_idx, effect, result, hp, food, morale = _choice_phase(state, side, cfg)
+    surprise, hp, food, morale = _surprise_phase(state, cfg, hp, food, morale)
+    _decay_phase(state.player, cfg, hp, food, morale)
+    res = DayResult(day, s_idx, side, result, effect, surprise, _death_phase(state, cfg, day))
+    if state.journal is not None:
+        state.journal.append(res)
+    return res
+
+
+def _resolve_day_observed(state: GameState, side: int, obs) -> DayResult:
+    """
+    resolve_day with the clock read around each phase (not around the observer calls);
+    each phase reports its time and the stat change it applied.
+    """
+    clock = perf_counter_ns
+    t0 = clock()
+    day = state.day
+    cfg = compile_cfg(state.cfg)
+    p = state.player
+    s_idx, effect, result, hp, food, morale = _choice_phase(state, side, cfg)
+    obs.phase("choice", clock() - t0, (hp - p.hp, food - p.food, morale - p.morale))
+
+    t0 = clock()
+    surprise, hp1, food1, morale1 = _surprise_phase(state, cfg, hp, food, morale)
+    obs.phase("surprise", clock() - t0, (hp1 - hp, food1 - food, morale1 - morale))
+
+    t0 = clock()
+    _decay_phase(p, cfg, hp1, food1, morale1)
+    obs.phase("decay", clock() - t0, (p.hp - hp1, p.food - food1, p.morale - morale1))
+
+    t0 = clock()
+    death = _death_phase(state, cfg, day)
+    obs.phase("death", clock() - t0, NO_DELTA)
+
+    t0 = clock()
+    res = DayResult(day, s_idx, side, result, effect, surprise, death)
+    if state.journal is not None:
+        state.journal.append(res)
+    obs.phase("journal", clock() - t0, NO_DELTA)
+    obs.day(state, res)
+    return res
+
+
+# ---------- Day phases (shared by resolve_day and its observed variant) ----------
+
+def _choice_phase(state: GameState, side: int, cfg: CfgEntry):
+    """Roll the chosen side; returns (scenario index, effect, result, hp, food, morale) after it."""
+    s_idx = TABLES.index_of(get_today_scenario(state))
+    chosen = TABLES.scenarios[s_idx].sides[side]
+    if chosen.chance is None:
+        effect = chosen.success
+        result = RESULT_NEUTRAL
+    else:
+        prob = clamp(chosen.chance + cfg.risk_success_bonus, 0.05, 0.95)
+        if state.rng.random() <= prob:
+            effect, result = chosen.success, RESULT_SUCCESS
+        else:
+            effect, result = chosen.failure, RESULT_FAILURE
+    p = state.player
+    dh, df, dm = effect
+    return (
+        s_idx, effect, result,
+        max(0, min(p.hp + dh, p.hp_max)),
+        max(0, min(p.food + df, p.food_max)),
+        max(0, min(p.morale + dm, p.morale_max)),
+    )
+
+
+def _surprise_phase(state: GameState, cfg: CfgEntry, hp: int, food: int, morale: int):
+    """Maybe draw a surprise; returns (surprise index or -1, hp, food, morale) after it."""
+    rng = state.rng
+    if rng.random() >= cfg.surprise_chance:
+        return -1, hp, food, morale
+    surprise = surprise_sampler(state.difficulty).sample(rng)
+    sh, sf, sm = TABLES.surprises[surprise]
+    p = state.player
+    return (
+        surprise,
+        max(0, min(hp + sh, p.hp_max)),
+        max(0, min(food + sf, p.food_max)),
+        max(0, min(morale + sm, p.morale_max)),
+    )
+
+
+def _decay_phase(p: Player, cfg: CfgEntry, hp: int, food: int, morale: int) -> None:
+    """Daily decay (mirrors Player.daily_decay); stores the day's final stats on the player."""
+    food = max(0, min(food - 1, p.food_max))
+    low_food = p.low_food
+    if food <= 0:
+        low_food += 1
+        hp = max(0, min(hp - 1, p.hp_max))
+        if low_food % cfg.starve_every == 0:
+            morale = max(0, min(morale - 1, p.morale_max))
+    else:
+        low_food = 0
+    low_morale = p.low_morale + 1 if morale <= 0 else 0
+    p.hp, p.food, p.morale, p.low_food, p.low_morale = hp, food, morale, low_food, low_morale
+
+
+def _death_phase(state: GameState, cfg: CfgEntry, day: int) -> int:
+    """Death & win checks; ends the run or advances the day. Returns the death code (0: alive)."""
+    p = state.player
+    death = 0
+    if p.hp <= 0:
+        death = 1
+    elif p.low_food >= cfg.low_food_death_days:
+        death = 2
+    elif p.low_morale >= cfg.low_morale_death_days:
+        death = 3
+
+    if death:
+        state.over = True
+        state.won = False
+        state.cause_of_death = p.cause_of_death = CAUSES[death]
+    elif day >= state.num_days and not state.endless:
+        state.over = True
+        state.won = True
+    else:
+        state.day = day + 1
+    return death
+
+
 def apply_choice(state: GameState, choice: str) -> Dict[str, Any]:
     """
     Core transition for one day:
@@ -90,97 +385,14 @@ def apply_choice(state: GameState, choice: str) -> Dict[str, Any]:
     if choice not in ("L", "R"):
         choice = "L"  # default fallback
 
-    scenario = get_today_scenario(state)
-    chosen = scenario["left_choice"] if choice == "L" else scenario["right_choice"]
-
-    # ---- Resolve main effect (chance or flat effects) ----
-    if "chance" in chosen:
-        p = clamp(chosen["chance"] + state.cfg.get("risk_success_bonus", 0.0), 0.05, 0.95)
-        success = (random.random() <= p)
-        effect = chosen["success_effects"] if success else chosen["failure_effects"]
-        result = "success" if success else "failure"
-        log_text = f"{chosen['log_text']} {'Success!' if success else 'Failure...'}"
-    else:
-        effect = chosen["effects"]
-        result = "neutral"
-        log_text = chosen["log_text"]
-
-    # ---- Apply main effect ----
-    state.player.apply_effects(
-        hp=effect.get("hp", 0),
-        food=effect.get("food", 0),
-        morale=effect.get("morale", 0),
-    )
-
-    # ---- Surprise event ----
-    surprise_raw = get_random_event(state.cfg.get("surprise_chance", 0.2))
-    surprise: Optional[Dict[str, Any]] = None
-    if surprise_raw != -1:
-        # strip textless keys, so we can use **
-        surprise = {
-            k: v for k, v in surprise_raw.items()
-            if k in ("hp", "food", "morale")
-        }
-        state.player.apply_effects(
-            hp=surprise.get("hp", 0),
-            food=surprise.get("food", 0),
-            morale=surprise.get("morale", 0),
-        )
-
-    # ---- Daily decay ----
-    state.player.daily_decay(state.cfg)
-
-    # ---- Compose deltas we just applied (for logging/UI) ----
-    effect_delta = {
-        "hp": effect.get("hp", 0),
-        "food": effect.get("food", 0),
-        "morale": effect.get("morale", 0),
-    }
-    surprise_text: Optional[str] = None
-    if surprise_raw != -1:
-        surprise_text = surprise_raw["text"]
-
-    # ---- Death & win checks ----
-    death: Optional[str] = None
-    if not state.player.is_alive():
-        death = "Injury"
-    elif state.player.low_food >= state.cfg.get("low_food_death_days", 3):
-        death = "Starvation"
-    elif state.player.low_morale >= state.cfg.get("low_morale_death_days", 3):
-        death = "Hopelessness"
-
-    if death:
-        state.over = True
-        state.won = False
-        state.cause_of_death = death
-        state.player.cause_of_death = death
-    else:
-        # Survived the day
-        if state.day >= state.num_days:
-            state.over = True
-            state.won = True
-        else:
-            state.day += 1
-
-    # ---- Append a compact log line to state (engine keeps a journal, UI may show/ignore) ----
-    delta_fmt = f"(HP {effect_delta['hp']:+}, Food {effect_delta['food']:+}, Morale {effect_delta['morale']:+})"
-    entry = f"Day {max(1, state.day if state.over else state.day-1)}: {scenario['description']} -> {choice} | {log_text} {delta_fmt}"
-    state.event_log.append(entry)
-    if surprise_text:
-        state.event_log.append(f"    • Surprise: {surprise_text}")
-
-    # ---- Build UI-facing outcome ----
-    outcome = {
-        "log_text": log_text,
-        "result": result,  # "success" | "failure" | "neutral"
-        "effect": effect_delta,
-        "surprise": {"text": surprise_text} if surprise_text else None,
-        "stats_after": {"hp": state.player.hp, "food": state.player.food, "morale": state.player.morale},
-        "death": death,          # None or reason
-        "won": state.over and state.won,
-        "day": state.day,        # current day index after resolution (advanced if survived)
-        "num_days": state.num_days,
-    }
+    side = SIDE_R if choice == "R" else SIDE_L
+    obs = _OBSERVER
+    if obs is None:
+        return _outcome(state, resolve_day(state, side))
+    res = _resolve_day_observed(state, side, obs)
+    t0 = perf_counter_ns()
+    outcome = _outcome(state, res)
+    obs.phase("outcome", perf_counter_ns() - t0, NO_DELTA)
     return outcome
 
 
@@ -193,8 +405,10 @@ def final_score(state: GameState) -> int:
     Score mirrors your CLI formula, with optional difficulty multiplier.
     """
     # completed days: if run is over, we finished current day; otherwise we've completed day-1
+    # O(1) from the running day counter and current stats, so endless runs score without a clamp
     days_completed = state.day if state.over else max(0, state.day - 1)
-    days_completed = max(0, min(days_completed, state.num_days))
+    if not state.endless:
+        days_completed = max(0, min(days_completed, state.num_days))
 
     base = (days_completed * 10) + (state.player.hp * 5) + (state.player.food * 2) + (state.player.morale * 5)
     mult = DIFF_SCORE_MULT.get(state.difficulty, 1.0)
@@ -203,6 +417,23 @@ def final_score(state: GameState) -> int:
 
 # ---------- Helpers ----------
 
+def _outcome(state: GameState, res: DayResult) -> Dict[str, Any]:
+    """UI-facing outcome dict for a resolved day."""
+    surprise = surprise_text(res)
+    outcome = {
+        "log_text": log_text(res),
+        "result": RESULTS[res.result],  # "success" | "failure" | "neutral"
+        "effect": {"hp": res.effect[0], "food": res.effect[1], "morale": res.effect[2]},
+        "surprise": {"text": surprise} if surprise else None,
+        "stats_after": {"hp": state.player.hp, "food": state.player.food, "morale": state.player.morale},
+        "death": CAUSES[res.death] if res.death else None,  # None or reason
+        "won": state.over and state.won,
+        "day": state.day,        # current day index after resolution (advanced if survived)
+        "num_days": state.num_days,
+    }
+    return outcome
+
+
 def _outcome_stub(state: GameState, log_text: str) -> Dict[str, Any]:
     return {
         "log_text": log_text,
@@ -214,4 +445,4 @@ def _outcome_stub(state: GameState, log_text: str) -> Dict[str, Any]:
         "won": state.over and state.won,
         "day": state.day,
         "num_days": state.num_days,
-    }
\ No newline at end of file
+    }
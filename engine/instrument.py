@@ -0,0 +1,173 @@
+from __future__ import annotations
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from engine import game
+from engine.game import GameState, PHASES
+from engine.journal import DayResult
+from engine.scenarios import surprise_events as SURPRISES
+from engine.config import CAUSES
+from engine.tables import RESULTS, SIDES, Delta
+
+# ---------- Engine observers ----------
+# engine.game fires phase(name, ns, delta) for each phase of a day (PHASES; "outcome" only
+# from apply_choice) and day(state, result) once the day is resolved. Observers run only
+# while attached; with none attached the engine pays one `is None` test per call.
+
+
+class Observer:
+    """Base class with no-op hooks; override the ones you need."""
+
+    def phase(self, name: str, ns: int, delta: Delta) -> None:
+        pass
+
+    def day(self, state: GameState, result: DayResult) -> None:
+        pass
+
+
+class Fanout(Observer):
+    """Forwards every hook to several observers, in order."""
+
+    def __init__(self, observers: Sequence[Observer]):
+        self.observers = tuple(observers)
+
+    def phase(self, name: str, ns: int, delta: Delta) -> None:
+        for obs in self.observers:
+            obs.phase(name, ns, delta)
+
+    def day(self, state: GameState, result: DayResult) -> None:
+        for obs in self.observers:
+            obs.day(state, result)
+
+
+@contextmanager
+def attach(*observers: Observer) -> Iterator[Observer]:
+    """Install observers on the engine for the duration of the block (restores the previous one)."""
+    obs = observers[0] if len(observers) == 1 else Fanout(observers)
+    previous = game.set_observer(obs)
+    try:
+        yield obs
+    finally:
+        game.set_observer(previous)
+
+
+# ---------- Built-in observers ----------
+
+class PhaseTimer(Observer):
+    """Per-phase call counts, totals and log2 histograms of nanoseconds; mergeable across processes."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+        self.total_ns: Counter = Counter()
+        self.max_ns: Dict[str, int] = {}
+        self.buckets: Dict[str, Counter] = {}  # phase -> bit_length(ns) -> count
+
+    def phase(self, name: str, ns: int, delta: Delta) -> None:
+        self.calls[name] += 1
+        self.total_ns[name] += ns
+        if ns > self.max_ns.get(name, 0):
+            self.max_ns[name] = ns
+        hist = self.buckets.get(name)
+        if hist is None:
+            hist = self.buckets[name] = Counter()
+        hist[ns.bit_length()] += 1
+
+    def merge(self, other: "PhaseTimer") -> "PhaseTimer":
+        self.calls.update(other.calls)
+        self.total_ns.update(other.total_ns)
+        for name, ns in other.max_ns.items():
+            self.max_ns[name] = max(ns, self.max_ns.get(name, 0))
+        for name, hist in other.buckets.items():
+            self.buckets.setdefault(name, Counter()).update(hist)
+        return self
+
+    def percentile(self, name: str, pct: float) -> int:
+        """Upper bound (ns) of the bucket holding the pct-th sample of a phase, capped at the max seen."""
+        hist = self.buckets.get(name)
+        if not hist:
+            return 0
+        rank = pct / 100.0 * self.calls[name]
+        seen = 0
+        for bucket in sorted(hist):
+            seen += hist[bucket]
+            if seen >= rank:
+                return min((1 << bucket) - 1 if bucket else 0, self.max_ns[name])
+        return self.max_ns[name]
+
+    def rows(self) -> List[Tuple[str, int, float, int, int, int]]:
+        """(phase, calls, mean ns, p50, p99, max) in engine phase order."""
+        names = [n for n in PHASES if n in self.calls] + sorted(set(self.calls) - set(PHASES))
+        return [
+            (n, self.calls[n], self.total_ns[n] / self.calls[n], self.percentile(n, 50),
+             self.percentile(n, 99), self.max_ns[n])
+            for n in names
+        ]
+
+    def format(self) -> List[str]:
+        total = sum(self.total_ns.values()) or 1
+        lines = [f"{'phase':<10} {'calls':>10} {'mean µs':>9} {'p50 µs':>8} {'p99 µs':>8} {'max µs':>9} {'share':>6}"]
+        for name, calls, mean, p50, p99, mx in self.rows():
+            lines.append(f"{name:<10} {calls:>10} {mean / 1e3:>9.2f} {p50 / 1e3:>8.2f} {p99 / 1e3:>8.2f} "
+                         f"{mx / 1e3:>9.1f} {100.0 * self.total_ns[name] / total:>5.1f}%")
+        return lines
+
+
+class EventCounter(Observer):
+    """Counts of days, sides, results, surprises and deaths, plus the stat deltas each phase applied."""
+
+    def __init__(self):
+        self.days = 0
+        self.sides: Counter = Counter()
+        self.results: Counter = Counter()
+        self.surprises: Counter = Counter()
+        self.deaths: Counter = Counter()
+        self.wins = 0
+        self.deltas: Dict[str, List[int]] = {}  # phase -> summed (hp, food, morale)
+
+    def phase(self, name: str, ns: int, delta: Delta) -> None:
+        if delta[0] or delta[1] or delta[2]:
+            acc = self.deltas.get(name)
+            if acc is None:
+                acc = self.deltas[name] = [0, 0, 0]
+            acc[0] += delta[0]
+            acc[1] += delta[1]
+            acc[2] += delta[2]
+
+    def day(self, state: GameState, result: DayResult) -> None:
+        self.days += 1
+        self.sides[SIDES[result.side]] += 1
+        self.results[RESULTS[result.result]] += 1
+        if result.surprise != -1:
+            self.surprises[SURPRISES[result.surprise].key] += 1
+        if result.death:
+            self.deaths[CAUSES[result.death]] += 1
+        elif state.over and state.won:
+            self.wins += 1
+
+    def merge(self, other: "EventCounter") -> "EventCounter":
+        self.days += other.days
+        self.sides.update(other.sides)
+        self.results.update(other.results)
+        self.surprises.update(other.surprises)
+        self.deaths.update(other.deaths)
+        self.wins += other.wins
+        for name, acc in other.deltas.items():
+            mine = self.deltas.setdefault(name, [0, 0, 0])
+            for i in range(3):
+                mine[i] += acc[i]
+        return self
+
+    def format(self) -> List[str]:
+        def counts(c: Counter) -> str:
+            return ", ".join(f"{k}={v}" for k, v in c.most_common()) or "none"
+
+        lines = [
+            f"days {self.days}   wins {self.wins}   deaths: {counts(self.deaths)}",
+            f"sides: {counts(self.sides)}   results: {counts(self.results)}",
+            f"surprises: {counts(self.surprises)}",
+        ]
+        for name in [n for n in PHASES if n in self.deltas]:
+            hp, food, morale = self.deltas[name]
+            lines.append(f"{name:<10} applied HP {hp:+}, Food {food:+}, Morale {morale:+}")
+        return lines
@@ -0,0 +1,127 @@
+from __future__ import annotations
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence
+import struct
+
+from engine.tables import TABLES, Delta, SIDES, RESULT_SUCCESS, RESULT_FAILURE
+
+# ---------- Structured journal ----------
+# The engine records one DayResult per resolved day; human-readable text is only
+# produced here, when a UI asks for it.
+
+
+class DayResult(NamedTuple):
+    """Compact record of one resolved day; codes index engine.tables / config.CAUSES."""
+    day: int          # the day that was resolved
+    scenario: int     # index into TABLES.scenarios
+    side: int         # SIDE_L | SIDE_R
+    result: int       # RESULT_NEUTRAL | RESULT_SUCCESS | RESULT_FAILURE
+    effect: Delta     # main effect as written in the scenario (hp, food, morale)
+    surprise: int     # index into TABLES.surprises, -1 if none
+    death: int        # index into CAUSES, 0 if the player survived
+
+
+def log_text(entry: DayResult) -> str:
+    """The chosen option's log text, with the Success!/Failure... suffix for chance choices."""
+    chosen = TABLES.scenarios[entry.scenario].sides[entry.side]
+    text = TABLES.text(chosen.log_id)
+    if entry.result == RESULT_SUCCESS:
+        return f"{text} Success!"
+    if entry.result == RESULT_FAILURE:
+        return f"{text} Failure..."
+    return text
+
+
+def surprise_text(entry: DayResult) -> Optional[str]:
+    if entry.surprise == -1:
+        return None
+    return TABLES.text(TABLES.surprise_text_ids[entry.surprise])
+
+
+def delta_text(effect: Delta) -> str:
+    return f"(HP {effect[0]:+}, Food {effect[1]:+}, Morale {effect[2]:+})"
+
+
+def format_entry(entry: DayResult) -> List[str]:
+    """Journal lines for one day: the day line, plus an indented surprise line if any."""
+    description = TABLES.text(TABLES.scenarios[entry.scenario].description_id)
+    lines = [
+        f"Day {entry.day}: {description} -> {SIDES[entry.side]} | {log_text(entry)} {delta_text(entry.effect)}"
+    ]
+    surprise = surprise_text(entry)
+    if surprise:
+        lines.append(f"    • Surprise: {surprise}")
+    return lines
+
+
+def format_journal(entries: Iterable[DayResult]) -> List[str]:
+    lines: List[str] = []
+    for entry in entries:
+        lines.extend(format_entry(entry))
+    return lines
+
+
+def journal_lines(journal: Optional[Sequence[DayResult]], last_days: Optional[int] = None) -> List[str]:
+    """Render a journal (or only its last N days); an empty list when journaling is off."""
+    if not journal:
+        return []
+    entries = journal if last_days is None else journal[-last_days:]
+    return format_journal(entries)
+
+
+# ---------- Bounded journal (endless runs) ----------
+
+_SPILL = struct.Struct("<IHBBbbbbB")  # day, scenario, side, result, effect x3, surprise, death
+
+
+class JournalRing:
+    """
+    Keeps only the last `maxlen` DayResults; older ones are dropped, or appended to a
+    binary spill file when `spill_path` is given (read back with read_spill). Supports the
+    list operations the UIs use: len, iteration, [-1], [-n:].
+    """
+    __slots__ = ("entries", "spill_path", "dropped", "_spill")
+
+    def __init__(self, maxlen: int = 1000, spill_path: Optional[str] = None):
+        self.entries: deque = deque(maxlen=maxlen)
+        self.spill_path = spill_path
+        self.dropped = 0  # evicted entries (written to the spill file when there is one)
+        self._spill = open(spill_path, "ab") if spill_path else None
+
+    def append(self, entry: DayResult) -> None:
+        entries = self.entries
+        if len(entries) == entries.maxlen:
+            if self._spill is not None:
+                old = entries[0]
+                self._spill.write(_SPILL.pack(old.day, old.scenario, old.side, old.result,
+                                              *old.effect, old.surprise, old.death))
+            self.dropped += 1
+        entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[DayResult]:
+        return iter(self.entries)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(islice(self.entries, *i.indices(len(self.entries))))
+        return self.entries[i]
+
+    def close(self) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+def read_spill(path: str) -> Iterator[DayResult]:
+    """Entries a JournalRing spilled to disk, oldest first."""
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(_SPILL.size * 4096)
+            if not chunk:
+                return
+            for d, sc, side, result, eh, ef, em, surprise, death in _SPILL.iter_unpack(chunk):
+                yield DayResult(d, sc, side, result, (eh, ef, em), surprise, death)
@@ -0,0 +1,426 @@
+from __future__ import annotations
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+from engine.utils import cache_dir, LRUCache
+
+# ---------- Compiled pack layout ----------
+# header | scenario records (fixed width) | text offsets ((n_texts + 1) x uint32) | UTF-8 text blob
+# Records hold numbers and text ids only, so startup maps the file and reads nothing else;
+# a scenario's text is decoded from the blob when something asks for it.
+
+MAGIC = b"SDGP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHIII32s")       # magic, version, scenarios, texts, blob bytes, source sha256
+_SIDE = "d3b3bII"                           # chance (NaN = flat), success, failure, text id, log id
+_SCENARIO = struct.Struct("<I" + _SIDE * 2)  # description id, left side, right side
+_OFFSET = struct.Struct("<I")
+
+MAX_SCENARIOS = 0xFFFF  # saves, compact states and journals store scenario indices as uint16
+STAT_KEYS = ("hp", "food", "morale")
+SIDE_KEYS = ("left_choice", "right_choice")
+
+_SCENARIO_KEYS = frozenset(("description",) + SIDE_KEYS)
+_FLAT_KEYS = frozenset(("text", "effects", "log_text"))
+_CHANCE_KEYS = frozenset(("text", "chance", "success_effects", "failure_effects", "log_text"))
+_PACK_KEYS = frozenset(("name", "scenarios"))
+
+Side = Tuple[Optional[float], Tuple[int, int, int], Tuple[int, int, int], int, int]
+Record = Tuple[int, Side, Side]
+
+
+# ---------- Parsing & validation ----------
+
+def parse_pack(raw: bytes, path: str) -> Dict[str, Any]:
+    """Decode a pack file: TOML for *.toml, JSON otherwise."""
+    if path.lower().endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{path}: reading TOML packs needs Python 3.11+ or the 'tomli' package.")
+        try:
+            return tomllib.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+            raise ValueError(f"{path}: {e}") from None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def _is_int(v: Any) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool)
+
+
+def _check_text(obj: Dict[str, Any], key: str, where: str, errors: List[str]) -> None:
+    v = obj.get(key)
+    if not isinstance(v, str) or not v.strip():
+        errors.append(f"{where}.{key}: expected a non-empty string")
+
+
+def _check_effects(obj: Any, where: str, errors: List[str]) -> None:
+    if not isinstance(obj, dict):
+        errors.append(f"{where}: expected a table of {'/'.join(STAT_KEYS)} deltas")
+        return
+    for key, v in obj.items():
+        if key not in STAT_KEYS:
+            errors.append(f"{where}.{key}: unknown stat (expected one of {', '.join(STAT_KEYS)})")
+        elif not _is_int(v) or not -127 <= v <= 127:
+            errors.append(f"{where}.{key}: expected an integer in [-127, 127], got {v!r}")
+
+
+def _check_choice(chosen: Any, where: str, errors: List[str]) -> None:
+    if not isinstance(chosen, dict):
+        errors.append(f"{where}: expected a table")
+        return
+    keys = _CHANCE_KEYS if "chance" in chosen else _FLAT_KEYS
+    for key in sorted(keys - chosen.keys()):
+        errors.append(f"{where}.{key}: missing")
+    for key in sorted(chosen.keys() - keys):
+        errors.append(f"{where}.{key}: unexpected key")
+    _check_text(chosen, "text", where, errors)
+    _check_text(chosen, "log_text", where, errors)
+    if "chance" in chosen:
+        chance = chosen["chance"]
+        if isinstance(chance, bool) or not isinstance(chance, (int, float)) or not 0.0 <= chance <= 1.0:
+            errors.append(f"{where}.chance: expected a number in [0, 1], got {chance!r}")
+        for key in ("success_effects", "failure_effects"):
+            if key in chosen:
+                _check_effects(chosen[key], f"{where}.{key}", errors)
+    elif "effects" in chosen:
+        _check_effects(chosen["effects"], f"{where}.effects", errors)
+
+
+def validate_scenarios(items: Any, max_errors: int = 50) -> List[str]:
+    """Schema errors as "scenarios[i].field: problem" strings; empty when the list is valid."""
+    errors: List[str] = []
+    if not isinstance(items, list) or not items:
+        return ["scenarios: expected a non-empty list"]
+    if len(items) > MAX_SCENARIOS:
+        errors.append(f"scenarios: at most {MAX_SCENARIOS} entries, got {len(items)}")
+    for i, sc in enumerate(items):
+        where = f"scenarios[{i}]"
+        if not isinstance(sc, dict):
+            errors.append(f"{where}: expected a table")
+            continue
+        for key in sorted(_SCENARIO_KEYS - sc.keys()):
+            errors.append(f"{where}.{key}: missing")
+        for key in sorted(sc.keys() - _SCENARIO_KEYS):
+            errors.append(f"{where}.{key}: unexpected key")
+        _check_text(sc, "description", where, errors)
+        for key in SIDE_KEYS:
+            if key in sc:
+                _check_choice(sc[key], f"{where}.{key}", errors)
+        if len(errors) >= max_errors:
+            break
+    return errors[:max_errors]
+
+
+def validate_pack(data: Any, path: str) -> List[Dict[str, Any]]:
+    """The pack's scenario list; raises ValueError listing every schema problem found."""
+    if not isinstance(data, dict):
+        errors = ["top level: expected a table with a 'scenarios' list"]
+    else:
+        errors = [f"{key}: unexpected top-level key" for key in sorted(data.keys() - _PACK_KEYS)]
+        if "name" in data and not isinstance(data["name"], str):
+            errors.append("name: expected a string")
+        errors += validate_scenarios(data.get("scenarios"))
+    if errors:
+        raise ValueError(f"{path}: invalid scenario pack:\n  " + "\n  ".join(errors))
+    return data["scenarios"]
+
+
+# ---------- Compiling ----------
+
+def _delta(effect: Dict[str, int]) -> Tuple[int, int, int]:
+    return (effect.get("hp", 0), effect.get("food", 0), effect.get("morale", 0))
+
+
+def compile_pack(items: List[Dict[str, Any]], source_hash: bytes) -> bytes:
+    """Flatten validated scenario dicts into the compiled layout (texts interned once)."""
+    texts: List[bytes] = []
+    text_ids: Dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        tid = text_ids.get(s)
+        if tid is None:
+            tid = text_ids[s] = len(texts)
+            texts.append(s.encode("utf-8"))
+        return tid
+
+    def side(chosen: Dict[str, Any]) -> tuple:
+        if "chance" in chosen:
+            chance = float(chosen["chance"])
+            success, failure = _delta(chosen["success_effects"]), _delta(chosen["failure_effects"])
+        else:
+            chance = math.nan
+            success = failure = _delta(chosen["effects"])
+        return (chance, *success, *failure, intern(chosen["text"]), intern(chosen["log_text"]))
+
+    records = [
+        _SCENARIO.pack(intern(sc["description"]), *side(sc["left_choice"]), *side(sc["right_choice"]))
+        for sc in items
+    ]
+    offsets = [0]
+    for t in texts:
+        offsets.append(offsets[-1] + len(t))
+    blob = b"".join(texts)
+    return b"".join([
+        _HEADER.pack(MAGIC, VERSION, len(items), len(texts), len(blob), source_hash),
+        *records,
+        struct.pack(f"<{len(offsets)}I", *offsets),
+        blob,
+    ])
+
+
+def compiled_path(source_hash: bytes) -> str:
+    return os.path.join(cache_dir("packs"), f"{source_hash.hex()[:32]}.sdgp")
+
+
+# ---------- Memory-mapped pack ----------
+
+class ScenarioPack(Sequence):
+    """
+    Read-only sequence of scenarios backed by a compiled, memory-mapped pack. Items are
+    PackScenario views that behave like the built-in scenario dicts. Views are created on
+    access and the most recent VIEW_CACHE of them kept, so memory stays bounded however much
+    of the pack a process touches. A view knows its own index; views of the same scenario
+    compare equal, so identity must not be relied on.
+    """
+
+    VIEW_CACHE = 1024
+
+    def __init__(self, buf, source: str = "<memory>"):
+        magic, version, count, n_texts, blob_size, digest = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{source}: not a v{VERSION} compiled scenario pack.")
+        self.source = source
+        self.source_hash = digest.hex()
+        self.n_texts = n_texts
+        self._buf = buf
+        self._count = count
+        self._offsets_at = _HEADER.size + count * _SCENARIO.size
+        self._blob_at = self._offsets_at + (n_texts + 1) * _OFFSET.size
+        if len(buf) != self._blob_at + blob_size:
+            raise ValueError(f"{source}: truncated compiled scenario pack.")
+        self._views = LRUCache(self.VIEW_CACHE)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        view = self._views.get(i)
+        if view is None:
+            if not 0 <= i < self._count:
+                raise IndexError("scenario index out of range")
+            view = self._views.put(i, PackScenario(self, i))
+        return view
+
+    def __repr__(self) -> str:
+        return f"ScenarioPack({self.source!r}, {self._count} scenarios)"
+
+    def record(self, i: int) -> Record:
+        """(description id, left side, right side); a side is (chance | None, success, failure, text id, log id)."""
+        f = _SCENARIO.unpack_from(self._buf, _HEADER.size + i * _SCENARIO.size)
+        return (f[0], _side(f[1:10]), _side(f[10:19]))
+
+    def text(self, text_id: int) -> str:
+        start, end = struct.unpack_from("<II", self._buf, self._offsets_at + text_id * _OFFSET.size)
+        return bytes(self._buf[self._blob_at + start:self._blob_at + end]).decode("utf-8")
+
+
+def _side(f: tuple) -> Side:
+    chance = None if math.isnan(f[0]) else f[0]
+    return (chance, (f[1], f[2], f[3]), (f[4], f[5], f[6]), f[7], f[8])
+
+
+def _effects(delta: Tuple[int, int, int]) -> Dict[str, int]:
+    return dict(zip(STAT_KEYS, delta))
+
+
+class PackChoice(Mapping):
+    """One side of a pack scenario, with the same keys as the built-in choice dicts."""
+    __slots__ = ("_pack", "_side")
+
+    def __init__(self, pack: ScenarioPack, side: Side):
+        self._pack = pack
+        self._side = side
+
+    def _keys(self) -> Tuple[str, ...]:
+        if self._side[0] is None:
+            return ("text", "effects", "log_text")
+        return ("text", "chance", "success_effects", "failure_effects", "log_text")
+
+    def __getitem__(self, key: str):
+        chance, success, failure, text_id, log_id = self._side
+        if key == "text":
+            return self._pack.text(text_id)
+        if key == "log_text":
+            return self._pack.text(log_id)
+        if chance is None:
+            if key == "effects":
+                return _effects(success)
+        elif key == "chance":
+            return chance
+        elif key == "success_effects":
+            return _effects(success)
+        elif key == "failure_effects":
+            return _effects(failure)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+
+class PackScenario(Mapping):
+    """A scenario in a ScenarioPack; description and choice text are decoded on access."""
+    __slots__ = ("_pack", "_record", "index")
+
+    def __init__(self, pack: ScenarioPack, i: int):
+        self._pack = pack
+        self._record = pack.record(i)
+        self.index = i  # position in the pack (TABLES.index_of reads it)
+
+    def __getitem__(self, key: str):
+        if key == "description":
+            return self._pack.text(self._record[0])
+        if key == "left_choice":
+            return PackChoice(self._pack, self._record[1])
+        if key == "right_choice":
+            return PackChoice(self._pack, self._record[2])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("description",) + SIDE_KEYS)
+
+    def __len__(self) -> int:
+        return 3
+
+    # Same pack and index is the same scenario (and keeps views hashable, unlike Mapping)
+    def __eq__(self, other):
+        if isinstance(other, PackScenario):
+            return self._pack is other._pack and self.index == other.index
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: dict(v) if isinstance(v, Mapping) else v for key, v in self.items()}
+
+
+def _map(path: str, digest: bytes) -> Optional[ScenarioPack]:
+    """Map a compiled pack if it exists and was built from this exact source; else None."""
+    try:
+        with open(path, "rb") as fh:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        pack = ScenarioPack(buf, path)
+    except (ValueError, struct.error):
+        buf.close()
+        return None
+    if pack.source_hash != digest.hex():
+        buf.close()
+        return None
+    return pack
+
+
+def open_pack(path: str, rebuild: bool = False) -> ScenarioPack:
+    """
+    Load a scenario pack file (JSON or TOML). The compiled form is cached under
+    cache_dir("packs") by the source's sha256: later startups hash the file and map the
+    cache, and any edit to the source compiles (and validates) it again.
+    """
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    digest = hashlib.sha256(raw).digest()
+    target = compiled_path(digest)
+    pack = None if rebuild else _map(target, digest)
+    if pack is None:
+        items = validate_pack(parse_pack(raw, path), path)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(compile_pack(items, digest))
+        os.replace(tmp, target)
+        pack = _map(target, digest)
+        if pack is None:
+            raise ValueError(f"{path}: compiled pack at {target} could not be mapped.")
+    pack.source = path
+    return pack
+
+
+# ---------- CLI ----------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate, compile and inspect scenario packs.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_val = sub.add_parser("validate", help="check pack files against the schema")
+    p_val.add_argument("paths", nargs="+")
+    p_comp = sub.add_parser("compile", help="(re)build the compiled cache for a pack")
+    p_comp.add_argument("path")
+    p_exp = sub.add_parser("export", help="write the built-in scenarios as a JSON pack")
+    p_exp.add_argument("path")
+    args = parser.parse_args()
+
+    if args.cmd == "validate":
+        failed = 0
+        for path in args.paths:
+            try:
+                with open(path, "rb") as fh:
+                    items = validate_pack(parse_pack(fh.read(), path), path)
+            except (OSError, ValueError) as e:
+                print(e)
+                failed += 1
+            else:
+                print(f"{path}: ok ({len(items)} scenarios)")
+        return 1 if failed else 0
+
+    if args.cmd == "compile":
+        t0 = time.perf_counter()
+        try:
+            pack = open_pack(args.path, rebuild=True)
+        except (OSError, ValueError) as e:
+            print(e)
+            return 1
+        t1 = time.perf_counter()
+        pack = open_pack(args.path)
+        t2 = time.perf_counter()
+        target = compiled_path(bytes.fromhex(pack.source_hash))
+        print(f"{args.path}: {len(pack)} scenarios, {pack.n_texts} texts -> {target} "
+              f"({os.path.getsize(target)} bytes)")
+        print(f"compile {1e3 * (t1 - t0):.1f} ms, cached open {1e3 * (t2 - t1):.2f} ms")
+        return 0
+
+    from engine.scenarios import builtin_scenarios
+    with open(args.path, "w", encoding="utf-8") as fh:
+        json.dump({"name": "builtin", "scenarios": builtin_scenarios}, fh, indent=2)
+    print(f"Wrote {len(builtin_scenarios)} scenarios to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,11 @@ import engine.utils as utl
 
 ### PLAYER CLASS ###
 class Player:
+    __slots__ = (
+        "hp", "food", "morale", "difficulty",
+        "hp_max", "food_max", "morale_max",
+        "low_food", "low_morale", "cause_of_death",
+    )
 
     # Initial player stats 
     def __init__(self, hp=5, food=3, morale=3, hp_max=5, food_max=8, morale_max=5, difficulty="normal"):
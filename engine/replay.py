@@ -0,0 +1,346 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import hashlib
+import json
+import os
+import random
+import secrets
+import struct
+import sys
+
+from engine.game import GameState, start_run, apply_choice, resolve_day, final_score
+from engine.scenarios import content_key, scenarios as SCENARIOS, surprise_events as SURPRISES
+from engine.config import DIFF_CFG, STARTS, DIFF_SCORE_MULT, SURPRISE_WEIGHTS, DIFFICULTIES
+from engine.tables import SIDE_L, SIDE_R
+from engine.utils import cache_dir
+
+# ---------- Binary layout ----------
+# File:   header, then records back to back.
+# Record: fixed part + ceil(n_choices / 8) bytes of choice bits (bit i set = day i+1 went Right).
+# A run is fully determined by (seed, difficulty, num_days, choices): start_run(seed=...) gives
+# the run its own RNG, so the verifier replays the exact same draws.
+
+MAGIC = b"SDGR"
+VERSION = 1
+_HEADER = struct.Struct("<4sH8s")     # magic, version, content fingerprint
+_RECORD = struct.Struct("<QBBBBH")    # seed, difficulty code, num_days, n_choices, flags, claimed score
+
+FLAG_FINISHED = 1  # run ended (won or died) on its last recorded choice
+MAX_DAYS = 255         # num_days and n_choices are one byte each
+MAX_SCORE = 0xFFFF     # claimed score is a uint16
+
+_DIFF_CODE = {name: i for i, name in enumerate(DIFFICULTIES)}
+DEFAULT_CHUNK = 20_000
+
+
+@lru_cache(maxsize=None)
+def content_fingerprint() -> bytes:
+    """
+    8-byte hash of every table a replay depends on; replays from other content are rejected.
+    Computed once per process: content is not expected to change at runtime.
+    """
+    blob = json.dumps(
+        {
+            "scenarios": content_key(),
+            "surprises": SURPRISES,
+            "cfg": DIFF_CFG,
+            "starts": STARTS,
+            "mult": DIFF_SCORE_MULT,
+            "weights": SURPRISE_WEIGHTS,
+            "rng": "wyrand",   # per-run generator: another one draws different runs from the same seeds
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).digest()[:8]
+
+
+class Replay(NamedTuple):
+    seed: int
+    difficulty: str
+    num_days: int
+    n_choices: int
+    choices: int       # bit-packed sides, LSB = day 1
+    finished: bool
+    score: int         # claimed final_score
+
+    def sides(self) -> List[int]:
+        return [(self.choices >> i) & 1 for i in range(self.n_choices)]
+
+
+def pack_replay(rep: Replay) -> bytes:
+    """Encode one record; runs the fixed-width layout cannot hold raise ValueError instead of losing choices."""
+    if rep.difficulty not in _DIFF_CODE:
+        raise ValueError(f"Unknown difficulty {rep.difficulty!r}.")
+    if not 0 <= rep.num_days <= MAX_DAYS or not 0 <= rep.n_choices <= MAX_DAYS:
+        raise ValueError(f"Replays hold runs of at most {MAX_DAYS} days (got {rep.num_days} days, "
+                         f"{rep.n_choices} choices).")
+    if not 0 <= rep.score <= MAX_SCORE:
+        raise ValueError(f"Score {rep.score} does not fit a replay record (0..{MAX_SCORE}).")
+    if not 0 <= rep.seed < 1 << 64:
+        raise ValueError(f"Seed {rep.seed} does not fit a replay record (64-bit unsigned).")
+    if rep.choices >> rep.n_choices:
+        raise ValueError(f"Choice bits beyond the {rep.n_choices} recorded days.")
+    flags = FLAG_FINISHED if rep.finished else 0
+    head = _RECORD.pack(rep.seed, _DIFF_CODE[rep.difficulty], rep.num_days, rep.n_choices, flags, rep.score)
+    return head + rep.choices.to_bytes((rep.n_choices + 7) // 8, "little")
+
+
+def unpack_replays(buf: bytes, offset: int = 0) -> Iterator[Replay]:
+    """Decode records from buf starting at offset (just past the file header)."""
+    end = len(buf)
+    size = _RECORD.size
+    while offset < end:
+        if offset + size > end:
+            raise ValueError(f"Truncated replay record at byte {offset}.")
+        seed, code, num_days, n, flags, score = _RECORD.unpack_from(buf, offset)
+        offset += size
+        nbytes = (n + 7) // 8
+        if offset + nbytes > end:
+            raise ValueError(f"Truncated replay choices at byte {offset}.")
+        choices = int.from_bytes(buf[offset:offset + nbytes], "little")
+        offset += nbytes
+        if code >= len(DIFFICULTIES):
+            raise ValueError(f"Unknown difficulty code {code} in replay record at byte {offset - nbytes - size}.")
+        yield Replay(seed, DIFFICULTIES[code], num_days, n, choices, bool(flags & FLAG_FINISHED), score)
+
+
+# ---------- Recording ----------
+
+def new_seed() -> int:
+    return secrets.randbits(64)
+
+
+def start_recorded_run(
+    difficulty: str,
+    seed: Optional[int] = None,
+    num_days: Optional[int] = None,
+    journal: bool = True,
+) -> Tuple[GameState, "RunRecorder"]:
+    """Start a run whose outcome is reproducible from its seed and choices."""
+    seed = new_seed() if seed is None else seed
+    state = start_run(difficulty, num_days, journal=journal, seed=seed)
+    return state, RunRecorder(seed, state.difficulty, state.num_days)
+
+
+class RunRecorder:
+    """Collects one run's choices as bits; to_replay() freezes them with the claimed score."""
+    __slots__ = ("seed", "difficulty", "num_days", "choices", "n_choices")
+
+    def __init__(self, seed: int, difficulty: str, num_days: int):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.num_days = num_days
+        self.choices = 0
+        self.n_choices = 0
+
+    def record(self, side: int) -> None:
+        if side:
+            self.choices |= 1 << self.n_choices
+        self.n_choices += 1
+
+    def apply(self, state: GameState, choice: str):
+        """apply_choice() that also records the side actually played (same "L" fallback)."""
+        if not state.over:
+            self.record(SIDE_R if choice.upper().strip() == "R" else SIDE_L)
+        return apply_choice(state, choice)
+
+    def resolve(self, state: GameState, side: int):
+        """resolve_day() counterpart of apply()."""
+        self.record(side)
+        return resolve_day(state, side)
+
+    def to_replay(self, state: GameState) -> Replay:
+        return Replay(self.seed, self.difficulty, self.num_days, self.n_choices, self.choices,
+                      state.over, final_score(state))
+
+
+class ReplayWriter:
+    """
+    Appends replays to a file as runs finish. The header is written when the file is
+    new and checked otherwise, so one file only ever holds replays of the same content.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fp = content_fingerprint()
+        self._fh = open(path, "a+b")
+        self._fh.seek(0, os.SEEK_END)
+        if self._fh.tell() == 0:
+            self._fh.write(_HEADER.pack(MAGIC, VERSION, self._fp))
+        else:
+            self._fh.seek(0)
+            _check_header(self._fh.read(_HEADER.size), path)
+            self._fh.seek(0, os.SEEK_END)
+
+    def append(self, rep: Replay) -> None:
+        self._fh.write(pack_replay(rep))
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "ReplayWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def default_replay_path(name: str) -> str:
+    return os.path.join(cache_dir("replays"), f"{name}.sdgr")
+
+
+def append_replay(path: str, rep: Replay) -> None:
+    """One-shot append for interactive front ends (open, write, close)."""
+    with ReplayWriter(path) as writer:
+        writer.append(rep)
+
+
+# ---------- Reading ----------
+
+def _check_header(raw: bytes, path: str) -> None:
+    if len(raw) < _HEADER.size:
+        raise ValueError(f"{path}: not a replay file (too short).")
+    magic, version, fp = _HEADER.unpack(raw[:_HEADER.size])
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a v{VERSION} replay file.")
+    if fp != content_fingerprint():
+        raise ValueError(f"{path}: replays were recorded against different game content.")
+
+
+def read_replays(path: str) -> List[Replay]:
+    with open(path, "rb") as fh:
+        buf = fh.read()
+    _check_header(buf, path)
+    return list(unpack_replays(buf, _HEADER.size))
+
+
+# ---------- Verification ----------
+
+def replay_score(rep: Replay) -> Optional[int]:
+    """
+    Re-run a replay on the fast path and return its real final_score, or None if the
+    choice stream does not fit the run (a run length the library cannot hold, choices
+    after the end, or a finished flag that does not match).
+    """
+    if not 1 <= rep.num_days <= len(SCENARIOS) or rep.n_choices > rep.num_days:
+        return None
+    state = start_run(rep.difficulty, rep.num_days, journal=False, seed=rep.seed)
+    choices = rep.choices
+    for i in range(rep.n_choices):
+        if state.over:
+            return None
+        resolve_day(state, (choices >> i) & 1)
+    if state.over != rep.finished:
+        return None
+    return final_score(state)
+
+
+@dataclass
+class VerifyReport:
+    total: int = 0
+    ok: int = 0
+    bad: List[Tuple[int, int, Optional[int]]] = field(default_factory=list)  # (index, claimed, actual)
+
+    def merge(self, other: "VerifyReport") -> "VerifyReport":
+        self.total += other.total
+        self.ok += other.ok
+        self.bad.extend(other.bad)
+        return self
+
+
+def verify_replays(replays: Sequence[Replay], start_index: int = 0) -> VerifyReport:
+    report = VerifyReport()
+    for i, rep in enumerate(replays, start_index):
+        actual = replay_score(rep)
+        report.total += 1
+        if actual is not None and actual == rep.score:
+            report.ok += 1
+        else:
+            report.bad.append((i, rep.score, actual))
+    return report
+
+
+def verify_file(path: str, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK) -> VerifyReport:
+    """Verify every replay in a file; chunks run on a process pool (workers=1 runs in-process)."""
+    replays = read_replays(path)
+    chunks = [(i, replays[i:i + chunk_size]) for i in range(0, len(replays), chunk_size)]
+
+    total = VerifyReport()
+    if workers == 1 or len(chunks) <= 1:
+        for start, chunk in chunks:
+            total.merge(verify_replays(chunk, start))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(verify_replays, chunk, start) for start, chunk in chunks]
+        for fut in futures:
+            total.merge(fut.result())
+    return total
+
+
+# ---------- Scripted recording (sims / bots) ----------
+
+def record_runs(path: str, difficulty: str, n_runs: int, policy: str = "L", *, seed: int = 0,
+                num_days: Optional[int] = None) -> int:
+    """
+    Play n_runs scripted runs and append their replays to path. Run i uses seed + i.
+    policy: "L", "R", or "mixed" (a seeded coin per day, independent of the engine RNG).
+    """
+    coin = random.Random(seed)
+    with ReplayWriter(path) as writer:
+        for i in range(n_runs):
+            state, rec = start_recorded_run(difficulty, seed + i, num_days, journal=False)
+            while not state.over:
+                if policy == "mixed":
+                    side = coin.getrandbits(1)
+                else:
+                    side = SIDE_R if policy == "R" else SIDE_L
+                rec.resolve(state, side)
+            writer.append(rec.to_replay(state))
+    return n_runs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record and verify compact binary replays.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="append scripted runs to a replay file")
+    rec.add_argument("path")
+    rec.add_argument("difficulty", nargs="?", default="normal")
+    rec.add_argument("-n", "--runs", type=int, default=10_000)
+    rec.add_argument("-p", "--policy", choices=("L", "R", "mixed"), default="mixed")
+    rec.add_argument("-s", "--seed", type=int, default=0)
+
+    ver = sub.add_parser("verify", help="re-run every replay and check its claimed score")
+    ver.add_argument("path")
+    ver.add_argument("-w", "--workers", type=int, default=None)
+    ver.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+
+    args = parser.parse_args()
+    if args.cmd == "record":
+        try:
+            n = record_runs(args.path, args.difficulty, args.runs, args.policy, seed=args.seed)
+        except ValueError as e:
+            print(e)
+            return 1
+        print(f"Recorded {n} runs to {args.path} ({os.path.getsize(args.path):,} bytes total)")
+        return 0
+
+    try:
+        report = verify_file(args.path, args.workers, args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"Corrupt or unreadable replay file: {e}")
+        return 1
+    print(f"Replays: {report.total}   OK: {report.ok}   Bad: {len(report.bad)}")
+    for index, claimed, actual in report.bad[:20]:
+        print(f"  #{index}: claimed {claimed}, actual {'invalid' if actual is None else actual}")
+    return 0 if not report.bad else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
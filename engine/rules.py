@@ -0,0 +1,126 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from engine.scenarios import scenarios as SCENARIOS, surprise_events as SURPRISES, surprise_probabilities
+from engine.config import NUM_DAYS, DIFF_CFG, STARTS, DIFF_SCORE_MULT
+from engine.tables import TABLES
+from engine.utils import clamp
+
+# ---------- Compact, side-effect-free copy of the daily rules ----------
+# Stats travel as plain tuples (hp, food, morale, low_food, low_morale) so exact
+# solvers can hash and merge them. Everything here must mirror
+# engine.game.apply_choice and engine.player.Player.daily_decay.
+
+Stats = Tuple[int, int, int, int, int]
+Delta = Tuple[int, int, int]
+
+NO_DELTA: Delta = (0, 0, 0)
+
+
+class Rules(NamedTuple):
+    difficulty: str
+    num_days: int
+    hp_max: int
+    food_max: int
+    morale_max: int
+    risk_success_bonus: float
+    surprise_chance: float
+    starve_every: int
+    low_food_death_days: int
+    low_morale_death_days: int
+    score_mult: float
+    start: Stats
+    surprises: Tuple[Tuple[float, Delta], ...]  # (probability, delta), incl. "no surprise"
+
+
+def _delta(effect: Dict[str, int]) -> Delta:
+    return (effect.get("hp", 0), effect.get("food", 0), effect.get("morale", 0))
+
+
+def make_rules(difficulty: str, num_days: Optional[int] = None) -> Rules:
+    difficulty = difficulty.lower()
+    if difficulty not in STARTS:
+        difficulty = "normal"
+    starts = STARTS[difficulty]
+    cfg = DIFF_CFG[difficulty]
+
+    sc = cfg.get("surprise_chance", 0.2)
+    dist: Dict[Delta, float] = {NO_DELTA: 1.0 - sc}
+    for ev, p in zip(SURPRISES, surprise_probabilities(difficulty)):
+        d = (ev.hp, ev.food, ev.morale)
+        dist[d] = dist.get(d, 0.0) + sc * p
+
+    return Rules(
+        difficulty=difficulty,
+        num_days=num_days if num_days is not None else NUM_DAYS,
+        hp_max=starts["hp_max"],
+        food_max=starts["food_max"],
+        morale_max=starts["morale_max"],
+        risk_success_bonus=cfg.get("risk_success_bonus", 0.0),
+        surprise_chance=sc,
+        starve_every=cfg["starve_morale_every_n_days"],
+        low_food_death_days=cfg.get("low_food_death_days", 3),
+        low_morale_death_days=cfg.get("low_morale_death_days", 3),
+        score_mult=DIFF_SCORE_MULT.get(difficulty, 1.0),
+        start=(starts["hp"], starts["food"], starts["morale"], 0, 0),
+        surprises=tuple((p, d) for d, p in dist.items() if p > 0),
+    )
+
+
+def option_branches(chosen: Dict[str, Any], rules: Rules) -> List[Tuple[float, Delta]]:
+    """(probability, effect delta) for one scenario side, with the same chance clamp as apply_choice."""
+    if "chance" in chosen:
+        p = clamp(chosen["chance"] + rules.risk_success_bonus, 0.05, 0.95)
+        return [(p, _delta(chosen["success_effects"])), (1.0 - p, _delta(chosen["failure_effects"]))]
+    return [(1.0, _delta(chosen["effects"]))]
+
+
+def step_stats(stats: Stats, main: Delta, surprise: Delta, rules: Rules) -> Tuple[Stats, Optional[str]]:
+    """Apply main effect, surprise, daily decay and death checks; returns (stats, death)."""
+    hp, food, morale, low_food, low_morale = stats
+    for dh, df, dm in (main, surprise):
+        hp = clamp(hp + dh, 0, rules.hp_max)
+        food = clamp(food + df, 0, rules.food_max)
+        morale = clamp(morale + dm, 0, rules.morale_max)
+
+    food = clamp(food - 1, 0, rules.food_max)
+    if food <= 0:
+        low_food += 1
+        hp = clamp(hp - 1, 0, rules.hp_max)
+        if low_food % rules.starve_every == 0:
+            morale = clamp(morale - 1, 0, rules.morale_max)
+    else:
+        low_food = 0
+    low_morale = low_morale + 1 if morale <= 0 else 0
+
+    death: Optional[str] = None
+    if hp <= 0:
+        death = "Injury"
+    elif low_food >= rules.low_food_death_days:
+        death = "Starvation"
+    elif low_morale >= rules.low_morale_death_days:
+        death = "Hopelessness"
+    return (hp, food, morale, low_food, low_morale), death
+
+
+def day_outcomes(stats: Stats, branches: Sequence[Tuple[float, Delta]],
+                 rules: Rules) -> Dict[Tuple[Stats, Optional[str]], float]:
+    """Full distribution of one day's (stats, death) for a chosen side, identical outcomes merged."""
+    out: Dict[Tuple[Stats, Optional[str]], float] = {}
+    for p_main, main in branches:
+        for p_sur, sur in rules.surprises:
+            key = step_stats(stats, main, sur, rules)
+            out[key] = out.get(key, 0.0) + p_main * p_sur
+    return out
+
+
+def score(stats: Stats, days_completed: int, rules: Rules) -> int:
+    """Same formula as engine.game.final_score."""
+    hp, food, morale = stats[0], stats[1], stats[2]
+    base = (days_completed * 10) + (hp * 5) + (food * 2) + (morale * 5)
+    return int(round(base * rules.score_mult))
+
+
+def scenario_index() -> Callable[[Any], int]:
+    """Scenario (dict or pack view) -> index in engine.scenarios.scenarios."""
+    return TABLES.index_of
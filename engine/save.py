@@ -0,0 +1,241 @@
+from __future__ import annotations
+from typing import List, NamedTuple, Optional
+import os
+import random
+import struct
+
+from engine.game import GameState, ScenarioOrder
+from engine.journal import DayResult
+from engine.player import Player
+from engine.scenarios import scenarios as SCENARIOS
+from engine.config import DIFF_CFG, STARTS, CAUSES, DIFFICULTIES
+from engine.replay import RunRecorder, content_fingerprint
+from engine.tables import TABLES
+from engine.utils import cache_dir, WyRand
+
+# ---------- Binary layout ----------
+# header | fixed block | [replay: seed, n_choices, choice bits] | scenario order (num_days x uint16,
+# or a uint64 ScenarioOrder key) | [RNG state] | [journal]
+# Every field has a fixed width (choice bits: ceil(n_choices / 8) bytes), so loading is a handful
+# of struct.unpack_from calls. Days are uint16 and journal scenario indices uint32, which covers
+# long runs over scenario packs; dumps() rejects anything wider.
+
+MAGIC = b"SDGS"
+VERSION = 3
+_HEADER = struct.Struct("<4sH8s")           # magic, version, content fingerprint
+_FIXED = struct.Struct("<BHH3H2HBB")        # difficulty, num_days, day, hp/food/morale, low_food/morale, flags, sections
+_REPLAY = struct.Struct("<QH")              # replay seed, recorded choices (bits follow)
+_RNG = struct.Struct("<Q")                  # the run's WyRand state
+_COUNT = struct.Struct("<H")
+_ORDER_KEY = struct.Struct("<Q")
+_ENTRY = struct.Struct("<HIBBbbbbB")        # day, scenario, side, result, effect x3, surprise, death
+MAX_DAYS = 0xFFFF
+
+# Flags byte: bit0 over, bit1 won, bits2.. cause code (same as engine.compact)
+_OVER = 1
+_WON = 2
+
+# Sections byte
+HAS_RNG = 1
+HAS_JOURNAL = 2
+JOURNAL_OFF = 4      # the run was started with journal=False
+HAS_REPLAY = 8       # replay seed + choices, so a resumed run still records a valid replay
+LAZY_ORDER = 16      # scenario order saved as its permutation key
+_SECTIONS = HAS_RNG | HAS_JOURNAL | JOURNAL_OFF | HAS_REPLAY | LAZY_ORDER
+
+_DIFF_CODE = {name: i for i, name in enumerate(DIFFICULTIES)}
+_CAUSE_CODE = {name: i for i, name in enumerate(CAUSES)}
+
+
+class Snapshot(NamedTuple):
+    state: GameState
+    recorder: Optional[RunRecorder]
+
+
+def dumps(
+    state: GameState,
+    recorder: Optional[RunRecorder] = None,
+    *,
+    include_rng: bool = True,
+    include_journal: bool = True,
+) -> bytes:
+    """
+    Serialize an in-progress (or finished) run. The RNG section holds the run's own
+    RNG state so the resumed run draws exactly what it would have; without it the
+    loaded run gets a fresh RNG. Values the fixed-width fields cannot hold raise ValueError.
+    """
+    try:
+        return _encode(state, recorder, include_rng, include_journal)
+    except struct.error as e:
+        raise ValueError(f"Run does not fit the save format ({e}).") from None
+
+
+def _encode(state: GameState, recorder: Optional[RunRecorder], include_rng: bool,
+            include_journal: bool) -> bytes:
+    if state.endless:
+        raise ValueError("Endless runs cannot be saved (their scenario stream is not serialized).")
+    if not 0 <= state.day <= MAX_DAYS or state.num_days > MAX_DAYS:
+        raise ValueError(f"Save files hold runs of at most {MAX_DAYS} days (day {state.day} of {state.num_days}).")
+    p = state.player
+    flags = (_OVER if state.over else 0) | (_WON if state.won else 0)
+    flags |= _CAUSE_CODE.get(state.cause_of_death, 0) << 2
+
+    sections = 0
+    if include_rng:
+        sections |= HAS_RNG
+    if state.journal is None:
+        sections |= JOURNAL_OFF
+    elif include_journal:
+        sections |= HAS_JOURNAL
+    if recorder is not None:
+        sections |= HAS_REPLAY
+    lazy = isinstance(state.scenario_order, ScenarioOrder)
+    if lazy:
+        sections |= LAZY_ORDER
+
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, content_fingerprint()),
+        _FIXED.pack(
+            _DIFF_CODE[state.difficulty], state.num_days, state.day,
+            p.hp, p.food, p.morale, p.low_food, p.low_morale,
+            flags, sections,
+        ),
+    ]
+    if recorder is not None:
+        parts.append(_REPLAY.pack(recorder.seed, recorder.n_choices))
+        parts.append(recorder.choices.to_bytes((recorder.n_choices + 7) // 8, "little"))
+    parts += [
+        _ORDER_KEY.pack(state.scenario_order.key) if lazy else
+        struct.pack(f"<{state.num_days}H", *map(TABLES.index_of, state.scenario_order)),
+    ]
+    if include_rng:
+        parts.append(_RNG.pack(state.rng.getstate()))
+    if sections & HAS_JOURNAL:
+        parts.append(_COUNT.pack(len(state.journal)))
+        parts.extend(
+            _ENTRY.pack(e.day, e.scenario, e.side, e.result, *e.effect, e.surprise, e.death)
+            for e in state.journal
+        )
+    return b"".join(parts)
+
+
+def loads(buf: bytes) -> Snapshot:
+    """Rebuild the GameState (and replay recorder, if saved); corrupt or truncated data raises ValueError."""
+    try:
+        return _decode(buf)
+    except (struct.error, IndexError, KeyError) as e:
+        raise ValueError(f"Corrupt save file ({e}).") from None
+
+
+def _decode(buf: bytes) -> Snapshot:
+    if len(buf) < _HEADER.size:
+        raise ValueError("Not a save file (too short).")
+    magic, version, fp = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a v{VERSION} save file.")
+    if fp != content_fingerprint():
+        raise ValueError("Save was written against different game content.")
+    offset = _HEADER.size
+
+    (diff_code, num_days, day, hp, food, morale, low_food, low_morale,
+     flags, sections) = _FIXED.unpack_from(buf, offset)
+    offset += _FIXED.size
+    if sections & ~_SECTIONS or (sections & HAS_JOURNAL and sections & JOURNAL_OFF):
+        raise ValueError(f"Corrupt save file (bad section flags {sections:#04x}).")
+    if not 1 <= day <= num_days <= len(SCENARIOS):
+        raise ValueError(f"Corrupt save file (day {day} of {num_days}, library of {len(SCENARIOS)}).")
+    if sections & HAS_REPLAY:
+        seed, n_choices = _REPLAY.unpack_from(buf, offset)
+        offset += _REPLAY.size
+        nbytes = (n_choices + 7) // 8
+        if offset + nbytes > len(buf):
+            raise ValueError("Corrupt save file (truncated replay choices).")
+        choices = int.from_bytes(buf[offset:offset + nbytes], "little")
+        offset += nbytes
+    if sections & LAZY_ORDER:
+        (key,) = _ORDER_KEY.unpack_from(buf, offset)
+        offset += _ORDER_KEY.size
+        scenario_order = ScenarioOrder(key, num_days)
+    else:
+        order = struct.unpack_from(f"<{num_days}H", buf, offset)
+        offset += 2 * num_days
+        scenario_order = [SCENARIOS[i] for i in order]
+
+    if sections & HAS_RNG:
+        (rng_state,) = _RNG.unpack_from(buf, offset)
+        offset += _RNG.size
+        rng = WyRand()
+        rng.setstate(rng_state)
+    else:
+        rng = WyRand(random.getrandbits(64))
+
+    journal: Optional[List[DayResult]] = None if sections & JOURNAL_OFF else []
+    if sections & HAS_JOURNAL:
+        (count,) = _COUNT.unpack_from(buf, offset)
+        offset += _COUNT.size
+        for _ in range(count):
+            d, sc, side, result, eh, ef, em, surprise, death = _ENTRY.unpack_from(buf, offset)
+            offset += _ENTRY.size
+            journal.append(DayResult(d, sc, side, result, (eh, ef, em), surprise, death))
+    if offset != len(buf):
+        raise ValueError(f"Corrupt save file ({len(buf) - offset} unexpected trailing bytes).")
+
+    difficulty = DIFFICULTIES[diff_code]
+    starts = STARTS[difficulty]
+    if hp > starts["hp_max"] or food > starts["food_max"] or morale > starts["morale_max"]:
+        raise ValueError(f"Corrupt save file (stats {hp}/{food}/{morale} above the {difficulty} maximums).")
+    cause = CAUSES[flags >> 2]
+    over = bool(flags & _OVER)
+    player = Player(
+        hp=hp,
+        food=food,
+        morale=morale,
+        hp_max=starts["hp_max"],
+        food_max=starts["food_max"],
+        morale_max=starts["morale_max"],
+        difficulty=difficulty,
+    )
+    player.low_food = low_food
+    player.low_morale = low_morale
+    player.cause_of_death = cause
+    state = GameState(
+        difficulty=difficulty,
+        cfg=DIFF_CFG[difficulty],
+        num_days=num_days,
+        day=day,
+        player=player,
+        scenario_order=scenario_order,
+        journal=journal,
+        over=over,
+        cause_of_death=cause,
+        won=bool(flags & _WON),
+        rng=rng,
+    )
+
+    recorder = None
+    if sections & HAS_REPLAY:
+        recorder = RunRecorder(seed, difficulty, num_days)
+        recorder.choices = choices
+        recorder.n_choices = n_choices
+    return Snapshot(state, recorder)
+
+
+# ---------- Files ----------
+
+def default_save_path(name: str) -> str:
+    return os.path.join(cache_dir("saves"), f"{name}.sav")
+
+
+def save_state(path: str, state: GameState, recorder: Optional[RunRecorder] = None, **kwargs) -> int:
+    """Write a snapshot atomically (temp file + rename); returns its size in bytes."""
+    data = dumps(state, recorder, **kwargs)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def load_state(path: str) -> Snapshot:
+    with open(path, "rb") as fh:
+        return loads(fh.read())
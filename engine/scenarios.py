@@ -1,4 +1,9 @@
+import os
 import random
+from typing import NamedTuple
+
+from engine.config import DIFF_CFG, SURPRISE_WEIGHTS
+from engine.utils import AliasTable
 
 ### LIST OF CHOICE SCENARIOS ###
 scenarios = [
@@ -149,20 +154,77 @@ scenarios = [
         }
     }
 ]
+builtin_scenarios = scenarios
+
+### EXTERNAL SCENARIO PACK ###
+# SWIPE_SCENARIO_PACK=path/to/pack.json (or .toml) replaces the list above with a
+# memory-mapped pack (engine.packs); it is read once, when this module is imported.
+if os.environ.get("SWIPE_SCENARIO_PACK"):
+    from engine.packs import open_pack
+    scenarios = open_pack(os.environ["SWIPE_SCENARIO_PACK"])
+
+
+def content_key():
+    """JSON-able stand-in for the scenario table in content hashes (a pack hashes as its source)."""
+    if scenarios is builtin_scenarios:
+        return scenarios
+    return {"pack": scenarios.source_hash}
 
 ### LIST OF SURPRISE EVENTS ###
-def get_random_event(chance=0.2):
-    if random.random() < chance:
-        return random.choice([
-            {"hp": -1, "food": 0, "morale": 0, "text": "A mischievous pixie steals a bite of your rations! -1 HP from the chase"},
-            {"hp": 0, "food": 1, "morale": 0, "text": "You stumble upon a glowing mushroom patch! +1 Food"},
-            {"hp": 0, "food": 0, "morale": 1, "text": "A group of fireflies dance around you. Your heart feels lighter! +1 Morale"},
-            {"hp": -2, "food": 0, "morale": -1, "text": "A sudden landslide forces you to jump aside! -2 HP and morale drops"},
-            {"hp": 1, "food": 0, "morale": 1, "text": "A wandering druid blesses you with vitality! +1 HP and +1 Morale"},
-            {"hp": 0, "food": 2, "morale": 0, "text": "You find an abandoned picnic basket under a tree! +2 Food"},
-            {"hp": -1, "food": 0, "morale": 1, "text": "A cheeky fairy plays a prank, but you laugh it off. -1 HP, +1 Morale"},
-            {"hp": 0, "food": -1, "morale": -1, "text": "Rats sneak into your pack during the night! -1 Food and -1 Morale"},
-            {"hp": 2, "food": 0, "morale": 0, "text": "A healing spring bubbles nearby. You bathe and feel renewed! +2 HP"},
-            {"hp": 0, "food": 0, "morale": 2, "text": "A bard passes by and plays a joyful tune. +2 Morale!"}
-        ])
-    return -1
\ No newline at end of file
+class SurpriseEvent(NamedTuple):
+    key: str
+    hp: int
+    food: int
+    morale: int
+    text: str
+    weight: float = 1.0
+
+
+surprise_events = (
+    SurpriseEvent("pixie", -1, 0, 0, "A mischievous pixie steals a bite of your rations! -1 HP from the chase"),
+    SurpriseEvent("mushrooms", 0, 1, 0, "You stumble upon a glowing mushroom patch! +1 Food"),
+    SurpriseEvent("fireflies", 0, 0, 1, "A group of fireflies dance around you. Your heart feels lighter! +1 Morale"),
+    SurpriseEvent("landslide", -2, 0, -1, "A sudden landslide forces you to jump aside! -2 HP and morale drops"),
+    SurpriseEvent("druid", 1, 0, 1, "A wandering druid blesses you with vitality! +1 HP and +1 Morale"),
+    SurpriseEvent("picnic", 0, 2, 0, "You find an abandoned picnic basket under a tree! +2 Food"),
+    SurpriseEvent("fairy", -1, 0, 1, "A cheeky fairy plays a prank, but you laugh it off. -1 HP, +1 Morale"),
+    SurpriseEvent("rats", 0, -1, -1, "Rats sneak into your pack during the night! -1 Food and -1 Morale"),
+    SurpriseEvent("spring", 2, 0, 0, "A healing spring bubbles nearby. You bathe and feel renewed! +2 HP"),
+    SurpriseEvent("bard", 0, 0, 2, "A bard passes by and plays a joyful tune. +2 Morale!"),
+)
+
+
+def surprise_weights(difficulty=None):
+    """Per-event weights for a difficulty: base weights with SURPRISE_WEIGHTS overrides applied."""
+    overrides = SURPRISE_WEIGHTS.get(difficulty, {})
+    return tuple(overrides.get(ev.key, ev.weight) for ev in surprise_events)
+
+
+def surprise_probabilities(difficulty=None):
+    """P(event i | a surprise happens), aligned with surprise_events."""
+    weights = surprise_weights(difficulty)
+    total = sum(weights)
+    return tuple(w / total for w in weights)
+
+
+_BASE_SAMPLER = AliasTable(surprise_weights())
+SURPRISE_SAMPLERS = {diff: AliasTable(surprise_weights(diff)) for diff in DIFF_CFG}
+
+
+def surprise_sampler(difficulty=None):
+    return SURPRISE_SAMPLERS.get(difficulty, _BASE_SAMPLER)
+
+
+def roll_surprise(chance=0.2, difficulty=None, rng=random):
+    """Index into surprise_events, or -1 when no surprise happens today."""
+    if rng.random() < chance:
+        return surprise_sampler(difficulty).sample(rng)
+    return -1
+
+
+def get_random_event(chance=0.2, difficulty=None, rng=random):
+    index = roll_surprise(chance, difficulty, rng)
+    if index == -1:
+        return -1
+    ev = surprise_events[index]
+    return {"hp": ev.hp, "food": ev.food, "morale": ev.morale, "text": ev.text}
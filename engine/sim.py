@@ -0,0 +1,190 @@
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+import argparse
+import math
+import random
+
+from engine.game import GameState, start_run, get_today_scenario, apply_choice, final_score
+from engine.instrument import PhaseTimer, EventCounter, attach
+
+# A policy picks "L" or "R" for (state, today's scenario). Must be picklable
+# (module-level function) to cross the process boundary; "L"/"R" are shorthands.
+Policy = Union[str, Callable[[GameState, Dict[str, Any]], str]]
+
+DEFAULT_SHARD_SIZE = 10_000
+
+
+# ---------- Aggregated results ----------
+
+@dataclass
+class SimSummary:
+    runs: int = 0
+    wins: int = 0
+    score_hist: Counter = field(default_factory=Counter)   # score -> count
+    deaths: Counter = field(default_factory=Counter)       # cause -> count
+    phases: Optional[PhaseTimer] = None                    # set when run with profile=True
+    events: Optional[EventCounter] = None
+
+    def add(self, state: GameState) -> None:
+        self.runs += 1
+        if state.won:
+            self.wins += 1
+        else:
+            self.deaths[state.cause_of_death] += 1
+        self.score_hist[final_score(state)] += 1
+
+    def merge(self, other: "SimSummary") -> "SimSummary":
+        self.runs += other.runs
+        self.wins += other.wins
+        self.score_hist.update(other.score_hist)
+        self.deaths.update(other.deaths)
+        if other.phases is not None:
+            self.phases = (self.phases or PhaseTimer()).merge(other.phases)
+            self.events = (self.events or EventCounter()).merge(other.events)
+        return self
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.runs if self.runs else 0.0
+
+    @property
+    def mean_score(self) -> float:
+        if not self.runs:
+            return 0.0
+        return sum(s * c for s, c in self.score_hist.items()) / self.runs
+
+    @property
+    def score_std(self) -> float:
+        if self.runs < 2:
+            return 0.0
+        mean = self.mean_score
+        var = sum(c * (s - mean) ** 2 for s, c in self.score_hist.items()) / (self.runs - 1)
+        return math.sqrt(var)
+
+    def mean_ci(self, z: float = 1.96) -> Tuple[float, float]:
+        """Normal-approximation confidence interval of the mean score."""
+        half = z * self.score_std / math.sqrt(self.runs) if self.runs else math.inf
+        return self.mean_score - half, self.mean_score + half
+
+    def score_percentile(self, pct: float) -> int:
+        """Nearest-rank percentile read off the score histogram."""
+        if not self.runs:
+            return 0
+        rank = max(1, math.ceil(pct / 100.0 * self.runs))
+        seen = 0
+        for score in sorted(self.score_hist):
+            seen += self.score_hist[score]
+            if seen >= rank:
+                return score
+        return max(self.score_hist)
+
+
+# ---------- Workers ----------
+
+def _resolve_choice(policy: Policy, state: GameState) -> str:
+    if isinstance(policy, str):
+        return policy
+    return policy(state, get_today_scenario(state))
+
+
+def run_shard(difficulty: str, policy: Policy, seed: int, shard: int, n: int,
+               num_days: Optional[int], profile: bool = False) -> SimSummary:
+    """
+    Play n runs; run seeds come from a private stream derived from (seed, shard).
+    profile=True attaches a PhaseTimer and EventCounter for the shard (in the worker).
+    """
+    seeds = random.Random(f"{seed}:{shard}")
+    summary = SimSummary()
+    if profile:
+        summary.phases, summary.events = PhaseTimer(), EventCounter()
+        with attach(summary.phases, summary.events):
+            _play(summary, difficulty, policy, seeds, n, num_days)
+    else:
+        _play(summary, difficulty, policy, seeds, n, num_days)
+    return summary
+
+
+def _play(summary: SimSummary, difficulty: str, policy: Policy, seeds: random.Random, n: int,
+          num_days: Optional[int]) -> None:
+    for _ in range(n):
+        state = start_run(difficulty, num_days, journal=False, seed=seeds.getrandbits(64))
+        while not state.over:
+            apply_choice(state, _resolve_choice(policy, state))
+        summary.add(state)
+
+
+# ---------- Public API ----------
+
+def run_simulation(
+    difficulty: str,
+    n_runs: int,
+    policy: Policy = "L",
+    *,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    num_days: Optional[int] = None,
+    profile: bool = False,
+) -> SimSummary:
+    """
+    Split n_runs into fixed-size shards and play them on a process pool.
+    Shard boundaries and seeds depend only on (seed, n_runs, shard_size), so the
+    merged summary is identical for any number of workers. workers=1 runs in-process.
+    profile=True fills summary.phases / summary.events (engine.instrument).
+    """
+    if n_runs < 0:
+        raise ValueError(f"n_runs must be >= 0 (got {n_runs}).")
+    if shard_size < 1:
+        raise ValueError(f"shard_size must be >= 1 (got {shard_size}).")
+    shards = []
+    start = 0
+    while start < n_runs:
+        n = min(shard_size, n_runs - start)
+        shards.append((len(shards), n))
+        start += n
+
+    total = SimSummary()
+    if workers == 1:
+        for shard, n in shards:
+            total.merge(run_shard(difficulty, policy, seed, shard, n, num_days, profile))
+        return total
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_shard, difficulty, policy, seed, shard, n, num_days, profile)
+            for shard, n in shards
+        ]
+        for fut in futures:
+            total.merge(fut.result())
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run scripted games on a process pool.")
+    parser.add_argument("difficulty", nargs="?", default="normal")
+    parser.add_argument("-n", "--runs", type=int, default=100_000)
+    parser.add_argument("-p", "--policy", choices=("L", "R"), default="L")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+    parser.add_argument("--profile", action="store_true", help="per-phase engine timings and event counts")
+    args = parser.parse_args()
+
+    try:
+        summary = run_simulation(args.difficulty, args.runs, args.policy, seed=args.seed,
+                                 workers=args.workers, shard_size=args.shard_size, profile=args.profile)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Runs: {summary.runs}   Win rate: {summary.win_rate:.2%}   Mean score: {summary.mean_score:.2f}")
+    print("Deaths:", ", ".join(f"{k}={v}" for k, v in summary.deaths.most_common()) or "none")
+    print("Scores:", " ".join(f"{s}:{c}" for s, c in sorted(summary.score_hist.items())))
+    if summary.phases is not None:
+        print("\n".join(["", *summary.phases.format(), "", *summary.events.format()]))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,232 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+
+from engine.game import GameState
+from engine.scenarios import scenarios as SCENARIOS, surprise_events as SURPRISES, content_key
+from engine.rules import Rules, Stats, make_rules, option_branches, day_outcomes, score, scenario_index
+from engine.utils import cache_dir
+
+# ---------- State packing ----------
+# Key layout (low -> high bits): unused-scenario mask | low_morale | low_food | morale | food | hp | day
+_S = len(SCENARIOS)
+_FIELD = 4
+
+_MAGIC = b"SDGV"
+_VERSION = 1
+_HEADER = struct.Struct("<4sH32s8sII")  # magic, version, fingerprint, difficulty, num_days, count
+
+
+def pack_key(day: int, stats: Stats, mask: int) -> int:
+    key = day
+    for v in stats[:3]:
+        key = (key << _FIELD) | v
+    key = (key << _FIELD) | stats[3]
+    key = (key << _FIELD) | stats[4]
+    return (key << _S) | mask
+
+
+def check_representable(num_days: int) -> None:
+    """Keys and right-choice masks are uint64: the day, five stat fields and one bit per scenario must fit."""
+    bits = num_days.bit_length() + 5 * _FIELD + _S
+    if bits > 64:
+        raise ValueError(
+            f"The exact solver cannot represent a library of {_S} scenarios over {num_days} days "
+            f"({bits}-bit state keys, 64 max); use a library of at most "
+            f"{64 - 5 * _FIELD - num_days.bit_length()} scenarios.")
+
+
+def fingerprint(rules: Rules) -> bytes:
+    """Hash of everything the table depends on; a mismatch means the table is stale."""
+    blob = json.dumps(
+        {"scenarios": content_key(), "surprises": SURPRISES, "rules": rules._asdict()},
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).digest()
+
+
+# ---------- Solved table ----------
+
+class OptimalPolicy:
+    """
+    Expected-score-maximizing policy with its value table.
+    Values are expectations of final_score taken before the day's scenario is revealed.
+    Callable as (state, scenario) -> "L" | "R", so it plugs into engine.sim.
+    """
+
+    def __init__(self, rules: Rules, fp: bytes, keys: array, values: array, right: array):
+        self.rules = rules
+        self.fingerprint = fp
+        self.keys = keys        # sorted packed state keys ('Q')
+        self.values = values    # expected score per key ('d')
+        self.right = right      # bit i set -> choose R when scenario i is drawn ('Q')
+        self._index = scenario_index()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _find(self, key: int) -> int:
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            raise KeyError("State not reachable in solved table.")
+        return i
+
+    def value(self, day: int, stats: Stats, mask: int) -> float:
+        return self.values[self._find(pack_key(day, stats, mask))]
+
+    @property
+    def expected_score(self) -> float:
+        return self.value(1, self.rules.start, (1 << _S) - 1)
+
+    def choose(self, day: int, stats: Stats, mask: int, scenario: int) -> str:
+        bits = self.right[self._find(pack_key(day, stats, mask))]
+        return "R" if (bits >> scenario) & 1 else "L"
+
+    def __call__(self, state: GameState, scenario: Dict[str, Any]) -> str:
+        p = state.player
+        used = state.scenario_order[:state.day - 1]
+        mask = (1 << _S) - 1
+        for sc in used:
+            mask &= ~(1 << self._index(sc))
+        stats = (p.hp, p.food, p.morale, p.low_food, p.low_morale)
+        return self.choose(state.day, stats, mask, self._index(scenario))
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items() if k != "_index"}
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self._index = scenario_index()
+
+    # ---- Persistence ----
+
+    def save(self, path: str) -> None:
+        # Per-process temp name: concurrent solvers each finish their own file, then rename
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(_MAGIC, _VERSION, self.fingerprint,
+                                  self.rules.difficulty.encode("ascii"),
+                                  self.rules.num_days, len(self.keys)))
+            self.keys.tofile(fh)
+            self.values.tofile(fh)
+            self.right.tofile(fh)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, rules: Rules) -> Optional["OptimalPolicy"]:
+        """Load a table for these rules; returns None if missing, foreign or stale."""
+        fp = fingerprint(rules)
+        try:
+            with open(path, "rb") as fh:
+                magic, version, file_fp, _diff, _days, count = _HEADER.unpack(fh.read(_HEADER.size))
+                if magic != _MAGIC or version != _VERSION or file_fp != fp:
+                    return None
+                keys, values, right = array("Q"), array("d"), array("Q")
+                keys.fromfile(fh, count)
+                values.fromfile(fh, count)
+                right.fromfile(fh, count)
+        except (OSError, EOFError, struct.error):
+            return None
+        return cls(rules, fp, keys, values, right)
+
+
+# ---------- Solver ----------
+
+def solve(difficulty: str, num_days: Optional[int] = None) -> OptimalPolicy:
+    """
+    Exact expectimax over (day, hp, food, morale, low_food, low_morale, unused scenarios).
+    Each day the scenario is uniform over the unused ones (same law as random.sample up front);
+    the player then picks the side with the higher expected final_score (ties -> L).
+    """
+    rules = make_rules(difficulty, num_days)
+    if rules.num_days > _S:
+        raise ValueError("NUM_DAYS exceeds available scenarios.")
+    check_representable(rules.num_days)
+
+    branches = [
+        [option_branches(sc["left_choice"], rules), option_branches(sc["right_choice"], rules)]
+        for sc in SCENARIOS
+    ]
+    outcome_cache: Dict[Tuple[Stats, int, int], Dict] = {}
+    memo: Dict[int, Tuple[float, int]] = {}
+
+    def outcomes(stats: Stats, s: int, side: int):
+        k = (stats, s, side)
+        hit = outcome_cache.get(k)
+        if hit is None:
+            hit = outcome_cache[k] = day_outcomes(stats, branches[s][side], rules)
+        return hit
+
+    def value(day: int, stats: Stats, mask: int) -> float:
+        key = pack_key(day, stats, mask)
+        hit = memo.get(key)
+        if hit is not None:
+            return hit[0]
+
+        last_day = day >= rules.num_days
+        total = 0.0
+        right_bits = 0
+        unused = [s for s in range(_S) if (mask >> s) & 1]
+        for s in unused:
+            next_mask = mask & ~(1 << s)
+            q = [0.0, 0.0]
+            for side in (0, 1):
+                for (after, death), p in outcomes(stats, s, side).items():
+                    if death or last_day:
+                        q[side] += p * score(after, day, rules)
+                    else:
+                        q[side] += p * value(day + 1, after, next_mask)
+            if q[1] > q[0]:
+                right_bits |= 1 << s
+            total += max(q)
+
+        v = total / len(unused)
+        memo[key] = (v, right_bits)
+        return v
+
+    value(1, rules.start, (1 << _S) - 1)
+
+    keys = array("Q", sorted(memo))
+    values = array("d", (memo[k][0] for k in keys))
+    right = array("Q", (memo[k][1] for k in keys))
+    return OptimalPolicy(rules, fingerprint(rules), keys, values, right)
+
+
+def default_table_path(difficulty: str, num_days: int) -> str:
+    return os.path.join(cache_dir("solver"), f"optimal-{difficulty}-{num_days}.bin")
+
+
+def load_or_solve(difficulty: str, num_days: Optional[int] = None, path: Optional[str] = None) -> OptimalPolicy:
+    """Load the persisted table if it matches the current rules, otherwise solve and write it."""
+    rules = make_rules(difficulty, num_days)
+    check_representable(rules.num_days)
+    path = path or default_table_path(rules.difficulty, rules.num_days)
+    table = OptimalPolicy.load(path, rules)
+    if table is None:
+        table = solve(rules.difficulty, rules.num_days)
+        table.save(path)
+    return table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Solve the optimal policy per difficulty.")
+    parser.add_argument("difficulty", nargs="*", default=["easy", "normal", "hard"])
+    parser.add_argument("--days", type=int, default=None)
+    args = parser.parse_args()
+
+    for diff in args.difficulty:
+        table = load_or_solve(diff, args.days)
+        print(f"{table.rules.difficulty:>6}: optimal expected score {table.expected_score:.3f} "
+              f"({len(table)} states)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
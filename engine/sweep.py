@@ -0,0 +1,283 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+from engine.batch import simulate_batch
+from engine.scenarios import content_key, surprise_events as SURPRISES, surprise_probabilities
+from engine.config import NUM_DAYS, DIFF_CFG, STARTS, DIFF_SCORE_MULT, CAUSES, DIFFICULTIES
+from engine.utils import cache_dir
+
+# Bump when simulate_batch's semantics change, so stale cached points are not reused
+SWEEP_VERSION = 1
+
+CFG_KEYS = ("surprise_chance", "risk_success_bonus", "starve_morale_every_n_days",
+            "low_food_death_days", "low_morale_death_days")
+START_KEYS = ("hp", "food", "morale", "hp_max", "food_max", "morale_max")
+MULT_KEY = "score_mult"
+PARAM_KEYS = CFG_KEYS + START_KEYS + (MULT_KEY,)
+POLICIES = ("L", "R", "random")
+PERCENTILES = (10, 50, 90)
+DAY_COUNT_KEYS = ("starve_morale_every_n_days", "low_food_death_days", "low_morale_death_days")
+_RANGE_EPS = 1e-9
+
+
+# ---------- Parameter grid ----------
+
+def parse_range(spec: str) -> List[Any]:
+    """
+    "0.1:0.3:0.05" -> arithmetic range including stop when a step lands on it (never past it);
+    "2,3,4" -> explicit values. Values stay ints when every number in the spec is an int.
+    """
+    is_int = all(part.lstrip("+-").isdigit() for part in spec.replace(":", ",").split(",") if part)
+    num = int if is_int else float
+    if ":" in spec:
+        start, stop, step = (num(p) for p in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"Step must be positive in {spec!r}.")
+        if stop < start:
+            raise ValueError(f"Empty range {spec!r} (stop is below start).")
+        # The epsilon keeps float steps that land on stop ("0.1:0.3:0.1") from losing it
+        count = (stop - start) // step + 1 if is_int else int((stop - start) / step + _RANGE_EPS) + 1
+        values = [start + i * step for i in range(count)]
+        return values if is_int else [round(v, 10) for v in values]
+    values = [num(p) for p in spec.split(",") if p]
+    if not values:
+        raise ValueError(f"No values in {spec!r}.")
+    return values
+
+
+def expand_grid(ranges: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    unknown = set(ranges) - set(PARAM_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameter(s): {', '.join(sorted(unknown))}.")
+    keys = list(ranges)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(ranges[k] for k in keys))]
+
+
+def effective_params(difficulty: str, point: Dict[str, Any]) -> Dict[str, Any]:
+    """The full parameter set a grid point runs with (difficulty defaults + overrides)."""
+    cfg = {k: DIFF_CFG[difficulty][k] for k in CFG_KEYS}
+    starts = dict(STARTS[difficulty])
+    mult = DIFF_SCORE_MULT.get(difficulty, 1.0)
+    for key, value in point.items():
+        if key in CFG_KEYS:
+            cfg[key] = value
+        elif key in START_KEYS:
+            starts[key] = value
+        else:
+            mult = value
+    if not 0 <= cfg["surprise_chance"] <= 1:
+        raise ValueError(f"surprise_chance={cfg['surprise_chance']} is not a probability in [0, 1].")
+    # Added to each choice's chance (then clamped), so a penalty down to -1 is allowed
+    if not -1 <= cfg["risk_success_bonus"] <= 1:
+        raise ValueError(f"risk_success_bonus={cfg['risk_success_bonus']} must be in [-1, 1].")
+    for key in DAY_COUNT_KEYS:
+        if cfg[key] != int(cfg[key]) or cfg[key] < 1:
+            raise ValueError(f"{key}={cfg[key]} must be a positive whole number of days.")
+    for stat in ("hp", "food", "morale"):
+        if starts[stat] > starts[f"{stat}_max"]:
+            raise ValueError(f"Start {stat}={starts[stat]} exceeds {stat}_max={starts[stat + '_max']}.")
+    return {"cfg": cfg, "starts": starts, "score_mult": mult}
+
+
+# ---------- Cache ----------
+
+def content_hash() -> str:
+    """Hash of the scenario and surprise tables every point depends on."""
+    blob = json.dumps({"scenarios": content_key(), "surprises": SURPRISES}, sort_keys=True)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def point_key(difficulty: str, params: Dict[str, Any], n_runs: int, policy: str, seed: int,
+              num_days: int, content: str) -> str:
+    blob = json.dumps(
+        {
+            "v": SWEEP_VERSION,
+            "difficulty": difficulty,
+            "params": params,
+            "surprise_p": list(surprise_probabilities(difficulty)),
+            "n_runs": n_runs,
+            "policy": policy,
+            "seed": seed,
+            "num_days": num_days,
+            "content": content,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(cache_dir("sweeps", key[:2]), f"{key}.json")
+
+
+def _load_cached(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_cache_path(key), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(key: str, result: Dict[str, Any]) -> None:
+    path = _cache_path(key)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(result, fh)
+    os.replace(tmp, path)
+
+
+# ---------- Evaluation ----------
+
+def evaluate_point(difficulty: str, params: Dict[str, Any], n_runs: int, policy: str, seed: int,
+                   num_days: int) -> Dict[str, Any]:
+    """Run one grid point on the batch simulator and reduce it to summary statistics."""
+    rng = np.random.default_rng(seed)
+    batch_policy: Any = policy
+    if policy == "random":
+        batch_policy = rng.random((n_runs, num_days)) < 0.5
+    res = simulate_batch(difficulty, n_runs, batch_policy, num_days=num_days, rng=rng,
+                         cfg=params["cfg"], starts=params["starts"], score_mult=params["score_mult"])
+    scores = res.scores
+    hist = np.bincount(scores)
+    return {
+        "runs": res.n_runs,
+        "win_rate": res.win_rate(),
+        "mean": float(scores.mean()),
+        "std": float(scores.std(ddof=1)) if n_runs > 1 else 0.0,
+        **{f"p{p}": int(np.percentile(scores, p, method="inverted_cdf")) for p in PERCENTILES},
+        "deaths": {k: v for k, v in res.cause_counts().items() if k != CAUSES[0]},
+        "score_hist": {str(s): int(c) for s, c in enumerate(hist) if c},
+    }
+
+
+def run_sweep(
+    difficulty: str,
+    ranges: Dict[str, Sequence[Any]],
+    *,
+    n_runs: int = 20_000,
+    policy: str = "random",
+    seed: int = 0,
+    num_days: Optional[int] = None,
+    workers: Optional[int] = 1,
+    use_cache: bool = True,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Evaluate every grid point; returns (rows, points computed). Each row is the point's
+    overrides plus its summary. Cached points (same parameters, scenarios, runs, seed and
+    policy) are read back instead of simulated, so widening a grid only runs the new points.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Policy must be one of {POLICIES}.")
+    n_days = num_days if num_days is not None else NUM_DAYS
+    if n_days < 1:
+        raise ValueError(f"Runs need at least one day (got {n_days}).")
+    if n_runs < 1:
+        raise ValueError(f"Each grid point needs at least one run (got {n_runs}).")
+    content = content_hash()
+    points = expand_grid(ranges)
+    params = [effective_params(difficulty, p) for p in points]
+    keys = [point_key(difficulty, prm, n_runs, policy, seed, n_days, content) for prm in params]
+
+    results: List[Optional[Dict[str, Any]]] = [_load_cached(k) if use_cache else None for k in keys]
+    todo = [i for i, r in enumerate(results) if r is None]
+
+    if workers == 1 or len(todo) <= 1:
+        computed = [evaluate_point(difficulty, params[i], n_runs, policy, seed, n_days) for i in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            computed = list(pool.map(
+                evaluate_point, itertools.repeat(difficulty), [params[i] for i in todo],
+                itertools.repeat(n_runs), itertools.repeat(policy), itertools.repeat(seed),
+                itertools.repeat(n_days),
+            ))
+    for i, res in zip(todo, computed):
+        results[i] = res
+        _store_cached(keys[i], res)
+
+    rows = [{**point, **res} for point, res in zip(points, results)]
+    return rows, len(todo)
+
+
+# ---------- Reporting ----------
+
+def format_rows(rows: List[Dict[str, Any]], keys: Sequence[str]) -> List[str]:
+    causes = CAUSES[1:]
+    head = " ".join(f"{k[:12]:>12}" for k in keys)
+    lines = [f"{head} {'win%':>6} {'mean':>8} " + " ".join(f"{'p%d' % p:>5}" for p in PERCENTILES)
+             + " " + " ".join(f"{c[:6]:>7}" for c in causes)]
+    for row in rows:
+        vals = " ".join(f"{row[k]:>12}" for k in keys)
+        deaths = " ".join(f"{100.0 * row['deaths'].get(c, 0) / row['runs']:6.1f}%" for c in causes)
+        lines.append(f"{vals} {100.0 * row['win_rate']:>5.1f}% {row['mean']:>8.2f} "
+                     + " ".join(f"{row['p%d' % p]:>5}" for p in PERCENTILES) + " " + deaths)
+    return lines
+
+
+def write_csv(path: str, rows: List[Dict[str, Any]], keys: Sequence[str]) -> None:
+    causes = CAUSES[1:]
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        w = csv.writer(fh)
+        w.writerow([*keys, "runs", "win_rate", "mean", "std", *(f"p{p}" for p in PERCENTILES), *causes])
+        for row in rows:
+            w.writerow([*(row[k] for k in keys), row["runs"], row["win_rate"], row["mean"], row["std"],
+                        *(row[f"p{p}"] for p in PERCENTILES), *(row["deaths"].get(c, 0) for c in causes)])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Sweep difficulty parameters on the batch simulator (results cached on disk).",
+        epilog="Example: python -m engine.sweep hard -P surprise_chance=0.1:0.3:0.05 -P food=2,3,4",
+    )
+    parser.add_argument("difficulty", choices=DIFFICULTIES)
+    parser.add_argument("-P", "--param", action="append", default=[], metavar="NAME=RANGE",
+                        help=f"start:stop:step or a,b,c; names: {', '.join(PARAM_KEYS)}")
+    parser.add_argument("-n", "--runs", type=int, default=20_000, help="runs per grid point")
+    parser.add_argument("-p", "--policy", choices=POLICIES, default="random")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=None)
+    parser.add_argument("-w", "--workers", type=int, default=1)
+    parser.add_argument("--no-cache", action="store_true", help="recompute every point (still refreshes the cache)")
+    parser.add_argument("--json", metavar="PATH")
+    parser.add_argument("--csv", metavar="PATH")
+    args = parser.parse_args()
+
+    ranges: Dict[str, List[Any]] = {}
+    for spec in args.param:
+        name, sep, values = spec.partition("=")
+        if not sep:
+            parser.error(f"--param needs NAME=RANGE, got {spec!r}")
+        try:
+            ranges[name.strip()] = parse_range(values.strip())
+        except ValueError as e:
+            parser.error(f"--param {name.strip()}: {e}")
+
+    try:
+        rows, computed = run_sweep(args.difficulty, ranges, n_runs=args.runs, policy=args.policy,
+                                   seed=args.seed, num_days=args.days, workers=args.workers,
+                                   use_cache=not args.no_cache)
+    except ValueError as e:
+        parser.error(str(e))
+
+    keys = list(ranges)
+    print("\n".join(format_rows(rows, keys)))
+    print(f"{len(rows)} points, {computed} simulated, {len(rows) - computed} from cache")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(rows, fh, indent=2)
+    if args.csv:
+        write_csv(args.csv, rows, keys)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+from __future__ import annotations
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from engine.scenarios import scenarios as SCENARIOS, surprise_events as SURPRISES, SurpriseEvent
+from engine.packs import ScenarioPack
+from engine.utils import LRUCache
+
+# ---------- Precompiled content tables ----------
+# Scenario and surprise dicts flattened once into tuples so the per-day hot path
+# (engine.game.resolve_day) does index arithmetic instead of string-key lookups.
+# Text is stored once in `texts` and referenced by integer id.
+
+Delta = Tuple[int, int, int]
+
+RESULT_NEUTRAL, RESULT_SUCCESS, RESULT_FAILURE = range(3)
+RESULTS = ("neutral", "success", "failure")
+
+SIDE_L, SIDE_R = 0, 1
+SIDES = ("L", "R")
+
+
+class ChoiceEntry(NamedTuple):
+    chance: Optional[float]  # None for flat choices
+    success: Delta           # flat choices: the effect
+    failure: Delta           # flat choices: same as success
+    text_id: int
+    log_id: int
+
+
+class ScenarioEntry(NamedTuple):
+    description_id: int
+    sides: Tuple[ChoiceEntry, ChoiceEntry]  # indexed by SIDE_L / SIDE_R
+
+
+class CfgEntry(NamedTuple):
+    risk_success_bonus: float
+    surprise_chance: float
+    starve_every: int
+    low_food_death_days: int
+    low_morale_death_days: int
+
+
+class CompiledTables(NamedTuple):
+    texts: Sequence[str]                 # tuple, or lazy views for a scenario pack
+    scenarios: Sequence[ScenarioEntry]
+    surprises: Tuple[Delta, ...]
+    surprise_text_ids: Tuple[int, ...]
+    index_of: Callable[[Any], int]  # scenario (dict or pack view) -> scenario index
+
+    def text(self, text_id: int) -> str:
+        return self.texts[text_id]
+
+
+def _delta(effect: Dict[str, int]) -> Delta:
+    return (effect.get("hp", 0), effect.get("food", 0), effect.get("morale", 0))
+
+
+def compile_tables(scenarios: Sequence[Dict[str, Any]] = SCENARIOS,
+                   surprises: Sequence[SurpriseEvent] = SURPRISES) -> CompiledTables:
+    texts: List[str] = []
+    text_ids: Dict[str, int] = {}
+
+    def intern(s: str) -> int:
+        tid = text_ids.get(s)
+        if tid is None:
+            tid = text_ids[s] = len(texts)
+            texts.append(s)
+        return tid
+
+    def choice(chosen: Dict[str, Any]) -> ChoiceEntry:
+        if "chance" in chosen:
+            return ChoiceEntry(
+                chance=float(chosen["chance"]),
+                success=_delta(chosen["success_effects"]),
+                failure=_delta(chosen["failure_effects"]),
+                text_id=intern(chosen["text"]),
+                log_id=intern(chosen["log_text"]),
+            )
+        eff = _delta(chosen["effects"])
+        return ChoiceEntry(None, eff, eff, intern(chosen["text"]), intern(chosen["log_text"]))
+
+    compiled = tuple(
+        ScenarioEntry(intern(sc["description"]), (choice(sc["left_choice"]), choice(sc["right_choice"])))
+        for sc in scenarios
+    )
+    surprise_text_ids = tuple(intern(ev.text) for ev in surprises)
+    return CompiledTables(
+        texts=tuple(texts),
+        scenarios=compiled,
+        surprises=tuple((ev.hp, ev.food, ev.morale) for ev in surprises),
+        surprise_text_ids=surprise_text_ids,
+        index_of=_identity_index(scenarios),
+    )
+
+
+def _identity_index(scenarios: Sequence[Dict[str, Any]]) -> Callable[[Any], int]:
+    """Index lookup for scenario dicts, which carry no index: keyed by id(), fixed by the library."""
+    index = {id(sc): i for i, sc in enumerate(scenarios)}
+
+    def index_of(scenario: Any) -> int:
+        return index[id(scenario)]
+
+    return index_of
+
+
+class _PackEntries(Sequence):
+    """ScenarioEntry per pack scenario, decoded from the mapped records; recent ones are cached."""
+
+    CACHE_SIZE = 1024
+
+    def __init__(self, pack: ScenarioPack):
+        self._pack = pack
+        self._entries = LRUCache(self.CACHE_SIZE)
+
+    def __len__(self) -> int:
+        return len(self._pack)
+
+    def __getitem__(self, i: int) -> ScenarioEntry:
+        entry = self._entries.get(i)
+        if entry is None:
+            description_id, left, right = self._pack.record(i)
+            entry = self._entries.put(i, ScenarioEntry(description_id, (ChoiceEntry(*left), ChoiceEntry(*right))))
+        return entry
+
+
+class _PackTexts(Sequence):
+    """The pack's texts (decoded on every lookup) followed by the built-in surprise texts."""
+
+    def __init__(self, pack: ScenarioPack, extra: Tuple[str, ...]):
+        self._pack = pack
+        self._extra = extra
+
+    def __len__(self) -> int:
+        return self._pack.n_texts + len(self._extra)
+
+    def __getitem__(self, text_id: int) -> str:
+        if text_id < self._pack.n_texts:
+            return self._pack.text(text_id)
+        return self._extra[text_id - self._pack.n_texts]
+
+
+def pack_tables(pack: ScenarioPack, surprises: Sequence[SurpriseEvent] = SURPRISES) -> CompiledTables:
+    """
+    Tables over a memory-mapped scenario pack: nothing is decoded up front, so startup
+    cost and memory do not grow with the pack. Views carry their own index, so index_of reads it.
+    """
+    n = pack.n_texts
+    return CompiledTables(
+        texts=_PackTexts(pack, tuple(ev.text for ev in surprises)),
+        scenarios=_PackEntries(pack),
+        surprises=tuple((ev.hp, ev.food, ev.morale) for ev in surprises),
+        surprise_text_ids=tuple(range(n, n + len(surprises))),
+        index_of=attrgetter("index"),
+    )
+
+
+TABLES = pack_tables(SCENARIOS) if isinstance(SCENARIOS, ScenarioPack) else compile_tables()
+
+_CFG_CACHE: Dict[int, Tuple[Dict[str, Any], CfgEntry]] = {}
+
+
+def compile_cfg(cfg: Dict[str, Any]) -> CfgEntry:
+    """Flatten a DIFF_CFG-style dict; cached per dict object (cfg dicts are long-lived)."""
+    hit = _CFG_CACHE.get(id(cfg))
+    if hit is not None and hit[0] is cfg:
+        return hit[1]
+    entry = CfgEntry(
+        risk_success_bonus=cfg.get("risk_success_bonus", 0.0),
+        surprise_chance=cfg.get("surprise_chance", 0.2),
+        starve_every=cfg["starve_morale_every_n_days"],
+        low_food_death_days=cfg.get("low_food_death_days", 3),
+        low_morale_death_days=cfg.get("low_morale_death_days", 3),
+    )
+    _CFG_CACHE[id(cfg)] = (cfg, entry)
+    return entry
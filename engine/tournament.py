@@ -0,0 +1,317 @@
+from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import importlib
+import json
+import random
+import sys
+
+from engine.game import GameState
+from engine.sim import Policy, SimSummary, run_shard
+from engine.config import CAUSES, DIFFICULTIES
+from engine.tables import TABLES, compile_cfg
+from engine.utils import clamp
+
+# ---------- Built-in policies ----------
+# All follow the engine.sim Policy shape: (state, today's scenario) -> "L" | "R".
+# Optional hooks:
+#   for_difficulty(difficulty) -> policy   (per-difficulty tables, e.g. the solver); resolved once
+#                                          in the parent, the result shipped once to each worker
+#   for_shard(seed, shard) -> policy       (private randomness that must not depend on scheduling);
+#                                          resolved inside the worker for every shard
+
+SCORE_WEIGHTS = (5, 2, 5)  # final_score points per hp / food / morale
+
+
+def always_left(state: GameState, scenario: Dict[str, Any]) -> str:
+    return "L"
+
+
+def always_right(state: GameState, scenario: Dict[str, Any]) -> str:
+    return "R"
+
+
+def expected_gain(state: GameState, scenario: Dict[str, Any], side: int) -> Tuple[float, float, float]:
+    """Expected change of (hp, food, morale) for one side, after clamping to the current stats."""
+    chosen = TABLES.scenarios[TABLES.index_of(scenario)].sides[side]
+    p = state.player
+    stats, caps = (p.hp, p.food, p.morale), (p.hp_max, p.food_max, p.morale_max)
+
+    def gain(effect):
+        return [clamp(v + d, 0, cap) - v for v, d, cap in zip(stats, effect, caps)]
+
+    if chosen.chance is None:
+        return tuple(gain(chosen.success))
+    prob = clamp(chosen.chance + compile_cfg(state.cfg).risk_success_bonus, 0.05, 0.95)
+    win, lose = gain(chosen.success), gain(chosen.failure)
+    return tuple(prob * w + (1.0 - prob) * l for w, l in zip(win, lose))
+
+
+def greedy(state: GameState, scenario: Dict[str, Any]) -> str:
+    """Maximize today's expected score-weighted stat change; ties go left."""
+    left, right = (sum(w * g for w, g in zip(SCORE_WEIGHTS, expected_gain(state, scenario, side)))
+                   for side in (0, 1))
+    return "R" if right > left else "L"
+
+
+class ThresholdPolicy:
+    """
+    Protect the first stat (hp, then food, then morale) at or below its threshold by
+    picking the side with the better expected change for it; otherwise play greedy.
+    """
+
+    def __init__(self, hp: int = 2, food: int = 1, morale: int = 1):
+        self.thresholds = (hp, food, morale)
+
+    def __call__(self, state: GameState, scenario: Dict[str, Any]) -> str:
+        p = state.player
+        for i, (value, limit) in enumerate(zip((p.hp, p.food, p.morale), self.thresholds)):
+            if value <= limit:
+                left = expected_gain(state, scenario, 0)[i]
+                right = expected_gain(state, scenario, 1)[i]
+                if left != right:
+                    return "R" if right > left else "L"
+        return greedy(state, scenario)
+
+
+class RandomPolicy:
+    """Fair coin per day from its own stream, so it never disturbs the run's RNG."""
+
+    def __init__(self, seed: Any = 0):
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+    def for_shard(self, seed: int, shard: int) -> "RandomPolicy":
+        return RandomPolicy(f"{self.seed}:{seed}:{shard}")
+
+    def __call__(self, state: GameState, scenario: Dict[str, Any]) -> str:
+        return "R" if self.rng.random() < 0.5 else "L"
+
+
+class SolverPolicy:
+    """The exact optimal policy from engine.solver (solved on first use, then cached on disk)."""
+
+    def for_difficulty(self, difficulty: str):
+        return _solved(difficulty)
+
+
+@lru_cache(maxsize=None)
+def _solved(difficulty: str):
+    from engine.solver import load_or_solve
+    return load_or_solve(difficulty)
+
+
+BUILTIN_POLICIES: Dict[str, Callable[[], Policy]] = {
+    "left": lambda: always_left,
+    "right": lambda: always_right,
+    "random": RandomPolicy,
+    "greedy": lambda: greedy,
+    "threshold": ThresholdPolicy,
+    "cautious": lambda: ThresholdPolicy(hp=3, food=2, morale=2),
+    "optimal": SolverPolicy,
+}
+DEFAULT_POLICIES = ("left", "right", "random", "greedy", "threshold", "cautious")
+
+
+def load_policy(spec: str) -> Policy:
+    """A built-in name or "package.module:attr"; classes are instantiated without arguments."""
+    if spec in BUILTIN_POLICIES:
+        return BUILTIN_POLICIES[spec]()
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"Unknown policy {spec!r} (built-ins: {', '.join(BUILTIN_POLICIES)}).")
+    obj = getattr(importlib.import_module(module), attr)
+    return obj() if isinstance(obj, type) else obj
+
+
+# ---------- Tournament ----------
+
+# (difficulty, policy name) -> policy with for_difficulty applied; set once per worker process
+_SHARD_POLICIES: Dict[Tuple[str, str], Policy] = {}
+
+
+def _init_shard_policies(policies: Dict[Tuple[str, str], Policy]) -> None:
+    _SHARD_POLICIES.clear()
+    _SHARD_POLICIES.update(policies)
+
+
+def _play_shard(difficulty: str, name: str, seed: int, shard: int, n: int) -> SimSummary:
+    """One shard for one policy; every policy sees the same run seeds for a given (seed, shard)."""
+    policy = _SHARD_POLICIES[(difficulty, name)]
+    if hasattr(policy, "for_shard"):
+        policy = policy.for_shard(seed, shard)
+    return run_shard(difficulty, policy, seed, shard, n, None)
+
+
+def separated(summaries: Dict[str, SimSummary], mode: str, z: float) -> bool:
+    """
+    leader:  the best mean's interval lies above every other interval.
+    ranking: every adjacent pair in the mean ranking has disjoint intervals.
+    """
+    ranked = sorted(summaries.values(), key=lambda s: s.mean_score, reverse=True)
+    if len(ranked) < 2:
+        return True
+    cis = [s.mean_ci(z) for s in ranked]
+    if mode == "leader":
+        return all(cis[0][0] > hi for _, hi in cis[1:])
+    return all(cis[i][0] > cis[i + 1][1] for i in range(len(cis) - 1))
+
+
+def run_tournament(
+    policies: Dict[str, Policy],
+    difficulties: Sequence[str] = DIFFICULTIES,
+    *,
+    seed: int = 0,
+    shard_size: int = 2_000,
+    min_runs: int = 4_000,
+    max_runs: int = 100_000,
+    stop: Optional[str] = "leader",
+    z: float = 2.576,
+    workers: Optional[int] = None,
+    on_round: Optional[Callable[[str, Dict[str, SimSummary], bool], None]] = None,
+) -> Dict[str, Dict[str, SimSummary]]:
+    """
+    Play every policy on the same seeds, one shard round at a time per difficulty, with all
+    difficulties in flight together. After each complete round the difficulty's table is
+    passed to on_round(difficulty, summaries, done); it stops early once runs >= min_runs
+    and the confidence intervals separate (stop="leader" | "ranking"; None = play max_runs).
+    """
+    results = {d: {name: SimSummary() for name in policies} for d in difficulties}
+    rounds = {d: 0 for d in difficulties}
+    outstanding = {d: 0 for d in difficulties}
+    max_rounds = max(1, -(-max_runs // shard_size))
+
+    # Per-difficulty tables (the solver's) are loaded or solved here, once, not in every worker
+    resolved = {
+        (d, name): policy.for_difficulty(d) if hasattr(policy, "for_difficulty") else policy
+        for d in difficulties for name, policy in policies.items()
+    }
+    if workers != 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_policies,
+                                   initargs=(resolved,))
+    else:
+        pool = None
+        _init_shard_policies(resolved)
+
+    def submit(diff: str) -> List[Future]:
+        shard = rounds[diff]
+        n = min(shard_size, max_runs - shard * shard_size)
+        futs = []
+        for name in policies:
+            if pool is not None:
+                fut = pool.submit(_play_shard, diff, name, seed, shard, n)
+            else:
+                fut = Future()
+                fut.set_result(_play_shard(diff, name, seed, shard, n))
+            fut.key = (diff, name)
+            futs.append(fut)
+        outstanding[diff] = len(futs)
+        return futs
+
+    try:
+        pending = set()
+        for diff in difficulties:
+            pending.update(submit(diff))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                diff, name = fut.key
+                results[diff][name].merge(fut.result())
+                outstanding[diff] -= 1
+                if outstanding[diff]:
+                    continue
+                rounds[diff] += 1
+                runs = rounds[diff] * shard_size
+                finished = rounds[diff] >= max_rounds or (
+                    stop is not None and runs >= min_runs and separated(results[diff], stop, z)
+                )
+                if on_round is not None:
+                    on_round(diff, results[diff], finished)
+                if not finished:
+                    pending.update(submit(diff))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return results
+
+
+# ---------- Reporting ----------
+
+def format_table(difficulty: str, summaries: Dict[str, SimSummary], z: float = 2.576) -> List[str]:
+    causes = CAUSES[1:]
+    lines = [
+        f"== {difficulty} ==",
+        f"{'#':>2} {'policy':<12} {'runs':>8} {'mean':>8} {'±ci':>6} {'p10':>5} {'p50':>5} {'p90':>5} {'win%':>6} "
+        + " ".join(f"{c[:6]:>7}" for c in causes),
+    ]
+    ranked = sorted(summaries.items(), key=lambda kv: kv[1].mean_score, reverse=True)
+    for rank, (name, s) in enumerate(ranked, 1):
+        lo, hi = s.mean_ci(z)
+        deaths = " ".join(f"{100.0 * s.deaths.get(c, 0) / max(1, s.runs):6.1f}%" for c in causes)
+        lines.append(
+            f"{rank:>2} {name:<12} {s.runs:>8} {s.mean_score:>8.2f} {(hi - lo) / 2:>6.2f} "
+            f"{s.score_percentile(10):>5} {s.score_percentile(50):>5} {s.score_percentile(90):>5} "
+            f"{100.0 * s.win_rate:>5.1f}% {deaths}"
+        )
+    return lines
+
+
+def to_json(results: Dict[str, Dict[str, SimSummary]], z: float) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for diff, summaries in results.items():
+        out[diff] = {
+            name: {
+                "runs": s.runs,
+                "mean": s.mean_score,
+                "ci": list(s.mean_ci(z)),
+                "p10": s.score_percentile(10),
+                "p50": s.score_percentile(50),
+                "p90": s.score_percentile(90),
+                "win_rate": s.win_rate,
+                "deaths": dict(s.deaths),
+            }
+            for name, s in summaries.items()
+        }
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Play policies head-to-head on the same seeds.")
+    parser.add_argument("-p", "--policy", action="append", default=None,
+                        help=f"built-in ({', '.join(BUILTIN_POLICIES)}) or module:attr; repeatable")
+    parser.add_argument("-d", "--difficulty", action="append", choices=DIFFICULTIES, default=None)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--shard-size", type=int, default=2_000)
+    parser.add_argument("--min-runs", type=int, default=4_000)
+    parser.add_argument("--max-runs", type=int, default=100_000)
+    parser.add_argument("--stop", choices=("leader", "ranking", "none"), default="leader")
+    parser.add_argument("--z", type=float, default=2.576, help="CI width in standard errors (2.576 = 99%%)")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print final tables")
+    parser.add_argument("--json", metavar="PATH", help="write final results as JSON")
+    args = parser.parse_args()
+
+    specs = args.policy or list(DEFAULT_POLICIES)
+    policies = {spec: load_policy(spec) for spec in specs}
+    difficulties = args.difficulty or list(DIFFICULTIES)
+
+    def progress(diff, summaries, done):
+        if args.quiet and not done:
+            return
+        print("\n".join(format_table(diff, summaries, args.z)) + ("\n(final)" if done else ""), flush=True)
+
+    results = run_tournament(
+        policies, difficulties, seed=args.seed, shard_size=args.shard_size, min_runs=args.min_runs,
+        max_runs=args.max_runs, stop=None if args.stop == "none" else args.stop, z=args.z,
+        workers=args.workers, on_round=progress,
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(to_json(results, args.z), fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,192 @@
+import os
+from collections import OrderedDict
+
+
 def clamp(value, min_value, max_value):
-    return max(min_value, min(value, max_value))
\ No newline at end of file
+    return max(min_value, min(value, max_value))
+
+
+def cache_dir(*parts):
+    """Directory for generated data (solver tables, sweep results); override with SWIPE_CACHE_DIR."""
+    root = os.environ.get("SWIPE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "swipe-decision-game")
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class LRUCache:
+    """
+    Bounded cache: get() refreshes an entry, put() evicts the least recently used past maxsize.
+    Safe to share between threads without a lock: each OrderedDict call is atomic, and a key
+    another thread evicts between get()'s lookup and refresh is simply not refreshed.
+    """
+    __slots__ = ("maxsize", "_data")
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("LRUCache needs maxsize >= 1.")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        value = self._data.get(key)
+        if value is not None:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                pass
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        while len(self._data) > self.maxsize:
+            try:
+                self._data.popitem(last=False)
+            except KeyError:  # emptied by other threads' evictions
+                break
+        return value
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table: O(n) build, O(1) weighted sampling from one uniform draw.
+    sample() takes any object with a random() method (the random module, random.Random, ...).
+    """
+    __slots__ = ("n", "prob", "alias")
+
+    def __init__(self, weights):
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight.")
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        self.n = n
+        self.prob = tuple(prob)
+        self.alias = tuple(alias)
+
+    def sample(self, rng):
+        u = rng.random() * self.n
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+
+class FeistelPermutation:
+    """
+    Keyed pseudo-random permutation of range(n): O(1) time and memory per lookup.
+    A Feistel network permutes the smallest power-of-two domain covering n (halves may
+    differ by one bit); cycle-walking maps it back into range(n), which takes fewer
+    than two passes on average. Not cryptographic, only well mixed.
+    """
+    __slots__ = ("n", "bits", "keys")
+
+    ROUNDS = 6
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, n, key):
+        if n <= 0:
+            raise ValueError("FeistelPermutation needs n >= 1.")
+        self.n = n
+        self.bits = max(2, (n - 1).bit_length())
+        self.keys = tuple(self._mix(key & self._MASK64, r + 1) for r in range(self.ROUNDS))
+
+    @classmethod
+    def _mix(cls, x, k):
+        h = ((x ^ k) * 0x9E3779B97F4A7C15) & cls._MASK64
+        h ^= h >> 29
+        h = (h * 0xBF58476D1CE4E5B9) & cls._MASK64
+        return h ^ (h >> 32)
+
+    def _encrypt(self, x):
+        hi_bits = self.bits // 2
+        lo_bits = self.bits - hi_bits
+        for k in self.keys:
+            hi, lo = x >> lo_bits, x & ((1 << lo_bits) - 1)
+            # (hi, lo) -> (lo, hi ^ F(lo)); the halves swap widths each round
+            x = (lo << hi_bits) | ((hi ^ self._mix(lo, k)) & ((1 << hi_bits) - 1))
+            hi_bits, lo_bits = lo_bits, hi_bits
+        return x
+
+    def __call__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError("permutation index out of range")
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+
+class WyRand:
+    """
+    Small-state PRNG (wyrand: a 64-bit Weyl sequence through a folded 128-bit multiply) for
+    per-run streams. The whole state is one 64-bit int, so a run's generator costs a few dozen
+    bytes and snapshots store 8 bytes; seeding is O(1). Covers the part of the random.Random
+    API the engine uses: random(), getrandbits(), sample(), getstate()/setstate().
+    Not cryptographic; streams differ from random.Random's for the same seed.
+    """
+    __slots__ = ("state",)
+
+    _MASK64 = (1 << 64) - 1
+    _XOR = 0xE7037ED1A0B428DB  # the step constants are inlined in the hot methods below
+
+    def __init__(self, seed=0):
+        # Fold big seeds into 64 bits and scramble, so consecutive seeds start far apart
+        seed = int(seed)
+        x = seed & self._MASK64
+        seed >>= 64
+        while seed:
+            x ^= FeistelPermutation._mix(seed & self._MASK64, x)
+            seed >>= 64
+        self.state = FeistelPermutation._mix(x, self._XOR)
+
+    def _next(self):
+        s = self.state = (self.state + 0xA0761D6478BD642F) & 0xFFFFFFFFFFFFFFFF
+        t = s * (s ^ 0xE7037ED1A0B428DB)
+        return ((t >> 64) ^ t) & 0xFFFFFFFFFFFFFFFF
+
+    def random(self):
+        """Float in [0, 1) with 53 random bits."""
+        s = self.state = (self.state + 0xA0761D6478BD642F) & 0xFFFFFFFFFFFFFFFF
+        t = s * (s ^ 0xE7037ED1A0B428DB)
+        return ((((t >> 64) ^ t) & 0xFFFFFFFFFFFFFFFF) >> 11) * 1.1102230246251565e-16
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self._next() >> (64 - k) if k > 0 else 0
+        x = 0
+        for shift in range(0, k, 64):
+            x |= self._next() << shift
+        return x & ((1 << k) - 1)
+
+    def sample(self, population, k):
+        """
+        k distinct items in random order (partial Fisher-Yates over a copy). Indices are
+        int(random() * m): one draw each, off from uniform by at most m / 2**53.
+        """
+        pool = list(population)
+        n = len(pool)
+        if not 0 <= k <= n:
+            raise ValueError("Sample larger than population or is negative")
+        rnd = self.random
+        for i in range(k):
+            j = i + int(rnd() * (n - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state & self._MASK64
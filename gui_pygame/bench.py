@@ -0,0 +1,150 @@
+# gui_pygame/bench.py
+"""
+Headless frame-time benchmark for the GUI scenes.
+
+    python -m gui_pygame.bench --frames 600 --log-lines 2000
+
+Runs under the SDL dummy video driver (no window needed), drives MainMenu,
+GameScene (scripted choices, log pre-filled to N lines) and GameOverScene for a
+fixed number of frames each, and reports update/draw time percentiles per scene.
+"""
+import os
+
+# Must be set before pygame initializes the display (gui_pygame.main does it at import)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import sys
+import time
+
+import pygame
+
+from engine.game import start_run, apply_choice, final_score
+from gui_pygame import main as gui
+
+PERCENTILES = (50, 90, 99)
+DT = 1.0 / gui.FPS
+
+
+class _NullManager:
+    """Scene manager stand-in that ignores switches, so a scene can be measured in isolation."""
+    def switch(self, new_scene):
+        pass
+
+
+def percentile(sorted_vals, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals), math.ceil(pct / 100.0 * len(sorted_vals))) - 1)
+    return sorted_vals[k]
+
+
+def summarize(samples_ms):
+    vals = sorted(samples_ms)
+    out = {f"p{p}": percentile(vals, p) for p in PERCENTILES}
+    out["max"] = vals[-1] if vals else 0.0
+    out["mean"] = sum(vals) / len(vals) if vals else 0.0
+    return out
+
+
+def _hover_event(frame, buttons):
+    """Move the mouse across the scene's buttons so hover repaints are exercised."""
+    btn = buttons[(frame // 10) % len(buttons)]
+    pos = btn.rect.center if (frame // 5) % 2 == 0 else (5, 5)
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+
+def run_scene(scene, frames, *, mode="full", on_frame=None, buttons=()):
+    """Drive one scene for `frames` frames; returns per-phase samples in ms."""
+    surf = gui.SCREEN
+    samples = {"update": [], "draw": []}
+    scene.draw(surf)  # warm-up frame (fills caches like the first real frame would)
+    for frame in range(frames):
+        if on_frame:
+            on_frame(frame)
+        if buttons:
+            scene.handle_event(_hover_event(frame, buttons))
+
+        t0 = time.perf_counter()
+        scene.update(DT)
+        t1 = time.perf_counter()
+        if mode == "full":
+            scene.draw(surf)
+        else:
+            scene.draw_dirty(surf)
+        t2 = time.perf_counter()
+
+        samples["update"].append((t1 - t0) * 1000.0)
+        samples["draw"].append((t2 - t1) * 1000.0)
+    return samples
+
+
+def bench(frames=300, log_lines=500, seed=0, difficulty="normal", choice_every=30, mode="full"):
+    results = {}
+    mgr = _NullManager()
+
+    # ---- Main menu ----
+    menu = gui.MainMenu(mgr)
+    results["MainMenu"] = run_scene(menu, frames, mode=mode, buttons=menu.widgets)
+
+    # ---- Game scene ----
+    game = gui.GameScene(mgr, difficulty, seed=seed)
+    colors = (gui.TEXT, gui.OK, gui.BAD, gui.PURPLE)
+    for i in range(log_lines):
+        game.log_panel.add_line(f"• Filler journal line {i} (HP +0, Food -1, Morale +1)", colors[i % len(colors)])
+    script = "LRRLLRLRRL"
+
+    def play(frame):
+        if frame % choice_every == 0:
+            game.choose(script[(frame // choice_every) % len(script)])
+
+    results["GameScene"] = run_scene(game, frames, mode=mode, on_frame=play,
+                                     buttons=[game.btn_left, game.btn_right])
+
+    # ---- Game over ----
+    state = start_run(difficulty, seed=seed)
+    while not state.over:
+        apply_choice(state, "L")
+    over = gui.GameOverScene(mgr, state, final_score(state))
+    results["GameOverScene"] = run_scene(over, frames, mode=mode, buttons=over.widgets)
+
+    return {scene: {phase: summarize(vals) for phase, vals in phases.items()}
+            for scene, phases in results.items()}
+
+
+def print_report(report, header):
+    print(header)
+    cols = [f"p{p}" for p in PERCENTILES] + ["max", "mean"]
+    print(f"{'scene':<14} {'phase':<7} " + " ".join(f"{c:>8}" for c in cols) + "   (ms)")
+    for scene, phases in report.items():
+        for phase, stats in phases.items():
+            print(f"{scene:<14} {phase:<7} " + " ".join(f"{stats[c]:8.3f}" for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless GUI frame-time benchmark.")
+    parser.add_argument("--frames", type=int, default=300, help="frames per scene")
+    parser.add_argument("--log-lines", type=int, default=500, help="lines pre-filled into the log panel")
+    parser.add_argument("--difficulty", default="normal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--choice-every", type=int, default=30, help="frames between scripted choices")
+    parser.add_argument("--mode", choices=("full", "dirty"), default="full",
+                        help="full: Scene.draw every frame; dirty: Scene.draw_dirty (what the loop does)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    report = bench(args.frames, args.log_lines, args.seed, args.difficulty, args.choice_every, args.mode)
+    print_report(report, f"frames={args.frames} log_lines={args.log_lines} mode={args.mode} "
+                         f"driver={os.environ.get('SDL_VIDEODRIVER')}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"params": vars(args), "results": report}, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,34 @@
 # gui_pygame/main.py
+import csv
+import os
 import sys
+from bisect import bisect_right
+from collections import OrderedDict, deque
+from time import perf_counter_ns, strftime
+
 import pygame
 
 # ---- Engine API ----
 from engine.game import (
-    start_run,
     get_today_scenario,
-    apply_choice,
     is_over,
     final_score,
+    apply_choice,
 )
+from engine.journal import log_text, surprise_text, delta_text
+from engine.tables import RESULT_SUCCESS, RESULT_FAILURE
+from engine.replay import start_recorded_run, append_replay, default_replay_path
+from engine.save import save_state, load_state, default_save_path
+from engine.instrument import PhaseTimer, EventCounter, attach
+from engine.utils import cache_dir
 
 # --------------- Pygame setup ---------------
 WIDTH, HEIGHT = 900, 600
-FPS = 60
+FPS = 60                # cap while something animates
+IDLE_TIMEOUT_MS = 500   # longest block in event.wait when idle
+ACTIVE_LINGER = 0.25    # seconds to stay at full rate after input (hover, wheel scrolling)
+REPLAY_PATH = None      # finished runs are appended here when set (main() sets it)
+SAVE_PATH = None        # save/continue slot (main() sets it)
 
 pygame.init()
 pygame.display.set_caption("Swipe Decision Game — GUI")
@@ -40,8 +55,102 @@ WHITE   = pygame.Color(255, 255, 255)
 BLACK   = pygame.Color(0, 0, 0)
 
 
+# --- Shared text layout / surface cache ---
+class TextCache:
+    """
+    Bounded LRU of rendered text surfaces and word-wrapped layouts, shared by all widgets.
+    Keys: (font, text, color) for surfaces, (font, text, wrap width) for layouts.
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key, build):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = self._entries[key] = build()
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def render(self, font, text, color):
+        color = tuple(color)
+        return self._lookup(("render", font, text, color), lambda: font.render(text, True, color))
+
+    def wrap(self, font, text, width):
+        """Greedy word wrap to width pixels; returns a tuple of lines."""
+        return self._lookup(("wrap", font, text, width), lambda: _wrap_words(font, text, width))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _wrap_words(font, text, width):
+    lines = []
+    line = ""
+    for word in text.split(" "):
+        test = (line + " " + word).strip()
+        if font.size(test)[0] <= width:
+            line = test
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return tuple(lines)
+
+
+TEXT_CACHE = TextCache()
+
+
+# --- Dirty-rect widget base ---
+class Widget:
+    """
+    Widgets invalidate themselves when their look changes; scenes then repaint
+    only dirty widgets and push just those rects to the display.
+    backdrop: color behind the widget, used to clear its rect before a repaint.
+    """
+    rect: pygame.Rect
+    backdrop = BG
+    dirty = True
+    profile_kind = None  # FrameProfiler column this widget's time is booked under
+
+    def invalidate(self):
+        self.dirty = True
+
+    def draw(self, surf): ...
+
+    def repaint(self, surf):
+        """Clear own rect to the backdrop, redraw, and return the rect to update."""
+        clip = surf.get_clip()
+        surf.set_clip(self.rect)
+        surf.fill(self.backdrop, self.rect)
+        self.draw(surf)
+        surf.set_clip(clip)
+        return self.rect
+
+
+def repaint_dirty(surf, widgets):
+    return [profiled(w.profile_kind, w.repaint, surf) for w in widgets if w.dirty]
+
+
 # --- HUD with flashable bars ---
-class StatBar:
+class StatBar(Widget):
+    backdrop = PANEL
+    profile_kind = "HUD"
+
     def __init__(self, label, get_pair, rect, base_color, text_color):
         """
         get_pair: callable -> (value, max_value)
@@ -58,16 +167,22 @@ class StatBar:
         self.flash_color = base_color
         self.flash_duration = 1    # how long to flash
 
+        self._drawn_pair = None     # (value, max) at last draw
+
     def flash(self, delta):
         if delta == 0:
             return
         # green for positive, red for negative
         self.flash_color = OK if delta > 0 else BAD
         self.flash_t = self.flash_duration
+        self.invalidate()
 
     def update(self, dt):
         if self.flash_t > 0:
             self.flash_t = max(0.0, self.flash_t - dt)
+            self.invalidate()  # color lerps every frame while flashing
+        elif self.get_pair() != self._drawn_pair:
+            self.invalidate()
 
     def _mix_color(self):
         """
@@ -82,8 +197,9 @@ class StatBar:
         return self.flash_color.lerp(self.base_color, 1.0 - alpha)
 
     def draw(self, surf):
+        self.dirty = False
         x, y, w, h = self.rect
-        val, mx = self.get_pair()
+        val, mx = self._drawn_pair = self.get_pair()
         pct = 0 if mx <= 0 else max(0.0, min(1.0, val / mx))
 
         # frame
@@ -96,7 +212,7 @@ class StatBar:
             pygame.draw.rect(surf, color, (x + 2, y + 2, fill_w, h - 4), border_radius=8)
 
         # label
-        txt = FONT_SM.render(f"{self.label}: {val}/{mx}", True, self.text_color)
+        txt = TEXT_CACHE.render(FONT_SM, f"{self.label}: {val}/{mx}", self.text_color)
         surf.blit(txt, (x + 8, y + h // 2 - txt.get_height() // 2))
 
 class HUD:
@@ -115,6 +231,9 @@ class HUD:
         for b in self.bars:
             b.update(dt)
 
+    def is_animating(self):
+        return any(b.flash_t > 0 for b in self.bars)
+
     def draw(self, surf):
         self.hp_bar.draw(surf)
         self.food_bar.draw(surf)
@@ -129,7 +248,9 @@ class HUD:
             self.mor_bar.flash(morale_delta)
 
 # --- Scrollable log panel ---
-class LogPanel:
+class LogPanel(Widget):
+    profile_kind = "LogPanel"
+
     def __init__(self, rect, font, *, bg=PANEL, fg=TEXT, border=WHITE, spacing=4, pad=10):
         self.rect = pygame.Rect(rect)
         self.font = font
@@ -142,23 +263,46 @@ class LogPanel:
         self.scroll = 0  # pixels from top
         self._content_h = 0  # total rendered height
 
+        # Virtualization: per-line top offset (updated incrementally on append);
+        # line surfaces come from the shared TEXT_CACHE, so only visible lines are rendered
+        self._tops: list[int] = []
+
         # scroll behavior
         self.wheel_step = 24   # pixels per wheel "tick"
         self.auto_follow = True  # stay at bottom when new lines added
 
     def add_line(self, text: str, color: pygame.Color | None = None):
         self.lines.append((text, color or self.fg))
-        # Precompute content height
-        self._content_h = 0
-        for t, _ in self.lines:
-            self._content_h += self.font.size(t)[1] + self.spacing
-        self._content_h = max(0, self._content_h - self.spacing)
+        # Extend content height by the new line only
+        top = self._content_h + self.spacing if self._tops else 0
+        height = self.font.size(text)[1]
+        self._tops.append(top)
+        self._content_h = top + height
 
         # Auto-scroll to bottom when new content arrives
         if self.auto_follow:
             self.scroll = max(0, self._content_h - (self.rect.h - 2*self.pad))
+        self.invalidate()
+
+    def _line_surface(self, i):
+        text, color = self.lines[i]
+        return TEXT_CACHE.render(self.font, text, color)
+
+    def visible_range(self, view_h):
+        """Indices [first, last) of lines intersecting the viewport at the current scroll."""
+        if not self._tops:
+            return 0, 0
+        first = max(0, bisect_right(self._tops, self.scroll) - 1)
+        last = bisect_right(self._tops, self.scroll + view_h, lo=first)
+        return first, last
 
     def handle_event(self, event):
+        before = self.scroll
+        self._handle_scroll(event)
+        if self.scroll != before:
+            self.invalidate()
+
+    def _handle_scroll(self, event):
         # Wheel up/down
         if event.type == pygame.MOUSEWHEEL:
             # In pygame: positive y = scroll up; negative y = scroll down
@@ -191,6 +335,7 @@ class LogPanel:
         self.scroll = max(0, min(self.scroll, self._max_scroll()))
 
     def draw(self, surf):
+        self.dirty = False
         # Panel background
         pygame.draw.rect(surf, self.bg, self.rect, border_radius=12)
         pygame.draw.rect(surf, self.border, self.rect, 2, border_radius=12)
@@ -200,14 +345,10 @@ class LogPanel:
         inner = self.rect.inflate(-2*self.pad, -2*self.pad)
         surf.set_clip(inner)
 
-        # Draw visible lines
-        y = inner.y - self.scroll
-        for text, color in self.lines:
-            img = self.font.render(text, True, color)
-            # only draw if intersects viewport
-            if y + img.get_height() >= inner.y and y <= inner.bottom:
-                surf.blit(img, (inner.x, y))
-            y += img.get_height() + self.spacing
+        # Draw only the lines inside the viewport
+        first, last = self.visible_range(inner.h)
+        for i in range(first, last):
+            surf.blit(self._line_surface(i), (inner.x, inner.y + self._tops[i] - self.scroll))
 
         surf.set_clip(clip)
 
@@ -223,24 +364,32 @@ class LogPanel:
             pygame.draw.rect(surf, (200,200,210), thumb, border_radius=3)
 
 # --------------- Small UI helpers ---------------
-class Button:
-    def __init__(self, rect, label, on_click, color=ACCENT):
+class Button(Widget):
+    profile_kind = "Button"
+
+    def __init__(self, rect, label, on_click, color=ACCENT, backdrop=BG):
         self.rect = pygame.Rect(rect)
         self.label = label
         self.on_click = on_click
         self.color = color
+        self.backdrop = backdrop
+        self.hovering = self.rect.collidepoint(pygame.mouse.get_pos())
 
     def draw(self, surf):
-        mouse = pygame.mouse.get_pos()
-        hovering = self.rect.collidepoint(mouse)
-        c = self.color.lerp(WHITE, 0.15) if hovering else self.color
+        self.dirty = False
+        c = self.color.lerp(WHITE, 0.15) if self.hovering else self.color
         pygame.draw.rect(surf, c, self.rect, border_radius=10)
         pygame.draw.rect(surf, WHITE, self.rect, 2, border_radius=10)
-        text = FONT_MD.render(self.label, True, WHITE)
+        text = TEXT_CACHE.render(FONT_MD, self.label, WHITE)
         surf.blit(text, text.get_rect(center=self.rect.center))
 
     def handle(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        if event.type == pygame.MOUSEMOTION:
+            hovering = self.rect.collidepoint(event.pos)
+            if hovering != self.hovering:
+                self.hovering = hovering
+                self.invalidate()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if self.rect.collidepoint(event.pos):
                 self.on_click()
 
@@ -248,24 +397,63 @@ class Button:
 def draw_text_wrapped(surf, text, font, color, rect, line_height=4):
     """Draw paragraph text inside a rect; returns bottom y."""
     x, y, w, h = rect
-    words = text.split(" ")
-    line = ""
-    for word in words:
-        test = (line + " " + word).strip()
-        if font.size(test)[0] <= w:
-            line = test
-        else:
-            img = font.render(line, True, color)
-            surf.blit(img, (x, y))
-            y += img.get_height() + line_height
-            line = word
-    if line:
-        img = font.render(line, True, color)
+    lines = TEXT_CACHE.wrap(font, text, w)
+    for i, line in enumerate(lines):
+        img = TEXT_CACHE.render(font, line, color)
         surf.blit(img, (x, y))
         y += img.get_height()
+        if i < len(lines) - 1:
+            y += line_height
     return y
 
 
+class Label(Widget):
+    """Single line of text in a fixed rect; set_text() invalidates only on change."""
+    def __init__(self, rect, text, font, color=TEXT, backdrop=BG):
+        self.rect = pygame.Rect(rect)
+        self.text = text
+        self.font = font
+        self.color = color
+        self.backdrop = backdrop
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+
+    def draw(self, surf):
+        self.dirty = False
+        surf.blit(TEXT_CACHE.render(self.font, self.text, self.color), self.rect.topleft)
+
+
+class ScenarioPanel(Widget):
+    """Rounded panel with today's scenario description and both options."""
+    def __init__(self, rect, scenario, pad=20):
+        self.rect = pygame.Rect(rect)
+        self.scenario = scenario
+        self.pad = pad
+
+    def set_scenario(self, scenario):
+        if scenario is not self.scenario:
+            self.scenario = scenario
+            self.invalidate()
+
+    def draw(self, surf):
+        self.dirty = False
+        pygame.draw.rect(surf, PANEL, self.rect, border_radius=12)
+        inner = self.rect.inflate(-2*self.pad, -2*self.pad)
+        y = profiled(
+            "text", draw_text_wrapped,
+            surf,
+            self.scenario["description"],
+            FONT_MD, TEXT,
+            (inner.x, inner.y, inner.w, 120),
+        )
+        surf.blit(TEXT_CACHE.render(FONT_MD, "L: " + self.scenario["left_choice"]["text"], WHITE), (inner.x, y + 10))
+        surf.blit(TEXT_CACHE.render(FONT_MD, "R: " + self.scenario["right_choice"]["text"], WHITE), (inner.x, y + 44))
+        surf.blit(TEXT_CACHE.render(FONT_SM, "Press ← / → or click a button", MUTED), (inner.x, y + 74))
+
+
 def draw_bar(surf, x, y, w, h, value, max_value, color, label):
     # Frame
     pygame.draw.rect(surf, WHITE, (x, y, w, h), 2, border_radius=8)
@@ -274,7 +462,7 @@ def draw_bar(surf, x, y, w, h, value, max_value, color, label):
     fill_w = int((w - 4) * pct)
     pygame.draw.rect(surf, color, (x + 2, y + 2, fill_w, h - 4), border_radius=8)
     # Label
-    txt = FONT_SM.render(f"{label}: {value}/{max_value}", True, TEXT)
+    txt = TEXT_CACHE.render(FONT_SM, f"{label}: {value}/{max_value}", TEXT)
     surf.blit(txt, (x + 8, y + h // 2 - txt.get_height() // 2))
 
 
@@ -284,12 +472,29 @@ class Scene:
     def update(self, dt): ...
     def draw(self, surf): ...
 
+    def draw_dirty(self, surf):
+        """Repaint what changed since the last draw; returns rects to push to the display."""
+        self.draw(surf)
+        return [surf.get_rect()]
+
+    def is_animating(self):
+        """True while the scene changes without input (the loop then runs at full rate)."""
+        return False
+
 class SceneManager:
     def __init__(self, start_scene):
         self.scene = start_scene
+        self.full_redraw = True  # next frame must repaint everything
 
     def switch(self, new_scene):
         self.scene = new_scene
+        self.full_redraw = True
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def is_animating(self):
+        return self.full_redraw or self.scene.is_animating()
 
     def handle_event(self, event):
         self.scene.handle_event(event)
@@ -300,6 +505,14 @@ class SceneManager:
     def draw(self, surf):
         self.scene.draw(surf)
 
+    def render(self, surf):
+        """Draw the frame and return the changed rects (whole surface on a full redraw)."""
+        if self.full_redraw:
+            self.full_redraw = False
+            self.scene.draw(surf)
+            return [surf.get_rect()]
+        return self.scene.draw_dirty(surf)
+
 
 # --------------- Scenes ---------------
 class MainMenu(Scene):
@@ -311,16 +524,31 @@ class MainMenu(Scene):
         self.btn_easy = Button((cx - 280, 360, 160, 48), "Easy",   lambda: self.start("easy"))
         self.btn_norm = Button((cx - 80,  360, 160, 48), "Normal", lambda: self.start("normal"))
         self.btn_hard = Button((cx + 120, 360, 160, 48), "Hard",   lambda: self.start("hard"))
+        self.widgets = [self.btn_easy, self.btn_norm, self.btn_hard]
+        # Continue only when there is a saved run
+        self.btn_continue = None
+        if SAVE_PATH is not None and os.path.exists(SAVE_PATH):
+            self.btn_continue = Button((cx - 80, 430, 160, 48), "Continue", self.resume)
+            self.widgets.append(self.btn_continue)
 
     def start(self, difficulty):
         self.mgr.switch(GameScene(self.mgr, difficulty))
 
+    def resume(self):
+        try:
+            snapshot = load_state(SAVE_PATH)
+        except (OSError, ValueError) as e:
+            print(f"Save not loaded: {e}", file=sys.stderr)
+            return
+        self.mgr.switch(GameScene(self.mgr, snapshot.state.difficulty, snapshot=snapshot))
+
     def handle_event(self, event):
-        self.btn_easy.handle(event)
-        self.btn_norm.handle(event)
-        self.btn_hard.handle(event)
+        for btn in self.widgets:
+            profiled("Button", btn.handle, event)
         if event.type == pygame.KEYDOWN:
-            if event.key in (pygame.K_1, pygame.K_e):
+            if event.key == pygame.K_c and self.btn_continue:
+                self.resume()
+            elif event.key in (pygame.K_1, pygame.K_e):
                 self.start("easy")
             elif event.key in (pygame.K_2, pygame.K_n, pygame.K_RETURN):
                 self.start("normal")
@@ -331,118 +559,168 @@ class MainMenu(Scene):
 
     def draw(self, surf):
         surf.fill(BG)
-        title = FONT_XL.render("Swipe Decision Game", True, WHITE)
-        sub   = FONT_MD.render("Pick a difficulty to start", True, MUTED)
+        title = TEXT_CACHE.render(FONT_XL, "Swipe Decision Game", WHITE)
+        sub   = TEXT_CACHE.render(FONT_MD, "Pick a difficulty to start", MUTED)
         surf.blit(title, title.get_rect(center=(WIDTH//2, 160)))
         surf.blit(sub,   sub.get_rect(center=(WIDTH//2, 210)))
-        self.btn_easy.draw(surf)
-        self.btn_norm.draw(surf)
-        self.btn_hard.draw(surf)
+        for btn in self.widgets:
+            profiled("Button", btn.draw, surf)
+
+    def draw_dirty(self, surf):
+        return repaint_dirty(surf, self.widgets)
 
 
 class GameScene(Scene):
-    def __init__(self, manager, difficulty):
+    def __init__(self, manager, difficulty, seed=None, snapshot=None):
         self.mgr = manager
         self.difficulty = difficulty
-        # Start engine run
-        self.state = start_run(difficulty)
+        if snapshot is not None:
+            # Resume a saved run (the snapshot carries the run's RNG state)
+            self.state, self.recorder = snapshot
+        else:
+            # Start engine run (seeded, so the finished run can be saved as a replay)
+            self.state, self.recorder = start_recorded_run(difficulty, seed)
 
         self.hud = HUD(self.state)
         self.log_panel = LogPanel((60, 400, WIDTH - 120, 120), FONT_SM)
+        self.header = Label((60, 52, WIDTH - 120, 38), self._header_text(), FONT_LG, TEXT, backdrop=PANEL)
 
         self.scenario = get_today_scenario(self.state)
+        self.scenario_panel = ScenarioPanel((40, 180, WIDTH-80, 200), self.scenario)
         self.outcome_log = []  # last few strings for HUD
         # Buttons
-        self.btn_left  = Button((120, 540, 280, 48), "Left  (←)",  lambda: self.choose("L"))
-        self.btn_right = Button((WIDTH-120-280, 540, 280, 48), "Right (→)", lambda: self.choose("R"))
+        self.btn_left  = Button((120, 540, 280, 48), "Left  (←)",  lambda: self.choose("L"), backdrop=PANEL)
+        self.btn_right = Button((WIDTH-120-280, 540, 280, 48), "Right (→)", lambda: self.choose("R"), backdrop=PANEL)
+        self.btn_save  = Button((WIDTH//2 - 40, 540, 80, 48), "Save", self.save, color=MUTED, backdrop=PANEL)
+
+        self.widgets = [self.header, *self.hud.bars, self.scenario_panel, self.log_panel,
+                        self.btn_left, self.btn_right, self.btn_save]
+
+        for entry in self.state.journal or ():
+            self._log_entry(entry)
+
+    def _header_text(self):
+        return f"Day {self.state.day}/{self.state.num_days} — {self.difficulty.title()}"
 
     # Input handlers
     def handle_event(self, event):
-        self.log_panel.handle_event(event)
-        self.btn_left.handle(event)
-        self.btn_right.handle(event)
+        profiled("LogPanel", self.log_panel.handle_event, event)
+        profiled("Button", self.btn_left.handle, event)
+        profiled("Button", self.btn_right.handle, event)
+        profiled("Button", self.btn_save.handle, event)
         if event.type == pygame.KEYDOWN:
             if event.key in (pygame.K_LEFT, pygame.K_a):
                 self.choose("L")
             elif event.key in (pygame.K_RIGHT, pygame.K_d):
                 self.choose("R")
+            elif event.key == pygame.K_s:
+                self.save()
+
+    def save(self):
+        if SAVE_PATH is None or is_over(self.state):
+            return
+        try:
+            save_state(SAVE_PATH, self.state, self.recorder)
+        except (OSError, ValueError) as e:
+            self._log(f"Save failed: {e}", BAD)
+        else:
+            self._log("Game saved — Continue from the main menu.", MUTED)
 
     def choose(self, side):
         if is_over(self.state):
             return
-        outcome = apply_choice(self.state, side)
+        # A snapshot saved without its replay section resumes unrecorded
+        if self.recorder is not None:
+            outcome = self.recorder.apply(self.state, side)
+        else:
+            outcome = apply_choice(self.state, side)
 
         eff = outcome["effect"]  # {'hp': Δ, 'food': Δ, 'morale': Δ}
         self.hud.flash_from_deltas(eff.get("hp", 0), eff.get("food", 0), eff.get("morale", 0))
+        if self.state.journal is not None:
+            self._log_entry(self.state.journal[-1])  # structured record of the day just resolved
+        else:
+            self._log_outcome(outcome)  # run started with journal=False
 
+        # Transition?
+        if outcome["death"] or outcome["won"]:
+            score = final_score(self.state)
+            self._save_replay()
+            self._clear_save()
+            self.mgr.switch(GameOverScene(self.mgr, self.state, score))
+        else:
+            # fetch next scenario for the new day
+            self.scenario = get_today_scenario(self.state)
+            self.scenario_panel.set_scenario(self.scenario)
+            self.header.set_text(self._header_text())
 
+    def _log_entry(self, entry):
         # Build a short line for the on-screen log
-        #eff = outcome["effect"]
-        result = outcome["result"]
-        tag = "✓" if result == "success" else ("×" if result == "failure" else "•")
-        line = f"{tag} {outcome['log_text']} (HP {eff['hp']:+}, Food {eff['food']:+}, Morale {eff['morale']:+})"
+        tag = "✓" if entry.result == RESULT_SUCCESS else ("×" if entry.result == RESULT_FAILURE else "•")
+        line = f"{tag} {log_text(entry)} {delta_text(entry.effect)}"
         #self.outcome_log.append(line)
         #self.outcome_log = self.outcome_log[-6:]  # keep last 6 lines
         color = TEXT
         if tag == "✓": color = OK
         elif tag == "×": color = BAD
 
-        self.log_panel.add_line(line, color)
-        # flash bars on deltas
-        #self.hud.flash_from_deltas(eff.get("hp",0), eff.get("food",0), eff.get("morale",0))
+        self._log(line, color)
 
         # Surprise
-        if outcome["surprise"]:
+        surprise = surprise_text(entry)
+        if surprise:
             #self.outcome_log.append(f"★ {outcome['surprise']['text']}")
             #self.outcome_log = self.outcome_log[-6:]
-            self.log_panel.add_line(f"★ {outcome['surprise']['text']}", PURPLE)
+            self._log(f"★ {surprise}", PURPLE)
 
-        # Transition?
-        if outcome["death"] or outcome["won"]:
-            score = final_score(self.state)
-            self.mgr.switch(GameOverScene(self.mgr, self.state, score))
-        else:
-            # fetch next scenario for the new day
-            self.scenario = get_today_scenario(self.state)
+    def _log_outcome(self, outcome):
+        """Same log lines as _log_entry, from the outcome dict of a run without a journal."""
+        tag, color = {"success": ("✓", OK), "failure": ("×", BAD)}.get(outcome["result"], ("•", TEXT))
+        eff = outcome["effect"]
+        self._log(f"{tag} {outcome['log_text']} {delta_text((eff['hp'], eff['food'], eff['morale']))}", color)
+        if outcome["surprise"]:
+            self._log(f"★ {outcome['surprise']['text']}", PURPLE)
+
+    def _log(self, text, color):
+        profiled("LogPanel", self.log_panel.add_line, text, color)
 
-    def update(self, dt): 
-        self.hud.update(dt)
+    def _clear_save(self):
+        # A finished run can't be continued
+        if SAVE_PATH is not None and os.path.exists(SAVE_PATH):
+            try:
+                os.remove(SAVE_PATH)
+            except OSError:
+                pass
+
+    def _save_replay(self):
+        if REPLAY_PATH is None or self.recorder is None:
+            return
+        try:
+            append_replay(REPLAY_PATH, self.recorder.to_replay(self.state))
+        except (OSError, ValueError) as e:
+            print(f"Replay not saved: {e}", file=sys.stderr)
+
+    def update(self, dt):
+        profiled("HUD", self.hud.update, dt)
+
+    def is_animating(self):
+        return self.hud.is_animating()
 
     def draw(self, surf):
         surf.fill(BG)
 
-        # Panels
+        # Panels (scenario panel draws its own)
         pygame.draw.rect(surf, PANEL, (40, 40, WIDTH-80, 120), border_radius=12)     # HUD panel
-        pygame.draw.rect(surf, PANEL, (40, 180, WIDTH-80, 200), border_radius=12)    # Scenario panel
         pygame.draw.rect(surf, PANEL, (40, 532, WIDTH-80, 56), border_radius=12)     # Buttons panel
 
-        # Header
-        head = FONT_LG.render(f"Day {self.state.day}/{self.state.num_days} — {self.difficulty.title()}", True, TEXT)
-        surf.blit(head, (60, 52))
-
-        # Bars
-        p = self.state.player
-        #draw_bar(surf, 60, 90, 240, 28, p.hp,    p.hp_max,    OK,   "HP")
-        #draw_bar(surf, 330,90, 240, 28, p.food,  p.food_max,  WARN, "Food")
-        #draw_bar(surf, 600,90, 240, 28, p.morale,p.morale_max,ACCENT,"Morale")
-        self.hud.draw(surf)
-
-        # Scenario text + options
-        y = draw_text_wrapped(
-            surf,
-            self.scenario["description"],
-            FONT_MD, TEXT,
-            (60, 200, WIDTH-120, 120),
-        )
-        surf.blit(FONT_MD.render("L: " + self.scenario["left_choice"]["text"], True, WHITE), (60, y + 10))
-        surf.blit(FONT_MD.render("R: " + self.scenario["right_choice"]["text"], True, WHITE), (60, y + 44))
-        surf.blit(FONT_SM.render("Press ← / → or click a button", True, MUTED), (60, y + 74))
-
-        # HUD + Log + Buttons
-        self.hud.draw(surf)
-        self.log_panel.draw(surf)
-        self.btn_left.draw(surf)
-        self.btn_right.draw(surf)
+        # Header + HUD + Scenario + Log + Buttons
+        self.header.draw(surf)
+        profiled("HUD", self.hud.draw, surf)
+        self.scenario_panel.draw(surf)
+        profiled("LogPanel", self.log_panel.draw, surf)
+        profiled("Button", self.btn_left.draw, surf)
+        profiled("Button", self.btn_right.draw, surf)
+        profiled("Button", self.btn_save.draw, surf)
 
         # Initial block that renders self.outcome_log
         """
@@ -457,6 +735,9 @@ class GameScene(Scene):
             ly += img.get_height() + 4
         """
 
+    def draw_dirty(self, surf):
+        return repaint_dirty(surf, self.widgets)
+
 
 class GameOverScene(Scene):
     def __init__(self, manager, state, score):
@@ -470,10 +751,11 @@ class GameOverScene(Scene):
         cx = WIDTH // 2
         self.btn_again = Button((cx - 240, 420, 200, 56), "Play Again", lambda: self.mgr.switch(MainMenu(self.mgr)))
         self.btn_menu  = Button((cx + 40,  420, 200, 56), "Main Menu",  lambda: self.mgr.switch(MainMenu(self.mgr)))
+        self.widgets = [self.btn_again, self.btn_menu]
 
     def handle_event(self, event):
-        self.btn_again.handle(event)
-        self.btn_menu.handle(event)
+        profiled("Button", self.btn_again.handle, event)
+        profiled("Button", self.btn_menu.handle, event)
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_RETURN:
                 self.mgr.switch(MainMenu(self.mgr))
@@ -484,7 +766,7 @@ class GameOverScene(Scene):
         surf.fill(BG)
         title = "Victory!" if self.won else "Game Over"
         color = OK if self.won else BAD
-        t_img = FONT_XL.render(title, True, color)
+        t_img = TEXT_CACHE.render(FONT_XL, title, color)
         surf.blit(t_img, t_img.get_rect(center=(WIDTH//2, 140)))
 
         # Stats
@@ -496,31 +778,288 @@ class GameOverScene(Scene):
             f"Final Score: {self.score}",
         ]
         for line in lines:
-            img = FONT_MD.render(line, True, TEXT)
+            img = TEXT_CACHE.render(FONT_MD, line, TEXT)
             surf.blit(img, img.get_rect(center=(WIDTH//2, y)))
             y += 36
 
-        self.btn_again.draw(surf)
-        self.btn_menu.draw(surf)
+        profiled("Button", self.btn_again.draw, surf)
+        profiled("Button", self.btn_menu.draw, surf)
+
+    def draw_dirty(self, surf):
+        return repaint_dirty(surf, self.widgets)
+
+
+# --------------- Frame profiler ---------------
+PROFILE_PHASES = ("event", "update", "draw")
+PROFILE_WIDGETS = ("HUD", "LogPanel", "Button", "text")
+
+_FRAME_PROFILER = None  # set by run_loop for the frames the F3 overlay is on
+
+
+def profiled(kind, fn, *args):
+    """Call fn(*args), booking its time under widget kind while the frame profiler is on."""
+    if _FRAME_PROFILER is None or kind is None:
+        return fn(*args)
+    return _FRAME_PROFILER.call(kind, fn, *args)
+
+
+class FrameProfiler:
+    """
+    F3 debug overlay: frame time, FPS and per-frame time in SceneManager handle_event / update /
+    draw, split per widget kind (exclusive time, so nested widgets are not counted twice).
+    Keeps the last `window` frames; F4 writes them to CSV. Scenes report widget time through
+    profiled() at their call sites; run_loop turns that on from the top of the frame after F3,
+    so every recorded frame is timed from its start.
+    """
+    PHASES = PROFILE_PHASES
+    WIDGETS = PROFILE_WIDGETS
+    COLUMNS = ("frame_ms", "busy_ms", "event_ms", "update_ms", "draw_ms", "present_ms") + tuple(
+        f"{phase}.{w}_ms" for phase in PROFILE_PHASES for w in PROFILE_WIDGETS)
+    RECT = pygame.Rect(4, 4, 372, 214)
+    REFRESH_NS = 250_000_000  # overlay text refresh (numbers are unreadable at 60 Hz)
+
+    def __init__(self, window=600, csv_path=None):
+        self.enabled = False
+        self.frames = deque(maxlen=window)
+        self.csv_path = csv_path
+        self._acc = [0] * len(self.COLUMNS)  # ns for the frame in progress
+        self._stack = []                     # child time of the enclosing timed calls
+        self._base = 0                       # current phase (index into PHASES)
+        self._slot = {kind: 6 + i for i, kind in enumerate(self.WIDGETS)}
+        self._last_frame = None
+        self._lines = []
+        self._refreshed = 0
+
+    def toggle(self):
+        """Flip the overlay; takes effect from the next frame (see run_loop)."""
+        self.enabled = not self.enabled
+        self._reset()
+        if self.enabled:
+            self.frames.clear()
+            self._last_frame = None
+            self._lines = []
+
+    def _reset(self):
+        self._acc[:] = [0] * len(self._acc)
+        self._stack.clear()
+        self._base = 0
+
+    def call(self, kind, fn, *args):
+        """Run fn(*args) and add its exclusive time to this phase's column for `kind`."""
+        stack = self._stack
+        stack.append(0)
+        t0 = perf_counter_ns()
+        try:
+            return fn(*args)
+        finally:
+            ns = perf_counter_ns() - t0
+            self._acc[self._slot[kind] + self._base * len(self.WIDGETS)] += ns - stack.pop()
+            if stack:
+                stack[-1] += ns
+
+    # Per-frame bookkeeping (run_loop calls these only while enabled)
+    def begin(self, phase):
+        """Start timing a SceneManager phase (index into PHASES); returns the start time."""
+        self._base = phase
+        return perf_counter_ns()
+
+    def end(self, phase, t0):
+        self._acc[2 + phase] += perf_counter_ns() - t0
+
+    def end_frame(self, present_ns):
+        """Close the frame: store its row (ms) in the window and reset the accumulators."""
+        acc = self._acc
+        now = perf_counter_ns()
+        acc[5] = present_ns
+        acc[1] = acc[2] + acc[3] + acc[4] + present_ns
+        acc[0] = now - self._last_frame if self._last_frame is not None else acc[1]
+        self._last_frame = now
+        self.frames.append(tuple(ns / 1e6 for ns in acc))
+        self._reset()
+
+    # Overlay
+    def summary(self):
+        """Last frame, mean and worst of each column over the window, plus mean FPS."""
+        rows = self.frames
+        if not rows:
+            return None
+        n = len(rows)
+        means = [sum(col) / n for col in zip(*rows)]
+        worst = [max(col) for col in zip(*rows)]
+        fps = 1000.0 / means[0] if means[0] else 0.0
+        return rows[-1], means, worst, fps
+
+    def _format(self):
+        stats = self.summary()
+        if stats is None:
+            return ["F3 profiler — waiting for a frame"]
+        last, means, worst, fps = stats
+        n = len(self.WIDGETS)
+        lines = [
+            f"frame {last[0]:6.2f} ms  {fps:5.1f} fps  n={len(self.frames)}",
+            f"busy  {means[1]:6.2f} avg  {worst[1]:6.2f} max ms",
+            f"{'':<9}{'event':>8}{'update':>8}{'draw':>8}",
+            f"{'scene':<9}" + "".join(f"{means[2 + i]:8.3f}" for i in range(3)),
+        ]
+        for w, kind in enumerate(self.WIDGETS):
+            lines.append(f"{kind:<9}" + "".join(f"{means[6 + p * n + w]:8.3f}" for p in range(3)))
+        lines.append(f"present {means[5]:6.3f}   F4: dump CSV")
+        return lines
+
+    def draw(self, surf):
+        """Paint the overlay on top of the frame; returns its rect for the display update."""
+        now = perf_counter_ns()
+        if not self._lines or now - self._refreshed >= self.REFRESH_NS:
+            # Rendered directly: the numbers change every refresh, so caching them would only churn TEXT_CACHE
+            self._lines = [FONT_SM.render(line, True, WHITE) for line in self._format()]
+            self._refreshed = now
+        surf.fill(BLACK, self.RECT)
+        pygame.draw.rect(surf, WARN, self.RECT, 1)
+        y = self.RECT.y + 4
+        for img in self._lines:
+            surf.blit(img, (self.RECT.x + 6, y))
+            y += img.get_height() + 2
+        return self.RECT
+
+    # Export
+    def dump_csv(self, path=None):
+        """Write the rolling window (oldest first, times in ms) as CSV; returns the path."""
+        path = path or self.csv_path or os.path.join(cache_dir("profiles"), f"frames-{strftime('%Y%m%d-%H%M%S')}.csv")
+        with open(path, "w", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(("frame",) + self.COLUMNS)
+            for i, row in enumerate(self.frames):
+                writer.writerow([i] + [f"{v:.4f}" for v in row])
+        return path
+
+
+# --------------- Frame pacing ---------------
+class FrameScheduler:
+    """
+    Ticks at fps while something animates (or shortly after input);
+    otherwise blocks in pygame.event.wait until input arrives or the idle timeout passes.
+    """
+    def __init__(self, fps=FPS, idle_timeout_ms=IDLE_TIMEOUT_MS, linger=ACTIVE_LINGER):
+        self.fps = fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.linger = linger
+        self.clock = CLOCK
+        self._active_for = 0.0  # remaining full-rate time after input
+        self.idle = False
+
+    def next_frame(self, animating):
+        """Wait for the next frame; returns (dt seconds, events)."""
+        self.idle = not animating and self._active_for <= 0
+        if self.idle:
+            first = pygame.event.wait(self.idle_timeout_ms)
+            events = [] if first.type == pygame.NOEVENT else [first]
+            events.extend(pygame.event.get())
+            # Time spent blocked is not animation time
+            dt = min(self.clock.tick() / 1000.0, 1.0 / self.fps)
+        else:
+            dt = self.clock.tick(self.fps) / 1000.0
+            events = pygame.event.get()
+            self._active_for = max(0.0, self._active_for - dt)
+
+        if events:
+            self._active_for = self.linger
+        return dt, events
 
 
 # --------------- Main loop ---------------
-def main():
+def main(fps=FPS, idle_timeout_ms=IDLE_TIMEOUT_MS, replay_path=None, save_path=None, profile=False,
+         frame_window=600, frame_csv=None):
+    global REPLAY_PATH, SAVE_PATH
+    REPLAY_PATH = replay_path
+    SAVE_PATH = save_path
     manager = SceneManager(MainMenu(None))
     manager.scene.mgr = manager  # late bind (so scenes can switch)
-
+    scheduler = FrameScheduler(fps, idle_timeout_ms)
+    profiler = FrameProfiler(frame_window, frame_csv)
+
+    if not profile:
+        run_loop(manager, scheduler, profiler)
+        return
+    # Engine phase timings / event counts for every day played, printed on exit
+    timer, events = PhaseTimer(), EventCounter()
+    with attach(timer, events):
+        try:
+            run_loop(manager, scheduler, profiler)
+        finally:
+            print("\n".join(["Engine profile:", *timer.format(), "", *events.format()]))
+
+
+def run_loop(manager, scheduler, profiler=None):
+    global _FRAME_PROFILER
+    profiler = profiler or FrameProfiler()
     while True:
-        dt = CLOCK.tick(FPS) / 1000.0
-
-        for event in pygame.event.get():
+        dt, events = scheduler.next_frame(manager.is_animating())
+        # F3 flips profiler.enabled mid-frame; widget timing follows it from the next frame only
+        profiling = profiler.enabled
+        _FRAME_PROFILER = profiler if profiling else None
+
+        if profiling:
+            t0 = profiler.begin(0)
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit(); sys.exit(0)
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                manager.invalidate()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler.toggle()
+                manager.invalidate()  # repaint under the overlay when it hides
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and profiler.enabled:
+                try:
+                    print(f"Frame profile written to {profiler.dump_csv()}")
+                except OSError as e:
+                    print(f"Frame profile not written: {e}", file=sys.stderr)
+                continue
             manager.handle_event(event)
-
-        manager.update(dt)
-        manager.draw(SCREEN)
-        pygame.display.flip()
+        if profiling:
+            profiler.end(0, t0)
+
+        if profiling:
+            t0 = profiler.begin(1)
+            manager.update(dt)
+            profiler.end(1, t0)
+            t0 = profiler.begin(2)
+            dirty = manager.render(SCREEN)
+            profiler.end(2, t0)
+        else:
+            manager.update(dt)
+            dirty = manager.render(SCREEN)
+
+        if profiler.enabled:
+            dirty.append(profiler.draw(SCREEN))
+        if dirty:
+            t0 = perf_counter_ns()
+            pygame.display.update(dirty)
+            present_ns = perf_counter_ns() - t0
+        else:
+            present_ns = 0
+        if profiling and profiler.enabled:
+            profiler.end_frame(present_ns)
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Swipe Decision Game — GUI")
+    parser.add_argument("--fps", type=int, default=FPS, help="frame cap while animating")
+    parser.add_argument("--idle-timeout", type=int, default=IDLE_TIMEOUT_MS,
+                        help="max ms to block waiting for input when idle")
+    parser.add_argument("--replays", default=None,
+                        help="replay file for finished runs (default: gui.sdgr in the cache dir)")
+    parser.add_argument("--no-replays", action="store_true", help="do not record replays")
+    parser.add_argument("--save", default=None,
+                        help="save/continue slot (default: gui.sav in the cache dir)")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-phase engine timings and event counts on exit")
+    parser.add_argument("--frame-window", type=int, default=600,
+                        help="frames kept by the F3 profiler overlay")
+    parser.add_argument("--frame-csv", default=None,
+                        help="CSV file F4 writes the profiler window to (default: profiles/ in the cache dir)")
+    args = parser.parse_args()
+    replay_path = None if args.no_replays else (args.replays or default_replay_path("gui"))
+    main(args.fps, args.idle_timeout, replay_path, args.save or default_save_path("gui"), args.profile,
+         args.frame_window, args.frame_csv)
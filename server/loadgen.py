@@ -0,0 +1,159 @@
+# server/loadgen.py
+"""
+Load generator for server.main: many concurrent scripted players over a few connections.
+
+    python -m server.main --max-live 5000 &
+    python -m server.loadgen --sessions 20000 --connections 64 --duration 30
+
+Every player loops new -> choose ... -> close until the deadline. Requests are
+pipelined per connection (the server answers in order), so tens of thousands of
+sessions need only a handful of sockets. Prints client-side latency percentiles
+and throughput, then the server's own counters.
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from array import array
+from collections import deque
+
+
+class Connection:
+    """One socket shared by many players; responses are matched to requests in FIFO order."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = deque()
+        self._task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def open(cls, host, port, unix=None):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix, limit=1 << 20)
+        else:
+            reader, writer = await asyncio.open_connection(host, port, limit=1 << 20)
+        return cls(reader, writer)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                self.pending.popleft().set_result(json.loads(line))
+        except Exception as e:  # surface to every waiter instead of hanging
+            while self.pending:
+                fut = self.pending.popleft()
+                if not fut.done():
+                    fut.set_exception(e)
+            raise
+        while self.pending:
+            self.pending.popleft().set_exception(ConnectionError("server closed the connection"))
+
+    async def request(self, obj):
+        fut = asyncio.get_running_loop().create_future()
+        self.pending.append(fut)
+        self.writer.write((json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8"))
+        await self.writer.drain()
+        return await fut
+
+    async def close(self):
+        self.writer.close()
+        self._task.cancel()
+
+
+class Stats:
+    def __init__(self):
+        self.latencies_us = array("d")
+        self.runs = 0
+        self.errors = 0
+
+
+async def player(conn, stats, deadline, rng, difficulty):
+    async def timed(req):
+        t0 = time.perf_counter()
+        resp = await conn.request(req)
+        stats.latencies_us.append((time.perf_counter() - t0) * 1e6)
+        if not resp.get("ok"):
+            stats.errors += 1
+        return resp
+
+    while time.monotonic() < deadline:
+        resp = await timed({"op": "new", "difficulty": difficulty or rng.choice(("easy", "normal", "hard"))})
+        if not resp.get("ok"):
+            continue
+        sid = resp["session"]
+        while True:
+            resp = await timed({"op": "choose", "session": sid, "choice": rng.choice("LR")})
+            if not resp.get("ok") or "score" in resp:
+                break
+        await timed({"op": "close", "session": sid})
+        stats.runs += 1
+
+
+def percentile(sorted_vals, pct):
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals), math.ceil(pct / 100.0 * len(sorted_vals))) - 1)
+    return sorted_vals[k]
+
+
+async def run(host, port, unix, sessions, connections, duration, seed, difficulty):
+    conns = [await Connection.open(host, port, unix) for _ in range(connections)]
+    stats = Stats()
+    deadline = time.monotonic() + duration
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        player(conns[i % connections], stats, deadline, random.Random(seed * 1_000_003 + i), difficulty)
+        for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - t0
+    server_stats = await conns[0].request({"op": "stats"})
+    for c in conns:
+        await c.close()
+    return stats, elapsed, server_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the session server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None)
+    parser.add_argument("--sessions", type=int, default=10_000, help="concurrent players")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds before players stop starting runs")
+    parser.add_argument("--difficulty", default=None, help="fixed difficulty (default: random per run)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    args = parser.parse_args()
+
+    stats, elapsed, server_stats = asyncio.run(run(args.host, args.port, args.unix, args.sessions,
+                                                   args.connections, args.duration, args.seed, args.difficulty))
+    lat = sorted(stats.latencies_us)
+    report = {
+        "sessions": args.sessions,
+        "connections": args.connections,
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(lat),
+        "runs": stats.runs,
+        "errors": stats.errors,
+        "throughput_rps": round(len(lat) / elapsed, 1),
+        "runs_per_sec": round(stats.runs / elapsed, 1),
+        "latency_us": {f"p{p}": round(percentile(lat, p), 1) for p in (50, 90, 99, 99.9)},
+        "server": {k: server_stats.get(k) for k in ("metrics", "store")},
+    }
+    print(f"{report['requests']:,} requests, {report['runs']:,} runs in {elapsed:.1f}s "
+          f"({report['throughput_rps']:,.0f} req/s, {report['runs_per_sec']:,.0f} runs/s), errors {stats.errors}")
+    print("client latency (us): " + "  ".join(f"{k} {v:,.0f}" for k, v in report["latency_us"].items()))
+    print("server:", json.dumps(report["server"]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 0 if not stats.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+# server/main.py
+"""
+Local session server: many concurrent runs in one asyncio process.
+
+    python -m server.main --port 8765
+    python -m server.main --unix /tmp/swipe.sock
+
+Protocol: one JSON object per line in each direction, answered in request order.
+    {"op": "new", "difficulty": "hard"}            -> session id, today's scenario, stats
+    {"op": "choose", "session": ID, "choice": "L"} -> apply_choice outcome, next scenario / score
+    {"op": "get", "session": ID}                   -> current scenario and stats
+    {"op": "close", "session": ID}                 -> drops the session
+    {"op": "stats"}                                -> throughput / latency / store counters
+An optional "id" field is echoed back. Errors come back as {"ok": false, "error": "..."}.
+
+Sessions live in an LRU store with a bounded number of in-memory runs; the least
+recently used ones (and any idle longer than --idle-seconds) are parked on disk as
+engine.save snapshots, in batches and off the event loop, and restored transparently
+on their next request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from engine.game import start_run, get_today_scenario, apply_choice, final_score
+from engine.save import dumps, loads
+
+MAX_LIVE = 10_000        # runs kept in memory
+IDLE_SECONDS = 60.0      # runs untouched this long are parked on disk
+SWEEP_EVERY = 5.0        # seconds between idle sweeps
+PARK_HYSTERESIS = 0.1    # once over max live, park down to (1 - this) * max live in one batch
+MAX_LINE = 64 * 1024
+OPS = ("new", "choose", "get", "close", "stats")
+
+
+# --- Session store ---
+def _write_snapshots(items):
+    for _, path, data in items:
+        with open(path, "wb") as fh:
+            fh.write(data)
+
+
+def _read_snapshot(path):
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+class SessionStore:
+    """
+    LRU of live GameStates keyed by session id, spilling to snapshot files on disk.
+    The journal is not kept for server runs (clients get the outcome of every step).
+
+    Snapshot I/O runs on one background thread, so the event loop never blocks on disk and
+    jobs run in submission order (a read always sees the latest write). Once over max_live,
+    runs are parked in one batch down to max_live * (1 - hysteresis), so a full store does
+    not pay one park per request. A parked run's bytes stay in memory until its write lands.
+    Each session keeps a numbered slot file from its first park until it closes; freed slots
+    are reused, since creating a file costs far more than overwriting one.
+    """
+    def __init__(self, spill_dir, max_live=MAX_LIVE, idle_seconds=IDLE_SECONDS, hysteresis=PARK_HYSTERESIS):
+        self.spill_dir = spill_dir
+        self.max_live = max_live
+        self.idle_seconds = idle_seconds
+        self.low_water = max(0, max_live - max(1, int(max_live * hysteresis)))
+        self._live = OrderedDict()   # id -> [state, last_used]
+        self._writing = {}           # id -> snapshot bytes queued for disk
+        self._parked = set()         # ids whose latest snapshot is in their slot file
+        self._restoring = {}         # id -> task reading the snapshot back
+        self._slot = {}              # id -> slot file number
+        self._free = []              # slot numbers of closed sessions
+        self._slots = 0              # slot files handed out so far
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spill")
+        self.evictions = 0
+        self.restores = 0
+        self.spill_errors = 0
+        os.makedirs(spill_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._live) + len(self._writing) + len(self._parked)
+
+    def _path(self, sid):
+        slot = self._slot.get(sid)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot, self._slots = self._slots, self._slots + 1
+            self._slot[sid] = slot
+        return os.path.join(self.spill_dir, f"{slot}.sav")
+
+    def create(self, difficulty):
+        sid = secrets.token_hex(8)
+        state = start_run(difficulty, journal=False)
+        self._live[sid] = [state, time.monotonic()]
+        self._shrink()
+        return sid, state
+
+    async def get(self, sid):
+        """The session's state (restored from disk if parked), or None."""
+        entry = self._live.get(sid)
+        if entry is not None:
+            self._live.move_to_end(sid)
+            entry[1] = time.monotonic()
+            return entry[0]
+        data = self._writing.pop(sid, None)
+        if data is not None:
+            return self._revive(sid, data)
+        task = self._restoring.get(sid)
+        if task is None:
+            if sid not in self._parked:
+                return None
+            task = self._restoring[sid] = asyncio.ensure_future(self._restore(sid))
+        return await task
+
+    async def _restore(self, sid):
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(self._io, _read_snapshot, self._path(sid))
+        finally:
+            del self._restoring[sid]
+        if sid not in self._parked:   # closed while reading
+            return None
+        self._parked.discard(sid)
+        return self._revive(sid, data)
+
+    def _revive(self, sid, data):
+        try:
+            state = loads(data).state
+        except ValueError as e:
+            self.close(sid)
+            raise ValueError(f"store: session {sid} has an unreadable snapshot ({e})") from None
+        self.restores += 1
+        self._live[sid] = [state, time.monotonic()]
+        self._shrink()
+        return state
+
+    def close(self, sid):
+        found = (self._live.pop(sid, None) is not None or self._writing.pop(sid, None) is not None
+                 or sid in self._parked)
+        self._parked.discard(sid)
+        slot = self._slot.pop(sid, None)
+        if slot is not None:
+            self._free.append(slot)   # later writes to it are queued after any pending one
+        return found
+
+    def _park(self, sids):
+        items = []
+        for sid in sids:
+            state, _ = self._live.pop(sid)
+            data = self._writing[sid] = dumps(state)
+            items.append((sid, self._path(sid), data))
+        self.evictions += len(items)
+        fut = asyncio.get_running_loop().run_in_executor(self._io, _write_snapshots, items)
+        fut.add_done_callback(lambda f: self._written(items, f.exception()))
+
+    def _written(self, items, error):
+        if error is not None:
+            # The snapshots stay in memory (still restorable from _writing); report the failure
+            self.spill_errors += 1
+            print(f"Session spill failed: {error}", file=sys.stderr)
+            return
+        for sid, _, data in items:
+            if self._writing.get(sid) is data:   # not revived, closed or re-parked meanwhile
+                del self._writing[sid]
+                self._parked.add(sid)
+
+    def _shrink(self):
+        if len(self._live) > self.max_live:
+            live = iter(self._live)
+            self._park([next(live) for _ in range(len(self._live) - self.low_water)])
+
+    def sweep_idle(self):
+        """Park every run idle for longer than idle_seconds; returns how many were parked."""
+        cutoff = time.monotonic() - self.idle_seconds
+        idle = []
+        for sid, (_, last_used) in self._live.items():
+            if last_used > cutoff:
+                break
+            idle.append(sid)
+        if idle:
+            self._park(idle)
+        return len(idle)
+
+    def shutdown(self):
+        self._io.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            "live": len(self._live),
+            "writing": len(self._writing),
+            "parked": len(self._parked),
+            "evictions": self.evictions,
+            "restores": self.restores,
+            "spill_errors": self.spill_errors,
+        }
+
+
+# --- Counters ---
+class Metrics:
+    """Request counts per op and a log2 latency histogram (microsecond buckets)."""
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = Counter()
+        self.errors = 0
+        self.connections = 0
+        self._buckets = Counter()   # bit_length(latency_us) -> count
+        self._total_us = 0
+
+    def observe(self, op, latency_ns):
+        self.requests[op] += 1
+        us = latency_ns // 1000
+        self._buckets[int(us).bit_length()] += 1
+        self._total_us += us
+
+    def percentile(self, pct):
+        """Upper bound (us) of the bucket holding the pct-th latency."""
+        total = sum(self._buckets.values())
+        if not total:
+            return 0
+        rank = pct / 100.0 * total
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                return (1 << bucket) - 1 if bucket else 0
+        return (1 << max(self._buckets)) - 1
+
+    def snapshot(self):
+        elapsed = max(1e-9, time.monotonic() - self.started)
+        total = sum(self.requests.values())
+        return {
+            "uptime_s": round(elapsed, 3),
+            "requests": total,
+            "by_op": dict(self.requests),
+            "errors": self.errors,
+            "connections": self.connections,
+            "throughput_rps": round(total / elapsed, 1),
+            "latency_us": {
+                "mean": round(self._total_us / total, 1) if total else 0.0,
+                "p50": self.percentile(50),
+                "p99": self.percentile(99),
+                "p999": self.percentile(99.9),
+            },
+        }
+
+
+# --- Request handling ---
+def _scenario_view(state):
+    if state.over:
+        return None
+    s = get_today_scenario(state)
+    return {"description": s["description"], "left": s["left_choice"]["text"], "right": s["right_choice"]["text"]}
+
+
+def _stats_view(state):
+    p = state.player
+    return {"hp": p.hp, "food": p.food, "morale": p.morale}
+
+
+class SessionServer:
+    def __init__(self, store, metrics=None):
+        self.store = store
+        self.metrics = metrics or Metrics()
+
+    async def handle(self, req):
+        """One decoded request -> response dict (only restoring a parked run awaits: its read runs off the loop)."""
+        op = req.get("op")
+        if op not in OPS:
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        if op == "new":
+            sid, state = self.store.create(str(req.get("difficulty", "normal")))
+            return {"ok": True, "session": sid, "difficulty": state.difficulty, "day": state.day,
+                    "num_days": state.num_days, "stats": _stats_view(state), "scenario": _scenario_view(state)}
+
+        if op == "stats":
+            return {"ok": True, "metrics": self.metrics.snapshot(), "store": self.store.stats()}
+
+        sid = req.get("session")
+        if op == "close":
+            return {"ok": self.store.close(sid)} if sid else {"ok": False, "error": "missing session"}
+
+        state = await self.store.get(sid) if sid else None
+        if state is None:
+            return {"ok": False, "error": "unknown session"}
+        if op == "choose":
+            outcome = apply_choice(state, str(req.get("choice", "L")))
+            resp = {"ok": True, "outcome": outcome, "scenario": _scenario_view(state)}
+            if state.over:
+                resp["score"] = final_score(state)
+            return resp
+        return {"ok": True, "day": state.day, "num_days": state.num_days, "over": state.over,
+                "stats": _stats_view(state), "scenario": _scenario_view(state)}
+
+    async def handle_line(self, line):
+        t0 = time.perf_counter_ns()
+        op = "invalid"
+        try:
+            req = json.loads(line)
+            if not isinstance(req, dict):
+                raise ValueError("request must be a JSON object")
+            if req.get("op") in OPS:
+                op = req["op"]
+            resp = await self.handle(req)
+            if "id" in req:
+                resp["id"] = req["id"]
+        except (ValueError, TypeError) as e:
+            resp = {"ok": False, "error": str(e)}
+        except OSError as e:   # snapshot I/O
+            resp = {"ok": False, "error": f"store: {e}"}
+        except (struct.error, IndexError) as e:   # undecodable snapshot that slipped past engine.save
+            resp = {"ok": False, "error": f"store: corrupt snapshot ({e})"}
+        if not resp.get("ok"):
+            self.metrics.errors += 1
+        self.metrics.observe(op, time.perf_counter_ns() - t0)
+        return (json.dumps(resp, separators=(",", ":")) + "\n").encode("utf-8")
+
+    async def serve_client(self, reader, writer):
+        self.metrics.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(b'{"ok":false,"error":"line too long"}\n')
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    writer.write(await self.handle_line(line))
+                await writer.drain()  # returns at once unless the client stopped reading
+        except ConnectionError:
+            pass
+        finally:
+            self.metrics.connections -= 1
+            writer.close()
+
+    async def sweeper(self, every=SWEEP_EVERY):
+        while True:
+            await asyncio.sleep(every)
+            self.store.sweep_idle()
+
+
+async def serve(host="127.0.0.1", port=8765, unix=None, spill_dir=None, max_live=MAX_LIVE,
+                idle_seconds=IDLE_SECONDS, report_every=0.0, ready=None):
+    own_dir = spill_dir is None
+    spill_dir = spill_dir or tempfile.mkdtemp(prefix="swipe-sessions-")
+    app = SessionServer(SessionStore(spill_dir, max_live, idle_seconds))
+    if unix:
+        server = await asyncio.start_unix_server(app.serve_client, unix, limit=MAX_LINE)
+        where = unix
+    else:
+        server = await asyncio.start_server(app.serve_client, host, port, limit=MAX_LINE, backlog=4096)
+        where = "%s:%d" % server.sockets[0].getsockname()[:2]
+    print(f"Serving on {where} (max live {max_live}, spill dir {spill_dir})", flush=True)
+
+    tasks = [asyncio.create_task(app.sweeper(min(SWEEP_EVERY, idle_seconds)))]
+    if report_every > 0:
+        tasks.append(asyncio.create_task(_reporter(app, report_every)))
+    if ready is not None:
+        ready.set_result(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for t in tasks:
+            t.cancel()
+        app.store.shutdown()
+        if own_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+async def _reporter(app, every):
+    while True:
+        await asyncio.sleep(every)
+        m, s = app.metrics.snapshot(), app.store.stats()
+        lat = m["latency_us"]
+        print(f"[{m['uptime_s']:8.1f}s] {m['throughput_rps']:>9,.0f} req/s  p50 {lat['p50']}us  p99 {lat['p99']}us  "
+              f"live {s['live']}  parked {s['parked']}  conns {m['connections']}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Swipe Decision Game — session server (NDJSON over TCP/Unix socket)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--spill-dir", default=None, help="where parked sessions go (default: a temp dir)")
+    parser.add_argument("--max-live", type=int, default=MAX_LIVE, help="sessions kept in memory")
+    parser.add_argument("--idle-seconds", type=float, default=IDLE_SECONDS, help="park sessions idle this long")
+    parser.add_argument("--report-every", type=float, default=0.0, help="print counters every N seconds")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.spill_dir, args.max_live,
+                          args.idle_seconds, args.report_every))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())